@@ -2,202 +2,727 @@
 Algoritmos de búsqueda y optimización de rutas
 """
 import heapq
-from typing import List, Tuple, Dict, Set, Optional
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Callable, List, Tuple, Dict, Optional
 from app.graph_logic import SpaceGraph
-from app.models import DonkeyState, Star
+from app.models import DonkeyState
+from app import energy_model
+from app.energy_model import EnergyModel
 
 
 class RouteOptimizer:
     """Optimizador de rutas para el burro espacial"""
     
-    # Factor de consumo debe coincidir con simulation.py
-    ENERGY_CONSUMPTION_PER_LIGHT_YEAR = 0.1
+    # Mismo factor de consumo que la simulación (definido en energy_model.py)
+    ENERGY_CONSUMPTION_PER_LIGHT_YEAR = energy_model.ENERGY_CONSUMPTION_PER_LIGHT_YEAR
+    
+    # Máxima energía recuperada por kg de pasto: solo come con energía < 50%,
+    # es decir con salud 'Mala' o peor
+    MAX_MEAL_ENERGY_GAIN = 2.0
+    
+    # Máxima energía neta que agrega una recarga hipergigante: min(100, 1.5 * e) - e
+    # es mayor con e = 100 / 1.5, es decir 100 / 3
+    MAX_BOOST_ENERGY_GAIN = energy_model.MAX_ENERGY * (1 - 1 / energy_model.HYPERGIANT_ENERGY_FACTOR)
+    
+    # Programación dinámica (maximize_stars_dp): tamaño de los intervalos usados
+    # para discretizar energía (%), vida restante (años luz) y pasto (kg) al comparar estados
+    DP_ENERGY_STEP = 0.5
+    DP_AGE_STEP = 1.0
+    DP_GRASS_STEP = 0.5
+    # Hasta este número de estrellas se comparan valores exactos (resultado exacto)
+    DP_EXACT_MAX_STARS = 24
+    # En grafos más grandes, máximo de estados conservados por capa
+    DP_MAX_LAYER_STATES = 3000
+    
+    # Búsqueda paralela: subárboles por proceso (para balancear la carga) y cada
+    # cuántos segundos se reporta el progreso de todos los procesos
+    PARALLEL_TASKS_PER_WORKER = 4
+    PARALLEL_PROGRESS_SECONDS = 0.5
+    
+    # Cada cuántas estrellas expandidas el DFS reporta progreso y revisa si fue cancelado
+    PROGRESS_INTERVAL_NODES = 2000
+    
+    # Ruta sobrevivible (resource_constrained): máximo de etiquetas generadas antes
+    # de abandonar la búsqueda (el resultado deja de ser exacto)
+    RCSP_MAX_LABELS = 10000
     
     def __init__(self, graph: SpaceGraph, initial_donkey_state: DonkeyState):
         self.graph = graph
         self.initial_state = initial_donkey_state
     
-    def maximize_stars_visited(self, origin: int) -> Tuple[List[int], Dict]:
+    @property
+    def model(self) -> EnergyModel:
+        """Reglas de energía compartidas con la simulación (constantes del grafo actual)"""
+        return EnergyModel.for_graph(self.graph)
+    
+    def maximize_stars_visited(self, origin: int,
+                               time_budget_ms: Optional[float] = None,
+                               progress: Optional[Callable[[int, int], None]] = None,
+                               cancel_event=None) -> Tuple[List[int], Dict]:
         """
         PUNTO 2: Calcula la ruta que permite visitar la mayor cantidad de estrellas
         antes de que el burro muera, considerando solo valores iniciales.
         
-        Usa DFS modificado con backtracking y poda.
+        Usa DFS modificado con backtracking y poda (branch and bound): una rama se
+        abandona cuando una cota superior de las estrellas que aún puede visitar
+        (por energía, edad y estrellas alcanzables) no supera a la mejor ruta.
+        
+        Si se indica 'time_budget_ms' la búsqueda es anytime: al agotarse el tiempo
+        retorna la mejor ruta encontrada hasta ese momento y 'proven_optimal' en las
+        estadísticas indica si la búsqueda alcanzó a terminar.
+        
+        'progress(estrellas expandidas, mejor cantidad de estrellas)' se llama
+        periódicamente; si 'cancel_event' (threading o multiprocessing Event) se
+        activa, la búsqueda se detiene igual que al agotar el tiempo.
         """
-        best_route = []
-        best_stats = {
-            'stars_visited': 0,
-            'total_distance': 0,
-            'final_energy': 0,
-            'final_age': 0,
-            'is_alive': True,
-            'cause_of_death': None
-        }
+        deadline = None
+        if time_budget_ms is not None:
+            deadline = time.perf_counter() + time_budget_ms / 1000
+        
+        best_route, best_stats = self._search_max_stars(
+            [origin], self.initial_state.energy, self.initial_state.age,
+            self.initial_state.grass, self.initial_state.death_age, 0, deadline,
+            progress=progress, cancel_event=cancel_event
+        )
+        
+        self._append_final_star(origin, best_route, best_stats)
+        
+        return best_route, best_stats
+    
+    def maximize_stars_visited_parallel(self, origin: int, max_workers: Optional[int] = None,
+                                        time_budget_ms: Optional[float] = None,
+                                        progress: Optional[Callable[[int, int], None]] = None,
+                                        cancel_event=None, worker_slots=None) -> Tuple[List[int], Dict]:
+        """
+        Variante paralela de maximize_stars_visited.
+        
+        Expande los primeros niveles del DFS desde el origen hasta tener suficientes
+        subárboles y los reparte entre un ProcessPoolExecutor. Los procesos comparten
+        la mayor cantidad de estrellas encontrada para que la poda siga siendo efectiva.
+        
+        'max_workers' se limita a la cantidad de CPUs. 'progress' recibe cada
+        PARALLEL_PROGRESS_SECONDS las estrellas expandidas entre todos los procesos;
+        'cancel_event' debe poder compartirse entre procesos (multiprocessing o
+        Manager) y detiene la búsqueda en todos ellos.
+        
+        'worker_slots' (multiprocessing.BoundedSemaphore) acota los procesos de
+        búsqueda de todas las solicitudes: se usan solo los cupos libres y con menos
+        de dos la búsqueda es secuencial en el proceso actual.
+        """
+        cpu_count = os.cpu_count() or 1
+        max_workers = min(max_workers or cpu_count, cpu_count)
+        
+        acquired = 0
+        if worker_slots is not None:
+            while acquired < max_workers and worker_slots.acquire(block=False):
+                acquired += 1
+            max_workers = acquired
+        
+        try:
+            if worker_slots is not None and max_workers < 2:
+                return self.maximize_stars_visited(
+                    origin, time_budget_ms=time_budget_ms, progress=progress, cancel_event=cancel_event
+                )
+            return self._search_max_stars_parallel(origin, max_workers, time_budget_ms, progress, cancel_event)
+        finally:
+            for _ in range(acquired):
+                worker_slots.release()
+    
+    def _search_max_stars_parallel(self, origin: int, max_workers: int, time_budget_ms: Optional[float],
+                                   progress: Optional[Callable[[int, int], None]],
+                                   cancel_event) -> Tuple[List[int], Dict]:
+        """Búsqueda de maximize_stars_visited_parallel con 'max_workers' procesos"""
+        deadline = None
+        if time_budget_ms is not None:
+            # Reloj de pared: el límite se comparte entre procesos
+            deadline = time.time() + time_budget_ms / 1000
+        
+        prefixes = self._split_search_prefixes(origin, max_workers * self.PARALLEL_TASKS_PER_WORKER)
+        shared_best = multiprocessing.Value('i', 0)
+        shared_nodes = multiprocessing.Value('q', 0)
+        
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_max_stars_worker,
+            initargs=(self.graph, self.initial_state, shared_best, cancel_event, shared_nodes)
+        ) as pool:
+            futures = [pool.submit(_search_max_stars_prefix, prefix, deadline) for prefix in prefixes]
+            pending = futures
+            while pending:
+                _, pending = wait(pending, timeout=self.PARALLEL_PROGRESS_SECONDS)
+                if progress is not None and pending:
+                    progress(shared_nodes.value, shared_best.value)
+            results = [future.result() for future in futures]
+        
+        # Combinar en el orden del DFS secuencial (gana la primera ruta más larga)
+        best_route, best_stats = results[0]
+        for route, stats in results[1:]:
+            if stats['stars_visited'] > best_stats['stars_visited']:
+                best_route, best_stats = route, stats
+        
+        best_stats['nodes_expanded'] = sum(stats['nodes_expanded'] for _, stats in results)
+        best_stats['nodes_pruned'] = sum(stats['nodes_pruned'] for _, stats in results)
+        best_stats['proven_optimal'] = all(stats['proven_optimal'] for _, stats in results)
         
-        def dfs_backtrack(current_star: int, visited: Set[int], 
-                         current_energy: float, current_age: float, 
-                         current_grass: float, route: List[int],
-                         total_distance: float):
-            """DFS con backtracking para explorar todas las rutas posibles"""
-            nonlocal best_route, best_stats
+        if progress is not None:
+            progress(best_stats['nodes_expanded'], best_stats['stars_visited'])
+        
+        self._append_final_star(origin, best_route, best_stats)
+        
+        return best_route, best_stats
+    
+    def _split_search_prefixes(self, origin: int, target_count: int) -> List[tuple]:
+        """
+        Expande el árbol del DFS nivel por nivel hasta tener al menos 'target_count'
+        rutas parciales (o no poder expandir más). Cada ruta parcial es
+        (ruta, energía, edad, pasto, edad de muerte, distancia) y conserva el orden del DFS.
+        """
+        arrive = self.model.arrive
+        star_index = self.graph.star_index
+        prefixes = [([origin], self.initial_state.energy, self.initial_state.age,
+                     self.initial_state.grass, self.initial_state.death_age, 0)]
+        
+        while len(prefixes) < target_count:
+            expanded = []
+            grew = False
+            for prefix in prefixes:
+                route, energy, age, grass, death_age, distance = prefix
+                children = []
+                if energy > 0 and age < death_age:
+                    for neighbor_id, edge_distance in self.graph.get_neighbors_unblocked(route[-1]):
+                        if neighbor_id in route:
+                            continue
+                        _, new_energy, new_grass, new_age, new_death_age = arrive(
+                            energy, grass, age, death_age, edge_distance, star_index[neighbor_id]
+                        )[:5]
+                        children.append((route + [neighbor_id], new_energy, new_age,
+                                         new_grass, new_death_age, distance + edge_distance))
+                if children:
+                    expanded.extend(children)
+                    grew = True
+                else:
+                    expanded.append(prefix)
+            prefixes = expanded
+            if not grew:
+                break
+        
+        return prefixes
+    
+    def _search_max_stars(self, start_route: List[int], start_energy: float,
+                          start_age: float, start_grass: float, start_death_age: float,
+                          start_distance: float,
+                          deadline: Optional[float] = None,
+                          shared_best=None,
+                          progress: Optional[Callable[[int, int], None]] = None,
+                          cancel_event=None) -> Tuple[List[int], Dict]:
+        """
+        DFS con backtracking y branch and bound a partir de una ruta parcial.
+        
+        El DFS es iterativo: usa una pila explícita sobre arreglos preasignados por
+        profundidad (índice denso de la estrella, próxima posición de sus vecinos en
+        los arreglos CSR del grafo y estado del burro), así que no depende del límite
+        de recursión de Python. Las estrellas visitadas se marcan en un bytearray y la
+        mejor ruta se guarda como índices; la ruta y sus estadísticas se arman al final.
+        
+        'deadline' es un instante de time.perf_counter(); 'shared_best' es un
+        multiprocessing.Value con la mejor cantidad de estrellas de otros procesos.
+        'progress' y 'cancel_event' se revisan cada PROGRESS_INTERVAL_NODES estrellas.
+        Retorna la mejor ruta y sus estadísticas, sin agregar la estrella mortal.
+        """
+        # Cotas para la poda: para llegar a una estrella hay que recorrer al menos su
+        # conexión más corta e investigarla; comer recupera como máximo
+        # MAX_MEAL_ENERGY_GAIN por estrella (1 kg)
+        (stars_by_distance, sorted_distances, stars_by_energy, sorted_energy_costs,
+         stars_by_life_gain, sorted_life_gains) = (
+            self.graph.cached('max_stars_arrival_tables', self._build_arrival_tables)
+        )
+        max_meal = self.MAX_MEAL_ENERGY_GAIN
+        max_boost = self.MAX_BOOST_ENERGY_GAIN
+        grass_factor = energy_model.HYPERGIANT_GRASS_FACTOR
+        model = self.model
+        arrive = model.arrive
+        hypergiant = model.hypergiant
+        
+        offsets = self.graph.csr_offsets
+        targets = self.graph.csr_targets
+        weights = self.graph.csr_weights
+        blocked = self.graph.csr_blocked
+        star_count = len(self.graph.star_ids)
+        life_gain_count = len(stars_by_life_gain)
+        
+        # Estrellas con al menos una conexión sin bloquear
+        has_neighbors = bytearray(
+            any(not blocked[position] for position in range(offsets[index], offsets[index + 1]))
+            for index in range(star_count)
+        )
+        
+        # Pila del DFS: en cada profundidad, la estrella, la próxima posición CSR por
+        # explorar y el estado del burro al llegar
+        route = [0] * star_count
+        cursor = [0] * star_count
+        energy = [0.0] * star_count
+        age = [0.0] * star_count
+        grass = [0.0] * star_count
+        death_age = [0.0] * star_count
+        distance = [0.0] * star_count
+        visited = bytearray(star_count)
+        
+        # Cota por conectividad: marcas de estrellas vistas y pila del recorrido
+        seen = [0] * star_count
+        pending = [0] * star_count
+        seen_mark = 0
+        
+        base = len(start_route) - 1
+        for depth, star_id in enumerate(start_route):
+            route[depth] = self.graph.star_index[star_id]
+            visited[route[depth]] = 1
+        energy[base] = start_energy
+        age[base] = start_age
+        grass[base] = start_grass
+        death_age[base] = start_death_age
+        distance[base] = start_distance
+        # Hipergigantes aún no visitadas (cada una puede recargar al burro)
+        boosts_left = sum(1 for index in range(star_count) if hypergiant[index] and not visited[index])
+        
+        best_count = 0
+        best_indices: List[int] = []
+        best_values = (0, 0, 0, True, None)
+        nodes_expanded = 0
+        nodes_pruned = 0
+        timed_out = False
+        
+        def record(depth: int, final_energy: float, is_alive: bool, cause_of_death: Optional[str]):
+            """Guarda la ruta de la pila hasta 'depth' como la mejor encontrada"""
+            nonlocal best_count, best_indices, best_values
+            best_count = depth + 1
+            best_indices = route[:depth + 1]
+            best_values = (distance[depth], final_energy, age[depth], is_alive, cause_of_death)
+        
+        def incumbent() -> int:
+            """Mejor cantidad de estrellas conocida (local o de otros procesos)"""
+            if shared_best is None:
+                return best_count
+            if best_count > shared_best.value:
+                with shared_best.get_lock():
+                    if best_count > shared_best.value:
+                        shared_best.value = best_count
+            return max(best_count, shared_best.value)
+        
+        def can_improve(depth: int, needed: int) -> bool:
+            """
+            True si una cota superior (admisible) de las estrellas adicionales que aún
+            se pueden visitar alcanza 'needed'. La cota se calcula solo hasta 'needed',
+            que es lo que decide la poda
+            """
+            nonlocal seen_mark
+            if needed <= 0:
+                return True
+            
+            # Antes del viaje k el burro debe seguir vivo tras k-1 llegadas; en el mejor
+            # caso esas llegadas son las más baratas en energía y en distancia, y las
+            # que más alargan la vida. Cada hipergigante no visitada puede agregar
+            # MAX_BOOST_ENERGY_GAIN de energía y duplicar el pasto
+            bound_energy = energy[depth] + boosts_left * max_boost
+            bound_age = age[depth]
+            bound_grass = grass[depth] * grass_factor ** boosts_left
+            bound_death_age = death_age[depth]
+            bound = 0
+            by_energy = by_distance = by_life_gain = 0
+            while bound < needed:
+                while by_energy < star_count and visited[stars_by_energy[by_energy]]:
+                    by_energy += 1
+                if by_energy == star_count or bound_energy <= 0 or bound_age >= bound_death_age:
+                    break
+                while visited[stars_by_distance[by_distance]]:
+                    by_distance += 1
+                while by_life_gain < life_gain_count and visited[stars_by_life_gain[by_life_gain]]:
+                    by_life_gain += 1
+                if by_life_gain < life_gain_count:
+                    bound_death_age += sorted_life_gains[by_life_gain]
+                    by_life_gain += 1
+                bound += 1
+                meal = bound_grass if bound_grass < 1.0 else 1.0
+                bound_energy += meal * max_meal - sorted_energy_costs[by_energy]
+                bound_grass -= meal
+                bound_age += sorted_distances[by_distance]
+                by_energy += 1
+                by_distance += 1
+            
+            if bound < needed:
+                return False
+            
+            # Por conectividad: estrellas no visitadas alcanzables desde la actual
+            seen_mark += 1
+            seen[route[depth]] = seen_mark
+            pending[0] = route[depth]
+            top = 1
+            reachable = 0
+            while top and reachable < needed:
+                top -= 1
+                index = pending[top]
+                for position in range(offsets[index], offsets[index + 1]):
+                    neighbor = targets[position]
+                    if seen[neighbor] == seen_mark or visited[neighbor] or blocked[position]:
+                        continue
+                    seen[neighbor] = seen_mark
+                    pending[top] = neighbor
+                    top += 1
+                    reachable += 1
+            return reachable >= needed
+        
+        def open_node(depth: int) -> bool:
+            """
+            Evalúa la estrella en la cima de la pila: si el burro murió, no tiene
+            vecinos o la rama se poda, la ruta se considera candidata (salvo al podar)
+            y retorna False; si no, la prepara para explorar sus vecinos
+            """
+            nonlocal nodes_expanded, nodes_pruned, timed_out
             
             # Verificar si el burro está muerto
-            if current_age >= self.initial_state.death_age:
-                if len(visited) > best_stats['stars_visited']:
-                    best_route = route.copy()
-                    best_stats = {
-                        'stars_visited': len(visited),
-                        'total_distance': total_distance,
-                        'final_energy': current_energy,
-                        'final_age': current_age,
-                        'is_alive': False,
-                        'cause_of_death': 'age'
-                    }
-                return
-            
-            if current_energy <= 0:
-                if len(visited) > best_stats['stars_visited']:
-                    best_route = route.copy()
-                    best_stats = {
-                        'stars_visited': len(visited),
-                        'total_distance': total_distance,
-                        'final_energy': 0,
-                        'final_age': current_age,
-                        'is_alive': False,
-                        'cause_of_death': 'energy'
-                    }
-                return
-            
-            # Intentar visitar vecinos no visitados (excluyendo caminos bloqueados)
-            neighbors = self.graph.get_neighbors_unblocked(current_star)
+            if age[depth] >= death_age[depth]:
+                if depth + 1 > best_count:
+                    record(depth, energy[depth], False, 'age')
+                return False
             
-            if not neighbors:
+            if energy[depth] <= 0:
+                if depth + 1 > best_count:
+                    record(depth, 0, False, 'energy')
+                return False
+            
+            index = route[depth]
+            if not has_neighbors[index]:
                 # Sin vecinos, actualizar mejor ruta si es necesario
-                if len(visited) > best_stats['stars_visited']:
-                    best_route = route.copy()
-                    best_stats = {
-                        'stars_visited': len(visited),
-                        'total_distance': total_distance,
-                        'final_energy': current_energy,
-                        'final_age': current_age,
-                        'is_alive': current_energy > 0 and current_age < self.initial_state.death_age,
-                        'cause_of_death': None
-                    }
-                return
-            
-            explored_any = False
-            for neighbor_id, distance in neighbors:
-                if neighbor_id not in visited:
-                    # Calcular consumo de energía por el viaje
-                    travel_energy_cost = distance * self.ENERGY_CONSUMPTION_PER_LIGHT_YEAR
-                    
-                    # Calcular nuevo estado después de viajar
-                    new_age = current_age + distance
+                if depth + 1 > best_count:
+                    record(depth, energy[depth], True, None)
+                return False
+            
+            # Branch and bound: abandonar la rama si ni en el mejor caso puede
+            # superar a la mejor ruta encontrada hasta ahora
+            if not can_improve(depth, incumbent() - depth):
+                nodes_pruned += 1
+                return False
+            nodes_expanded += 1
+            
+            # Búsqueda anytime: al agotar el tiempo no se exploran más ramas, pero
+            # la ruta actual aún se considera como candidata al cerrar la estrella
+            if deadline is not None and time.perf_counter() >= deadline:
+                timed_out = True
+            
+            # Progreso y cancelación (trabajos en segundo plano), desde la primera expansión
+            if nodes_expanded % self.PROGRESS_INTERVAL_NODES == 1:
+                if progress is not None:
+                    progress(nodes_expanded, incumbent())
+                if cancel_event is not None and cancel_event.is_set():
+                    timed_out = True
+            
+            cursor[depth] = offsets[index]
+            return True
+        
+        depth = base if open_node(base) else base - 1
+        while depth >= base:
+            index = route[depth]
+            position = cursor[depth]
+            end = offsets[index + 1]
+            descended = False
+            while position < end and not timed_out:
+                neighbor = targets[position]
+                edge_distance = weights[position]
+                position += 1
+                if blocked[position - 1] or visited[neighbor]:
+                    continue
+                
+                # Simular viaje, investigación, comida y recarga en la estrella vecina.
+                # Se explora aunque muera (para llegar a la estrella mortal)
+                child = depth + 1
+                (energy[child], grass[child], age[child], death_age[child]) = arrive(
+                    energy[depth], grass[depth], age[depth], death_age[depth], edge_distance, neighbor
+                )[1:5]
+                distance[child] = distance[depth] + edge_distance
+                route[child] = neighbor
+                visited[neighbor] = 1
+                boosts_left -= hypergiant[neighbor]
+                
+                if open_node(child):
+                    cursor[depth] = position
+                    depth = child
+                    descended = True
+                    break
+                
+                # Backtrack
+                visited[neighbor] = 0
+                boosts_left += hypergiant[neighbor]
+            
+            if descended:
+                continue
+            
+            # Vecinos agotados: la ruta actual es candidata (si ningún hijo la superó)
+            if depth + 1 > best_count:
+                current_energy = energy[depth]
+                record(depth, current_energy, current_energy > 0 and age[depth] < death_age[depth],
+                       None if current_energy > 0 else 'energy')
+            
+            # Backtrack (la ruta parcial inicial se conserva)
+            if depth > base:
+                visited[index] = 0
+                boosts_left += hypergiant[index]
+            depth -= 1
+        
+        total_distance, final_energy, final_age, is_alive, cause_of_death = best_values
+        best_route = [self.graph.star_ids[index] for index in best_indices]
+        best_stats = {
+            'stars_visited': best_count,
+            'total_distance': total_distance,
+            'final_energy': final_energy,
+            'final_age': final_age,
+            'is_alive': is_alive,
+            'cause_of_death': cause_of_death,
+            'nodes_expanded': nodes_expanded,
+            'nodes_pruned': nodes_pruned,
+            'proven_optimal': not timed_out
+        }
+        
+        if progress is not None:
+            progress(nodes_expanded, best_count)
+        
+        return best_route, best_stats
+    
+    def _build_arrival_tables(self) -> tuple:
+        """
+        Tablas de cotas del DFS (no dependen del origen, se comparten entre búsquedas):
+        índices densos de las estrellas ordenados por distancia mínima de llegada, por
+        energía mínima de llegada y por vida ganada al investigarlas (solo las que
+        alargan la vida), cada uno con sus valores en el mismo orden.
+        """
+        model = self.model
+        offsets = self.graph.csr_offsets
+        weights = self.graph.csr_weights
+        blocked = self.graph.csr_blocked
+        star_count = len(self.graph.star_ids)
+        
+        min_arrival_distance = [
+            min((weights[position] for position in range(offsets[index], offsets[index + 1])
+                 if not blocked[position]), default=float('inf'))
+            for index in range(star_count)
+        ]
+        min_arrival_energy = [
+            distance * self.ENERGY_CONSUMPTION_PER_LIGHT_YEAR + model.research[index]
+            for index, distance in enumerate(min_arrival_distance)
+        ]
+        life_change = model.life_change
+        
+        stars_by_distance = sorted(range(star_count), key=min_arrival_distance.__getitem__)
+        stars_by_energy = sorted(range(star_count), key=min_arrival_energy.__getitem__)
+        stars_by_life_gain = sorted((index for index in range(star_count) if life_change[index] > 0),
+                                    key=life_change.__getitem__, reverse=True)
+        return (stars_by_distance, [min_arrival_distance[index] for index in stars_by_distance],
+                stars_by_energy, [min_arrival_energy[index] for index in stars_by_energy],
+                stars_by_life_gain, [life_change[index] for index in stars_by_life_gain])
+    
+    def maximize_stars_dp(self, origin: int, time_budget_ms: Optional[float] = None,
+                          progress: Optional[Callable[[int, int], None]] = None,
+                          cancel_event=None) -> Tuple[List[int], Dict]:
+        """
+        PUNTO 2 (variante): Maximiza las estrellas visitadas con programación
+        dinámica sobre máscaras de bits.
+        
+        Recorre las rutas por capas (cantidad de estrellas visitadas) y memoiza
+        los estados por (estrella actual, máscara de visitadas). En cada clave solo
+        se conservan los estados no dominados en (energía, vida restante, pasto)
+        discretizados: un estado con menos energía, menos vida y menos pasto nunca
+        llega más lejos.
+        
+        En grafos pequeños (DP_EXACT_MAX_STARS) se usan los valores exactos, por lo
+        que el resultado coincide con el DFS exhaustivo. En grafos más grandes cada
+        capa se limita a los DP_MAX_LAYER_STATES estados con más recursos y el
+        resultado es aproximado: 'proven_optimal' es False en las estadísticas.
+        
+        'time_budget_ms' y 'cancel_event' funcionan como en maximize_stars_visited:
+        al agotar el tiempo (o al cancelar) no se expanden más estados y se retorna
+        la ruta más larga de las capas ya calculadas. 'progress(estados expandidos,
+        mejor cantidad de estrellas)' se llama al terminar cada capa y cada
+        PROGRESS_INTERVAL_NODES estados; la cancelación se revisa con la misma
+        frecuencia y entre capas.
+        """
+        deadline = None
+        if time_budget_ms is not None:
+            deadline = time.perf_counter() + time_budget_ms / 1000
+        
+        star_ids = self.graph.get_all_stars()
+        star_bit = {star_id: 1 << index for star_id, index in self.graph.star_index.items()}
+        neighbors_of = self.graph.cached('unblocked_neighbors', lambda: {
+            star_id: self.graph.get_neighbors_unblocked(star_id) for star_id in star_ids
+        })
+        arrive = self.model.arrive
+        star_index = self.graph.star_index
+        
+        exact = len(star_ids) <= self.DP_EXACT_MAX_STARS
+        if exact:
+            energy_step = age_step = grass_step = 0.0
+        else:
+            energy_step = self.DP_ENERGY_STEP
+            age_step = self.DP_AGE_STEP
+            grass_step = self.DP_GRASS_STEP
+        
+        def quantize(value: float, step: float, round_up: bool) -> float:
+            """Discretiza un recurso (hacia el lado pesimista)"""
+            if step <= 0:
+                return value
+            buckets = value / step
+            return math.ceil(buckets) if round_up else math.floor(buckets)
+        
+        def make_label(star_id: int, energy: float, age: float, grass: float, death_age: float,
+                       distance: float, parent: Optional[tuple]) -> tuple:
+            """Etiqueta: (energía, vida restante, pasto) discretizados + estado real + padre"""
+            return (
+                quantize(energy, energy_step, False),
+                quantize(death_age - age, age_step, False),
+                quantize(grass, grass_step, False),
+                energy, age, grass, death_age, distance, star_id, parent
+            )
+        
+        def insert_label(front: List[tuple], label: tuple) -> bool:
+            """Inserta la etiqueta en el frente de Pareto si no está dominada"""
+            q_energy, q_life, q_grass = label[0], label[1], label[2]
+            for other in front:
+                if other[0] >= q_energy and other[1] >= q_life and other[2] >= q_grass:
+                    return False
+            front[:] = [
+                other for other in front
+                if not (q_energy >= other[0] and q_life >= other[1] and q_grass >= other[2])
+            ]
+            front.append(label)
+            return True
+        
+        initial_label = make_label(
+            origin, self.initial_state.energy, self.initial_state.age,
+            self.initial_state.grass, self.initial_state.death_age, 0, None
+        )
+        layer: Dict[Tuple[int, int], List[tuple]] = {
+            (origin, star_bit[origin]): [initial_label]
+        }
+        best_label = initial_label
+        best_stars = 1
+        labels_expanded = 0
+        timed_out = False
+        
+        while layer and not timed_out:
+            if cancel_event is not None and cancel_event.is_set():
+                timed_out = True
+                break
+            next_layer: Dict[Tuple[int, int], List[tuple]] = {}
+            
+            for (star_id, mask), front in layer.items():
+                for label in front:
+                    energy, age, grass, death_age, distance = label[3:8]
                     
-                    # Energía después del viaje
-                    new_energy = current_energy - travel_energy_cost
+                    # Los estados muertos son terminales (la estrella mortal cuenta)
+                    if age >= death_age or energy <= 0:
+                        continue
                     
-                    # Simular llegada a la estrella e investigación
-                    star = self.graph.get_star(neighbor_id)
-                    new_energy -= star.amountOfEnergy
-                    new_grass = current_grass
+                    # Tiempo agotado o cancelación: la capa queda con lo ya expandido
+                    labels_expanded += 1
+                    if deadline is not None and time.perf_counter() >= deadline:
+                        timed_out = True
+                    if labels_expanded % self.PROGRESS_INTERVAL_NODES == 0:
+                        if progress is not None:
+                            progress(labels_expanded, best_stars)
+                        if cancel_event is not None and cancel_event.is_set():
+                            timed_out = True
+                    if timed_out:
+                        break
                     
-                    # Si energía < 50%, el burro come
-                    if new_energy < 50 and new_grass > 0 and new_energy > 0:
-                        # Calcular estado de salud según energía ACTUAL
-                        current_health = self._calculate_health_from_energy(new_energy)
-                        energy_gain_per_kg = self._get_energy_gain_rate(current_health)
-                        
-                        # Límite de tiempo para comer (50% del tiempo en estrella)
-                        time_available = star.timeToEat
-                        max_kg_by_time = time_available / star.timeToEat  # = 1 kg
-                        
-                        kg_needed = (50 - new_energy) / energy_gain_per_kg if energy_gain_per_kg > 0 else 0
-                        kg_actual = min(max_kg_by_time, kg_needed, new_grass)
+                    for neighbor_id, edge_distance in neighbors_of[star_id]:
+                        neighbor_bit = star_bit[neighbor_id]
+                        if mask & neighbor_bit:
+                            continue
                         
-                        new_energy += kg_actual * energy_gain_per_kg
-                        new_grass -= kg_actual
-                    
-                    # PERMITIR explorar aunque muera (para llegar a la estrella mortal)
-                    # La verificación de muerte se hará en la próxima iteración del DFS
-                    explored_any = True
-                    
-                    # Recursión
-                    visited.add(neighbor_id)
-                    route.append(neighbor_id)
-                    
-                    dfs_backtrack(
-                        neighbor_id, visited, new_energy, new_age,
-                        new_grass, route, total_distance + distance
-                    )
-                    
-                    # Backtrack
-                    visited.remove(neighbor_id)
-                    route.pop()
-            
-            # IMPORTANTE: Actualizar mejor ruta después del loop
-            # Solo si exploró al menos un vecino O si no tiene vecinos disponibles
-            if len(visited) > best_stats['stars_visited']:
-                best_route = route.copy()
-                best_stats = {
-                    'stars_visited': len(visited),
-                    'total_distance': total_distance,
-                    'final_energy': current_energy,
-                    'final_age': current_age,
-                    'is_alive': current_energy > 0 and current_age < self.initial_state.death_age,
-                    'cause_of_death': None if current_energy > 0 else 'energy'
-                }
-        
-        # Iniciar DFS desde el origen
-        initial_visited = {origin}
-        initial_route = [origin]
-        
-        dfs_backtrack(
-            origin, initial_visited,
-            self.initial_state.energy,
-            self.initial_state.age,
-            self.initial_state.grass,
-            initial_route, 0
-        )
-        
-        # Si el burro terminó vivo (no murió), intentar agregar UNA estrella más aunque sea mortal
-        if best_stats['cause_of_death'] is None and best_stats['final_energy'] > 0:
-            last_star = best_route[-1] if best_route else origin
-            neighbors = self.graph.get_neighbors_unblocked(last_star)
-            visited_stars = set(best_route)
+                        _, new_energy, new_grass, new_age, new_death_age = arrive(
+                            energy, grass, age, death_age, edge_distance, star_index[neighbor_id]
+                        )[:5]
+                        child = make_label(
+                            neighbor_id, new_energy, new_age, new_grass, new_death_age,
+                            distance + edge_distance, label
+                        )
+                        key = (neighbor_id, mask | neighbor_bit)
+                        insert_label(next_layer.setdefault(key, []), child)
+                if timed_out:
+                    break
             
-            # Buscar el vecino más cercano no visitado
-            closest_neighbor = None
-            closest_distance = float('inf')
-            
-            for neighbor_id, distance in neighbors:
-                if neighbor_id not in visited_stars and distance < closest_distance:
-                    closest_neighbor = neighbor_id
-                    closest_distance = distance
+            if next_layer:
+                # Cualquier estado de la capa más profunda es una ruta óptima
+                best_label = next(iter(next(iter(next_layer.values()))))
+                best_stars += 1
+                if not exact:
+                    next_layer = self._limit_dp_layer(next_layer)
+            layer = next_layer
             
-            # Si encontró un vecino, agregarlo a la ruta (será la estrella mortal)
-            if closest_neighbor is not None:
-                best_route.append(closest_neighbor)
-                # Actualizar estadísticas simulando muerte
-                travel_cost = closest_distance * self.ENERGY_CONSUMPTION_PER_LIGHT_YEAR
-                star = self.graph.get_star(closest_neighbor)
-                final_energy = best_stats['final_energy'] - travel_cost - star.amountOfEnergy
-                best_stats['final_energy'] = max(0, final_energy)
-                best_stats['final_age'] += closest_distance
-                best_stats['total_distance'] += closest_distance
-                best_stats['stars_visited'] += 1
-                best_stats['is_alive'] = False
-                best_stats['cause_of_death'] = 'energy' if final_energy <= 0 else ('age' if best_stats['final_age'] >= self.initial_state.death_age else None)
+            if progress is not None:
+                progress(labels_expanded, best_stars)
+        
+        # Reconstruir la ruta siguiendo los padres
+        best_route = []
+        label = best_label
+        while label is not None:
+            best_route.append(label[8])
+            label = label[9]
+        best_route.reverse()
+        
+        energy, age, death_age, distance = best_label[3], best_label[4], best_label[6], best_label[7]
+        if age >= death_age:
+            is_alive, cause_of_death = False, 'age'
+        elif energy <= 0:
+            energy, is_alive, cause_of_death = 0, False, 'energy'
+        else:
+            is_alive, cause_of_death = True, None
+        
+        best_stats = {
+            'stars_visited': len(best_route),
+            'total_distance': distance,
+            'final_energy': energy,
+            'final_age': age,
+            'is_alive': is_alive,
+            'cause_of_death': cause_of_death,
+            'proven_optimal': exact and not timed_out
+        }
+        
+        self._append_final_star(origin, best_route, best_stats)
         
         return best_route, best_stats
     
-    def minimize_cost_route(self, origin: int, destination: int = None) -> Tuple[List[int], Dict]:
+    def _limit_dp_layer(self, layer: Dict[Tuple[int, int], List[tuple]]) -> Dict[Tuple[int, int], List[tuple]]:
+        """Conserva solo los DP_MAX_LAYER_STATES estados con más energía, pasto y vida restante"""
+        total_states = sum(len(front) for front in layer.values())
+        if total_states <= self.DP_MAX_LAYER_STATES:
+            return layer
+        
+        entries = [(key, label) for key, front in layer.items() for label in front]
+        kept = heapq.nlargest(
+            self.DP_MAX_LAYER_STATES, entries,
+            key=lambda entry: (entry[1][0], entry[1][2], entry[1][1])
+        )
+        
+        limited: Dict[Tuple[int, int], List[tuple]] = {}
+        for key, label in kept:
+            limited.setdefault(key, []).append(label)
+        return limited
+    
+    def minimize_cost_route(self, origin: int, destination: int = None,
+                            use_astar: bool = False,
+                            resource_constrained: bool = False) -> Tuple[List[int], Dict]:
         """
         PUNTO 3: Calcula la ruta con el menor gasto posible.
         
         Si se proporciona 'destination':
             Usa Dijkstra para encontrar el camino más corto del origen al destino,
             visitando todas las estrellas intermedias en el camino óptimo.
+            Con use_astar=True usa A* guiado por las coordenadas (mismo resultado,
+            menos estrellas expandidas).
+            Con resource_constrained=True retorna el camino más corto en el que el
+            burro sobrevive (energía, pasto y edad), aunque no sea el más corto.
         
         Si NO se proporciona 'destination':
             Estrategia greedy que visita la mayor cantidad de estrellas con menor gasto,
@@ -206,15 +731,21 @@ class RouteOptimizer:
         
         # MODO 1: Con destino específico - Usar Dijkstra puro
         if destination is not None:
-            return self._dijkstra_to_destination(origin, destination)
+            if resource_constrained:
+                return self._survivable_route_to_destination(origin, destination)
+            return self._dijkstra_to_destination(origin, destination, use_astar)
         
         # MODO 2: Sin destino - Greedy conservador (código existente)
+        arrive = self.model.arrive
+        research = self.model.research
+        star_index = self.graph.star_index
         route = [origin]
         visited = {origin}
         current_star = origin
         current_energy = self.initial_state.energy
         current_age = self.initial_state.age
         current_grass = self.initial_state.grass
+        current_death_age = self.initial_state.death_age
         total_cost = 0
         
         stats = {
@@ -240,106 +771,49 @@ class RouteOptimizer:
             best_target = None
             best_distance = 0
             best_cost = float('inf')
-            best_energy_after = 0
-            best_grass_consumed = 0
-            best_energy_gain = 0
-            best_will_die = False
+            best_arrival = None
             
             for neighbor_id, distance in unvisited_neighbors:
-                # Calcular consumo de energía por el viaje DIRECTO
-                travel_energy_cost = distance * self.ENERGY_CONSUMPTION_PER_LIGHT_YEAR
-                
-                star = self.graph.get_star(neighbor_id)
-                
-                # Calcular consumo total de energía (viaje + investigación)
-                energy_cost_research = star.amountOfEnergy
-                total_energy_cost = travel_energy_cost + energy_cost_research
-                
-                # Simular si necesitará comer
-                energy_after_travel = current_energy - total_energy_cost
-                energy_gain = 0
-                grass_consumed = 0
-                will_die = False  # Flag para saber si morirá en esta estrella
-                
-                # Verificar muerte por edad
-                if current_age + distance >= self.initial_state.death_age:
-                    will_die = True
-                
-                # Verificar muerte por energía en el viaje
-                if current_energy - travel_energy_cost <= 0:
-                    will_die = True
+                # Simular viaje, investigación, comida y recarga en la estrella vecina
+                index = star_index[neighbor_id]
+                arrival = arrive(current_energy, current_grass, current_age,
+                                 current_death_age, distance, index)
                 
-                # Si sobrevive el viaje, simular comer
-                if not will_die:
-                    if energy_after_travel < 50 and current_grass > 0:
-                        # Calcular estado de salud ACTUAL según energía después de viajar
-                        current_health = self._calculate_health_from_energy(energy_after_travel)
-                        energy_gain_rate = self._get_energy_gain_rate(current_health)
-                        
-                        # Límite de tiempo: 50% del tiempo en la estrella
-                        time_available = star.timeToEat  # 50% del tiempo total
-                        max_kg_by_time = time_available / star.timeToEat  # = 1 kg
-                        
-                        # Calcular kg necesarios y lo que realmente puede comer
-                        kg_needed = (50 - energy_after_travel) / energy_gain_rate if energy_gain_rate > 0 else 0
-                        kg_actual = min(max_kg_by_time, kg_needed, current_grass)
-                        
-                        energy_gain = kg_actual * energy_gain_rate
-                        grass_consumed = kg_actual
-                    
-                    # Verificar muerte después de investigación y comer
-                    final_energy = energy_after_travel + energy_gain
-                    if final_energy <= 0:
-                        will_die = True
-                
-                # Calcular el COSTO de visitar este vecino
-                # ESTRATEGIA CONSERVADORA: Priorizar EFICIENCIA sobre cantidad
-                # Si morirá o el gasto es demasiado alto, evitar esa estrella
-                if will_die:
-                    # NO considerar estrellas donde morirá (estrategia conservadora)
+                # NO considerar estrellas donde morirá (estrategia conservadora)
+                if arrival[0] >= energy_model.DEATH_BY_ENERGY_TRAVEL:
                     continue
-                else:
-                    # Costo = energía total gastada (viaje + investigación) - energía ganada comiendo
-                    # Menor costo = más eficiente
-                    cost = total_energy_cost - energy_gain
-                    final_energy = energy_after_travel + energy_gain
+                
+                # Costo = energía total gastada (viaje + investigación) - energía ganada comiendo
+                # Menor costo = más eficiente
+                energy_gain = arrival[6] * arrival[7]
+                cost = distance * self.ENERGY_CONSUMPTION_PER_LIGHT_YEAR + research[index] - energy_gain
                 
                 # Seleccionar el vecino con MENOR COSTO (menor gasto de energía)
                 if cost < best_cost:
                     best_cost = cost
                     best_target = neighbor_id
                     best_distance = distance
-                    best_energy_after = final_energy
-                    best_grass_consumed = grass_consumed
-                    best_energy_gain = energy_gain
-                    best_will_die = will_die
+                    best_arrival = arrival
             
             if best_target is None:
                 break  # No hay vecinos viables para visitar
             
             # ESTRATEGIA CONSERVADORA: Detenerse si el costo es muy alto o la energía es baja
             # Umbral: Si el próximo paso consume más del 30% de energía restante, detenerse
-            star = self.graph.get_star(best_target)
             travel_energy_cost = best_distance * self.ENERGY_CONSUMPTION_PER_LIGHT_YEAR
-            total_energy_cost = travel_energy_cost + star.amountOfEnergy
+            total_energy_cost = travel_energy_cost + research[star_index[best_target]]
             
             # Si el gasto es más del 30% de la energía actual, detenerse (estrategia conservadora)
             if total_energy_cost > (current_energy * 0.3) and len(visited) > 1:
                 break  # Detenerse para ahorrar energía
             
             # Si la energía caerá por debajo del 25% después de este paso, detenerse
-            if best_energy_after < 25 and len(visited) > 1:
+            if best_arrival[1] < 25 and len(visited) > 1:
                 break  # Detenerse antes de quedarse sin energía
             
-            # Actualizar estado
-            current_age += best_distance
-            current_energy -= total_energy_cost
-            
-            # Comer si es necesario
-            if current_energy < 50 and current_grass > 0:
-                current_energy += best_energy_gain
-                current_grass -= best_grass_consumed
-                stats['total_grass_consumed'] += best_grass_consumed
+            # Actualizar estado (viaje, investigación, comida y recarga)
+            _, current_energy, current_grass, current_age, current_death_age = best_arrival[:5]
+            stats['total_grass_consumed'] += best_arrival[6]
             
             # Agregar la estrella a la ruta
             route.append(best_target)
@@ -351,16 +825,6 @@ class RouteOptimizer:
             stats['total_distance'] += best_distance
             stats['total_energy_consumed'] += total_energy_cost
             stats['stars_visited'] = len(visited)
-            
-            # Si la estrella seleccionada causa la muerte, agregar y terminar
-            if best_will_die:
-                stats['is_alive'] = False
-                break
-            
-            # Verificar si el burro sigue vivo después de actualizar estado
-            if current_age >= self.initial_state.death_age or current_energy <= 0:
-                stats['is_alive'] = False
-                break
         
         stats['final_energy'] = current_energy
         stats['final_age'] = current_age
@@ -373,13 +837,16 @@ class RouteOptimizer:
         
         return route, stats
     
-    def _dijkstra_to_destination(self, origin: int, destination: int) -> Tuple[List[int], Dict]:
+    def _dijkstra_to_destination(self, origin: int, destination: int,
+                                 use_astar: bool = False) -> Tuple[List[int], Dict]:
         """
-        Usa Dijkstra para encontrar el camino más corto del origen al destino.
+        Usa Dijkstra (o A* si use_astar es True y el grafo tiene una heurística
+        admisible) para encontrar el camino más corto del origen al destino.
         Retorna la ruta completa con todas las estrellas intermedias.
         """
-        # Usar el método shortest_path del grafo (implementa Dijkstra)
-        path, total_distance = self.graph.shortest_path(origin, destination)
+        use_astar = use_astar and self.graph.heuristic_scale is not None
+        method_name = 'A*' if use_astar else 'Dijkstra'
+        path, total_distance, nodes_expanded = self.graph.search_path(origin, destination, use_astar)
         
         if not path or total_distance == float('inf'):
             # No hay camino posible
@@ -392,14 +859,19 @@ class RouteOptimizer:
                 'final_age': self.initial_state.age,
                 'final_grass': self.initial_state.grass,
                 'is_alive': True,
-                'algorithm': 'Dijkstra - Sin camino',
-                'destination_reached': False
+                'algorithm': f'{method_name} - Sin camino',
+                'destination_reached': False,
+                'nodes_expanded': nodes_expanded
             }
         
         # Simular el viaje siguiendo el camino de Dijkstra
+        arrive = self.model.arrive
+        research = self.model.research
+        star_index = self.graph.star_index
         current_energy = self.initial_state.energy
         current_age = self.initial_state.age
         current_grass = self.initial_state.grass
+        current_death_age = self.initial_state.death_age
         total_energy_consumed = 0
         total_grass_consumed = 0
         destination_reached = False
@@ -410,92 +882,291 @@ class RouteOptimizer:
             next_star_id = path[i + 1]
             
             # Obtener distancia entre estrellas consecutivas
-            neighbors = self.graph.get_neighbors(current_star_id)
-            distance = next((d for nid, d in neighbors if nid == next_star_id), 0)
+            distance = self.graph.edge_weight(current_star_id, next_star_id)
+            index = star_index[next_star_id]
             
-            # Calcular consumo de energía por el viaje
-            travel_energy_cost = distance * self.ENERGY_CONSUMPTION_PER_LIGHT_YEAR
+            # Viaje, investigación, comida y recarga en la estrella destino
+            action, current_energy, current_grass, current_age, current_death_age, _, kg_eaten, _ = arrive(
+                current_energy, current_grass, current_age, current_death_age, distance, index
+            )
             
-            # Obtener información de la estrella destino
-            star = self.graph.get_star(next_star_id)
-            research_cost = star.amountOfEnergy
-            total_energy_cost = travel_energy_cost + research_cost
+            # Verificar muerte en el viaje o después de investigar
+            if action >= energy_model.DEATH_BY_ENERGY_TRAVEL:
+                break
             
-            # Actualizar estado
-            current_age += distance
-            current_energy -= travel_energy_cost
+            total_grass_consumed += kg_eaten
+            total_energy_consumed += distance * self.ENERGY_CONSUMPTION_PER_LIGHT_YEAR + research[index]
             
-            # Verificar muerte en el viaje
-            if current_energy <= 0:
+            # Verificar si llegó al destino
+            if next_star_id == destination:
+                destination_reached = True
                 break
+        
+        # Calcular estadísticas
+        stats = {
+            'stars_visited': len(path),
+            'total_distance': total_distance,
+            'total_energy_consumed': total_energy_consumed,
+            'total_grass_consumed': total_grass_consumed,
+            'final_energy': max(0, current_energy),
+            'final_age': current_age,
+            'final_grass': current_grass,
+            'is_alive': current_energy > 0 and current_age < current_death_age,
+            'algorithm': f'{method_name} - Ruta Óptima',
+            'destination_reached': destination_reached,
+            'nodes_expanded': nodes_expanded
+        }
+        
+        return path, stats
+    
+    def _survivable_route_to_destination(self, origin: int, destination: int) -> Tuple[List[int], Dict]:
+        """
+        Camino más corto con restricciones de recursos (etiquetas + dominancia de Pareto).
+        
+        Cada etiqueta guarda (distancia, energía, pasto, vida restante, estrellas visitadas)
+        y avanza con EnergyModel.arrive, las mismas reglas de la simulación.
+        Una etiqueta se descarta si otra en la misma estrella tiene menor o igual distancia,
+        más o igual energía, pasto y vida restante, y visitó un subconjunto de sus estrellas.
+        Las etiquetas se expanden por distancia recorrida + distancia mínima al destino
+        (cota exacta de Dijkstra), así que la primera que llega al destino es la ruta
+        sobrevivible más corta.
+        """
+        arrive = self.model.arrive
+        star_index = self.graph.star_index
+        remaining = self.graph.shortest_distances(destination)
+        
+        if origin not in remaining:
+            return self._no_survivable_route(origin, 0, 0, True)
+        
+        # Etiqueta: (estrella, distancia, energía, pasto, edad, edad de muerte, máscara, padre)
+        labels = [(origin, 0.0, self.initial_state.energy, self.initial_state.grass,
+                   self.initial_state.age, self.initial_state.death_age,
+                   1 << star_index[origin], -1)]
+        # Frente de Pareto por estrella: (distancia, energía, pasto, vida restante, máscara, id)
+        fronts: Dict[int, List[tuple]] = {}
+        removed = bytearray(1)
+        heap = [(0.0, 0)]
+        nodes_expanded = 0
+        
+        while heap:
+            _, label_id = heapq.heappop(heap)
+            if removed[label_id]:
+                continue
             
-            # Consumir energía de investigación
-            current_energy -= research_cost
+            star_id, distance, energy, grass, age, death_age, mask, _ = labels[label_id]
+            nodes_expanded += 1
             
-            # Verificar muerte después de investigar
-            if current_energy <= 0:
+            if star_id == destination:
+                return self._replay_survivable_route(labels, label_id, nodes_expanded)
+            
+            if len(labels) >= self.RCSP_MAX_LABELS:
                 break
             
-            # Si energía < 50%, el burro come
-            if current_energy < 50 and current_grass > 0:
-                current_health = self._calculate_health_from_energy(current_energy)
-                energy_gain_rate = self._get_energy_gain_rate(current_health)
+            for neighbor_id, edge_distance in self.graph.get_neighbors_unblocked(star_id):
+                index = star_index[neighbor_id]
+                bit = 1 << index
+                if mask & bit or neighbor_id not in remaining:
+                    continue
                 
-                # Límite de 1 kg por estrella
-                time_available = star.timeToEat
-                max_kg_by_time = 1.0
+                action, new_energy, new_grass, new_age, new_death_age = arrive(
+                    energy, grass, age, death_age, edge_distance, index
+                )[:5]
+                if action >= energy_model.DEATH_BY_ENERGY_TRAVEL:
+                    continue
                 
-                kg_needed = (50 - current_energy) / energy_gain_rate if energy_gain_rate > 0 else 0
-                kg_actual = min(max_kg_by_time, kg_needed, current_grass)
+                new_distance = distance + edge_distance
+                new_life = new_death_age - new_age
+                new_mask = mask | bit
                 
-                energy_gained = kg_actual * energy_gain_rate
-                current_energy += energy_gained
-                current_grass -= kg_actual
-                total_grass_consumed += kg_actual
-            
-            total_energy_consumed += total_energy_cost
+                # Descartar la etiqueta si otra la domina y retirar las que ella domina
+                dominated = False
+                kept = []
+                for entry in fronts.get(neighbor_id, ()):
+                    other_distance, other_energy, other_grass, other_life, other_mask, other_id = entry
+                    if (other_distance <= new_distance and other_energy >= new_energy
+                            and other_grass >= new_grass and other_life >= new_life
+                            and other_mask | new_mask == new_mask):
+                        dominated = True
+                        break
+                    if (new_distance <= other_distance and new_energy >= other_energy
+                            and new_grass >= other_grass and new_life >= other_life
+                            and new_mask | other_mask == other_mask):
+                        removed[other_id] = 1
+                    else:
+                        kept.append(entry)
+                if dominated:
+                    continue
+                
+                new_id = len(labels)
+                labels.append((neighbor_id, new_distance, new_energy, new_grass,
+                               new_age, new_death_age, new_mask, label_id))
+                removed.append(0)
+                kept.append((new_distance, new_energy, new_grass, new_life, new_mask, new_id))
+                fronts[neighbor_id] = kept
+                heapq.heappush(heap, (new_distance + remaining[neighbor_id], new_id))
+        
+        proven_optimal = len(labels) < self.RCSP_MAX_LABELS
+        return self._no_survivable_route(origin, nodes_expanded, len(labels), proven_optimal)
+    
+    def _replay_survivable_route(self, labels: List[tuple], label_id: int,
+                                 nodes_expanded: int) -> Tuple[List[int], Dict]:
+        """Reconstruye la ruta de una etiqueta y calcula sus estadísticas"""
+        path = []
+        while label_id != -1:
+            path.append(labels[label_id][0])
+            label_id = labels[label_id][7]
+        path.reverse()
+        
+        current_energy = self.initial_state.energy
+        current_age = self.initial_state.age
+        current_grass = self.initial_state.grass
+        death_age = self.initial_state.death_age
+        total_distance = 0
+        total_energy_consumed = 0
+        total_grass_consumed = 0
+        
+        arrive = self.model.arrive
+        research = self.model.research
+        for i in range(len(path) - 1):
+            distance = self.graph.edge_weight(path[i], path[i + 1])
+            index = self.graph.star_index[path[i + 1]]
+            _, current_energy, current_grass, current_age, death_age, _, kg_eaten, _ = arrive(
+                current_energy, current_grass, current_age, death_age, distance, index
+            )
             
-            # Verificar si llegó al destino
-            if next_star_id == destination:
-                destination_reached = True
-                break
+            total_distance += distance
+            total_energy_consumed += distance * self.ENERGY_CONSUMPTION_PER_LIGHT_YEAR + research[index]
+            total_grass_consumed += kg_eaten
         
-        # Calcular estadísticas
         stats = {
             'stars_visited': len(path),
             'total_distance': total_distance,
             'total_energy_consumed': total_energy_consumed,
             'total_grass_consumed': total_grass_consumed,
-            'final_energy': max(0, current_energy),
+            'final_energy': current_energy,
             'final_age': current_age,
             'final_grass': current_grass,
-            'is_alive': current_energy > 0 and current_age < self.initial_state.death_age,
-            'algorithm': 'Dijkstra - Ruta Óptima',
-            'destination_reached': destination_reached
+            'is_alive': True,
+            'algorithm': 'Ruta Sobrevivible - Ruta Óptima',
+            'destination_reached': True,
+            'nodes_expanded': nodes_expanded,
+            'labels_created': len(labels),
+            'proven_optimal': True
         }
         
         return path, stats
     
-    def _get_energy_gain_rate(self, health: str) -> float:
-        """Calcula cuánta energía gana por kg de pasto según salud"""
-        rates = {
-            'Excelente': 5.0,
-            'Buena': 3.0,
-            'Mala': 2.0,
-            'Moribundo': 1.0,
-            'Muerto': 0.0
+    def _no_survivable_route(self, origin: int, nodes_expanded: int, labels_created: int,
+                             proven_optimal: bool) -> Tuple[List[int], Dict]:
+        """
+        Resultado cuando no se encontró una ruta sobrevivible al destino.
+        proven_optimal es False si la búsqueda se detuvo por el límite de etiquetas.
+        """
+        return [origin], {
+            'stars_visited': 1,
+            'total_distance': 0,
+            'total_energy_consumed': 0,
+            'total_grass_consumed': 0,
+            'final_energy': self.initial_state.energy,
+            'final_age': self.initial_state.age,
+            'final_grass': self.initial_state.grass,
+            'is_alive': True,
+            'algorithm': 'Ruta Sobrevivible - Sin camino',
+            'destination_reached': False,
+            'nodes_expanded': nodes_expanded,
+            'labels_created': labels_created,
+            'proven_optimal': proven_optimal
         }
-        return rates.get(health, 0.0)
     
-    def _calculate_health_from_energy(self, energy: float) -> str:
-        """Determina el estado de salud según el nivel de energía"""
-        if energy >= 75:
-            return 'Excelente'
-        elif energy >= 50:
-            return 'Buena'
-        elif energy >= 25:
-            return 'Mala'
-        elif energy > 0:
-            return 'Moribundo'
-        else:
-            return 'Muerto'
+    def _append_final_star(self, origin: int, best_route: List[int], best_stats: Dict):
+        """
+        Si el burro terminó vivo (no murió), intenta agregar UNA estrella más
+        aunque sea mortal. Modifica best_route y best_stats en el lugar.
+        """
+        if best_stats['cause_of_death'] is None and best_stats['final_energy'] > 0:
+            last_star = best_route[-1] if best_route else origin
+            neighbors = self.graph.get_neighbors_unblocked(last_star)
+            visited_stars = set(best_route)
+            
+            # Buscar el vecino más cercano no visitado
+            closest_neighbor = None
+            closest_distance = float('inf')
+            
+            for neighbor_id, distance in neighbors:
+                if neighbor_id not in visited_stars and distance < closest_distance:
+                    closest_neighbor = neighbor_id
+                    closest_distance = distance
+            
+            # Si encontró un vecino, agregarlo a la ruta (será la estrella mortal).
+            # El estado del burro al final de la ruta se reconstruye con las mismas
+            # reglas de la búsqueda y la simulación
+            if closest_neighbor is not None:
+                model = self.model
+                star_index = self.graph.star_index
+                energy, grass = self.initial_state.energy, self.initial_state.grass
+                age, death_age = self.initial_state.age, self.initial_state.death_age
+                for from_id, to_id in zip(best_route, best_route[1:]):
+                    energy, grass, age, death_age = model.arrive(
+                        energy, grass, age, death_age, self.graph.edge_weight(from_id, to_id), star_index[to_id]
+                    )[1:5]
+                action, energy, _, age, _ = model.arrive(
+                    energy, grass, age, death_age, closest_distance, star_index[closest_neighbor]
+                )[:5]
+                
+                if action == energy_model.DEATH_BY_AGE:
+                    cause_of_death = 'age'
+                elif action in (energy_model.DEATH_BY_ENERGY_TRAVEL, energy_model.DEATH_BY_ENERGY_RESEARCH,
+                                energy_model.DEATH_BY_ENERGY):
+                    cause_of_death = 'energy'
+                else:
+                    cause_of_death = None
+                
+                best_route.append(closest_neighbor)
+                best_stats['final_energy'] = max(0, energy)
+                best_stats['final_age'] = age
+                best_stats['total_distance'] += closest_distance
+                best_stats['stars_visited'] += 1
+                best_stats['is_alive'] = cause_of_death is None
+                best_stats['cause_of_death'] = cause_of_death
+
+
+# ===== PROCESOS DE LA BÚSQUEDA PARALELA =====
+
+_worker_optimizer: Optional[RouteOptimizer] = None
+_worker_shared_best = None
+_worker_cancel_event = None
+_worker_shared_nodes = None
+
+
+def _init_max_stars_worker(graph: SpaceGraph, initial_state: DonkeyState, shared_best,
+                           cancel_event=None, shared_nodes=None):
+    """Inicializa un proceso con su copia del grafo (se envía una sola vez)"""
+    global _worker_optimizer, _worker_shared_best, _worker_cancel_event, _worker_shared_nodes
+    _worker_optimizer = RouteOptimizer(graph, initial_state)
+    _worker_shared_best = shared_best
+    _worker_cancel_event = cancel_event
+    _worker_shared_nodes = shared_nodes
+
+
+def _search_max_stars_prefix(prefix: tuple, deadline: Optional[float]) -> Tuple[List[int], Dict]:
+    """Explora el subárbol de una ruta parcial dentro de un proceso"""
+    route, energy, age, grass, death_age, distance = prefix
+    local_deadline = None
+    if deadline is not None:
+        local_deadline = time.perf_counter() + max(0.0, deadline - time.time())
+    
+    # Suma las estrellas expandidas al contador compartido entre procesos
+    progress = None
+    if _worker_shared_nodes is not None:
+        reported = 0
+        
+        def progress(nodes_expanded: int, best_stars: int):
+            nonlocal reported
+            with _worker_shared_nodes.get_lock():
+                _worker_shared_nodes.value += nodes_expanded - reported
+            reported = nodes_expanded
+    
+    return _worker_optimizer._search_max_stars(
+        route, energy, age, grass, death_age, distance, local_deadline, _worker_shared_best,
+        progress=progress, cancel_event=_worker_cancel_event
+    )
@@ -0,0 +1,244 @@
+"""
+Simulación vectorizada de muchas trayectorias del burro a la vez
+"""
+import itertools
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+
+from app.models import DonkeyState, Health
+from app.graph_logic import SpaceGraph
+from app.simulation import DonkeySimulation, StepHistory
+from app import energy_model
+from app.energy_model import EnergyModel
+
+
+class BatchSimulator:
+    """
+    Simula miles de trayectorias en paralelo con arreglos de NumPy (energía, pasto,
+    edad y edad de muerte por trayectoria), avanzando todas un paso a la vez.
+    
+    Cada paso usa EnergyModel.arrive_batch, la variante vectorizada de las reglas
+    de DonkeySimulation.next_step, así que los resultados coinciden con la
+    simulación paso a paso. Las trayectorias que pasan por un camino bloqueado
+    (donde la simulación recalcula la ruta) se simulan con DonkeySimulation.replay.
+    """
+    
+    # Códigos de salud y acciones compartidos con el historial de la simulación
+    HEALTH_STATES = StepHistory.HEALTH_STATES
+    ACTIONS = StepHistory.ACTIONS
+    
+    _DEAD = energy_model.DEAD
+    _ACTION_CODES = {action: code for code, action in enumerate(StepHistory.ACTIONS)}
+    
+    def __init__(self, graph: SpaceGraph):
+        self.graph = graph
+    
+    def _star_lookup(self):
+        """Ids de estrella ordenados y el índice denso de cada uno"""
+        return self.graph.cached('batch_star_lookup', self._build_star_lookup)
+    
+    def _build_star_lookup(self):
+        star_ids = np.asarray(self.graph.star_ids, dtype=np.int64)
+        order = np.argsort(star_ids)
+        return star_ids[order], order
+    
+    def _edge_lookup(self):
+        """Claves (origen * n + destino) ordenadas de las conexiones y sus distancias"""
+        return self.graph.cached('batch_edge_lookup', self._build_edge_lookup)
+    
+    def _build_edge_lookup(self):
+        graph = self.graph
+        star_count = len(graph.star_ids)
+        offsets = np.asarray(graph.csr_offsets, dtype=np.int64)
+        sources = np.repeat(np.arange(star_count, dtype=np.int64), np.diff(offsets))
+        keys = sources * star_count + np.asarray(graph.csr_targets, dtype=np.int64)
+        order = np.argsort(keys)
+        
+        blocked_keys = [
+            graph.star_index[from_id] * star_count + graph.star_index[to_id]
+            for from_id, to_id in graph.blocked_paths
+            if from_id in graph.star_index and to_id in graph.star_index
+        ]
+        return keys[order], np.asarray(graph.csr_weights)[order], np.array(blocked_keys, dtype=np.int64)
+    
+    def simulate(self, routes: Sequence[Sequence[int]], energy=None, grass=None, age=None,
+                 death_age=None) -> Dict[str, np.ndarray]:
+        """
+        Simula una trayectoria por ruta.
+        
+        Las condiciones iniciales (energía, pasto, edad y edad de muerte) pueden ser
+        un número o un arreglo con un valor por trayectoria; por defecto se usan las
+        de los datos cargados. Así se evalúan muchas rutas candidatas, o una misma
+        ruta con condiciones iniciales aleatorias.
+        
+        Retorna arreglos con un valor por trayectoria: los campos del resumen de la
+        simulación ('total_steps', 'stars_visited', 'final_energy', 'final_health'
+        como código de Health, 'remaining_grass', 'age', 'death_age',
+        'remaining_life', 'is_alive'), 'completed_route' (llegó vivo a la última
+        estrella) y 'death_action' (código de ACTIONS).
+        """
+        graph = self.graph
+        data = graph.data
+        n = len(routes)
+        star_count = len(graph.star_ids)
+        
+        energy = self._initial(energy, data.burroenergiaInicial, n)
+        grass = self._initial(grass, data.pasto, n)
+        age = self._initial(age, data.startAge, n)
+        death_age = self._initial(death_age, data.deathAge, n)
+        
+        lengths = np.array([len(route) for route in routes], dtype=np.int64)
+        if n and lengths.min() == 0:
+            raise ValueError("Las rutas deben tener al menos una estrella")
+        max_length = int(lengths.max()) if n else 0
+        
+        # Índices densos de las estrellas de cada ruta (relleno con la estrella 0)
+        star_ids = np.fromiter(itertools.chain.from_iterable(routes), dtype=np.int64, count=int(lengths.sum()))
+        sorted_ids, sorted_indices = self._star_lookup()
+        positions = np.minimum(np.searchsorted(sorted_ids, star_ids), len(sorted_ids) - 1)
+        unknown = sorted_ids[positions] != star_ids
+        if unknown.any():
+            raise ValueError(f"La estrella {star_ids[unknown][0]} no existe")
+        
+        in_route = np.arange(max_length) < lengths[:, None]
+        indices = np.zeros((n, max_length), dtype=np.int64)
+        indices[in_route] = sorted_indices[positions]
+        
+        # Distancia de cada tramo (0 si las estrellas no están conectadas, como edge_weight)
+        keys = indices[:, :-1] * star_count + indices[:, 1:]
+        edge_keys, edge_weights, blocked_keys = self._edge_lookup()
+        positions = np.minimum(np.searchsorted(edge_keys, keys), max(len(edge_keys) - 1, 0))
+        if len(edge_keys):
+            found = edge_keys[positions] == keys
+            distances = np.where(found, edge_weights[positions], 0.0)
+        else:
+            distances = np.zeros(keys.shape)
+        
+        # Tramos reales (dentro de la ruta) que pasan por un camino bloqueado
+        legs = in_route[:, 1:]
+        fallback = np.zeros(n, dtype=bool)
+        if len(blocked_keys):
+            fallback = (np.isin(keys, blocked_keys) & legs).any(axis=1)
+        
+        # Condiciones iniciales de las trayectorias que se simulan paso a paso
+        initial = {
+            row: (energy[row], grass[row], age[row], death_age[row]) for row in np.flatnonzero(fallback)
+        }
+        
+        model = EnergyModel.for_graph(graph)
+        
+        alive = np.ones(n, dtype=bool)
+        health = np.full(n, -1, dtype=np.int64)  # -1: sin cambios respecto al estado inicial
+        death_action = np.full(n, -1, dtype=np.int64)
+        stars_visited = np.ones(n, dtype=np.int64)
+        total_steps = np.ones(n, dtype=np.int64)
+        
+        for step in range(1, max_length):
+            active = np.flatnonzero(alive & (lengths > step))
+            if not len(active):
+                break
+            
+            total_steps[active] += 1
+            action, energy[active], grass[active], age[active], death_age[active], health[active] = (
+                model.arrive_batch(energy[active], grass[active], age[active], death_age[active],
+                                   distances[active, step - 1], indices[active, step])
+            )
+            
+            # Las muertes en el viaje no llegan a la estrella
+            dead = action >= energy_model.DEATH_BY_ENERGY_TRAVEL
+            arrived = (action != energy_model.DEATH_BY_ENERGY_TRAVEL) & (action != energy_model.DEATH_BY_AGE)
+            stars_visited[active] += arrived
+            alive[active] = ~dead
+            death_action[active] = np.where(dead, action, death_action[active])
+        
+        # Al terminar la ruta con vida el burro muere por agotamiento (paso extra)
+        completed_route = alive.copy()
+        exhausted = alive & (energy > 0)
+        energy[exhausted] = 0
+        health[exhausted] = self._DEAD
+        death_action[exhausted] = self._ACTION_CODES['death_by_exhaustion']
+        total_steps[exhausted] += 1
+        alive[exhausted] = False
+        
+        result = {
+            'total_steps': total_steps,
+            'stars_visited': stars_visited,
+            'final_energy': energy,
+            'final_health': health,
+            'remaining_grass': grass,
+            'age': age,
+            'death_age': death_age,
+            'remaining_life': np.maximum(0, death_age - age),
+            'is_alive': alive,
+            'completed_route': completed_route,
+            'death_action': death_action
+        }
+        
+        for row, values in initial.items():
+            self._replay_one(result, row, routes[row], *values)
+        
+        return result
+    
+    def summaries(self, result: Dict[str, np.ndarray], initial_health: Optional[Health] = None) -> List[Dict]:
+        """
+        Convierte el resultado de simulate en resúmenes como los de
+        DonkeySimulation.get_summary ('final_health' como Health) con el nombre de la
+        acción de muerte
+        """
+        if initial_health is None:
+            initial_health = Health.from_label(self.graph.data.estadoSalud)
+        summaries = []
+        for row in range(len(result['total_steps'])):
+            health_code = int(result['final_health'][row])
+            action_code = int(result['death_action'][row])
+            summaries.append({
+                'total_steps': int(result['total_steps'][row]),
+                'stars_visited': int(result['stars_visited'][row]),
+                'final_energy': float(result['final_energy'][row]),
+                'final_health': energy_model.HEALTH_CODES[health_code] if health_code >= 0 else initial_health,
+                'remaining_grass': float(result['remaining_grass'][row]),
+                'age': float(result['age'][row]),
+                'remaining_life': float(result['remaining_life'][row]),
+                'is_alive': bool(result['is_alive'][row]),
+                'completed_route': bool(result['completed_route'][row]),
+                'death_action': self.ACTIONS[action_code] if action_code >= 0 else None
+            })
+        return summaries
+    
+    def _replay_one(self, result: Dict[str, np.ndarray], row: int, route: Sequence[int],
+                    energy: float, grass: float, age: float, death_age: float):
+        """Simula una trayectoria con DonkeySimulation (rutas con caminos bloqueados)"""
+        initial_state = DonkeyState.model_construct(
+            current_star_id=route[0],
+            energy=float(energy),
+            health=Health.from_label(self.graph.data.estadoSalud),
+            grass=float(grass),
+            age=float(age),
+            death_age=float(death_age),
+            visited_stars=[],
+            is_alive=True
+        )
+        simulation = DonkeySimulation(self.graph, list(route), initial_state, keep_messages=False)
+        summary = simulation.replay()
+        
+        history = simulation.history
+        actions = [StepHistory.ACTIONS[code] for code in history.action]
+        result['total_steps'][row] = summary['total_steps']
+        result['stars_visited'][row] = summary['stars_visited']
+        result['final_energy'][row] = summary['final_energy']
+        result['final_health'][row] = summary['final_health']
+        result['remaining_grass'][row] = summary['remaining_grass']
+        result['age'][row] = summary['age']
+        result['death_age'][row] = simulation.state.death_age
+        result['remaining_life'][row] = summary['remaining_life']
+        result['is_alive'][row] = summary['is_alive']
+        result['completed_route'][row] = summary['is_alive'] or actions[-1:] == ['death_by_exhaustion']
+        deaths = [action for action in actions if action.startswith('death_by')]
+        result['death_action'][row] = self._ACTION_CODES[deaths[-1]] if deaths else -1
+    
+    @staticmethod
+    def _initial(value, default: float, n: int) -> np.ndarray:
+        """Condición inicial como arreglo de n valores (copia, se modifica en la simulación)"""
+        if value is None:
+            value = default
+        return np.array(np.broadcast_to(np.asarray(value, dtype=float), (n,)))
@@ -0,0 +1,196 @@
+"""
+Modelo de energía del burro: las reglas de un paso del viaje, compartidas por la
+simulación y los algoritmos de rutas
+"""
+import numpy as np
+from typing import Tuple
+
+from app.models import Health
+from app.graph_logic import SpaceGraph
+
+
+# Estados de salud por código y energía ganada por kg de pasto en cada uno
+HEALTH_STATES = tuple(health.label for health in Health)
+HEALTH_CODES = tuple(Health)
+GAIN_RATES = (5.0, 3.0, 2.0, 1.0, 0.0)
+EXCELLENT, GOOD, POOR, DYING, DEAD = HEALTH_CODES
+
+# Acciones de un paso de la simulación (el código es la posición)
+ACTIONS = (
+    'start', 'travel', 'eat_and_research', 'hypergiant_boost', 'route_recalculated',
+    'death_by_energy_travel', 'death_by_age', 'death_by_energy_research',
+    'death_by_energy', 'death_by_blocked_path', 'death_by_exhaustion'
+)
+(START, TRAVEL, EAT_AND_RESEARCH, HYPERGIANT_BOOST, ROUTE_RECALCULATED,
+ DEATH_BY_ENERGY_TRAVEL, DEATH_BY_AGE, DEATH_BY_ENERGY_RESEARCH,
+ DEATH_BY_ENERGY, DEATH_BY_BLOCKED_PATH, DEATH_BY_EXHAUSTION) = range(len(ACTIONS))
+
+# Factor de consumo de energía por año luz viajado
+# 0.1 = 0.1% de energía por año luz (120 años luz = 12% energía)
+ENERGY_CONSUMPTION_PER_LIGHT_YEAR = 0.1
+
+# El burro come solo si su energía queda por debajo de este porcentaje
+HUNGER_THRESHOLD = 50
+
+# Recarga de las estrellas hipergigantes: energía x1.5 (máximo 100%) y pasto x2
+HYPERGIANT_ENERGY_FACTOR = 1.5
+HYPERGIANT_GRASS_FACTOR = 2
+MAX_ENERGY = 100
+
+_GAIN_RATES_ARRAY = np.array(GAIN_RATES)
+
+
+def health_code(energy: float) -> Health:
+    """Estado de salud para un nivel de energía"""
+    if energy >= 75:
+        return EXCELLENT
+    elif energy >= 50:
+        return GOOD
+    elif energy >= 25:
+        return POOR
+    elif energy > 0:
+        return DYING
+    else:
+        return DEAD
+
+
+def health_codes(energy: np.ndarray) -> np.ndarray:
+    """Código de salud para cada nivel de energía de un arreglo (como health_code)"""
+    return np.select(
+        [energy >= 75, energy >= 50, energy >= 25, energy > 0],
+        [EXCELLENT, GOOD, POOR, DYING],
+        DEAD
+    )
+
+
+class EnergyModel:
+    """
+    Reglas de un paso del viaje hacia una estrella: consumo por distancia,
+    investigación, cambio de vida, comida (solo con energía < 50%) y recarga de
+    estrellas hipergigantes.
+    
+    Las constantes de cada estrella (costo de investigación, cambio neto de vida,
+    kg que alcanza a comer y si es hipergigante) se precalculan en arreglos por
+    índice denso (graph.star_index), así que avanzar un estado no consulta
+    diccionarios ni compara nombres de salud. Es la única implementación de las
+    reglas: la usan DonkeySimulation, BatchSimulator y RouteOptimizer.
+    """
+    
+    def __init__(self, graph: SpaceGraph):
+        stars = [graph.get_star(star_id) for star_id in graph.star_ids]
+        
+        # Listas para el paso escalar (indexar una lista es más rápido que un arreglo)
+        self.research = [float(star.amountOfEnergy) for star in stars]
+        self.life_change = [float(star.lifeYearsGained - star.lifeYearsLost) for star in stars]
+        # 50% del tiempo en la estrella se dedica a comer → máximo 1 kg
+        self.max_kg = [star.timeToEat / star.timeToEat for star in stars]
+        self.hypergiant = [bool(star.hypergiant) for star in stars]
+        
+        # Arreglos para el paso vectorizado
+        self.research_array = np.array(self.research, dtype=float)
+        self.life_change_array = np.array(self.life_change, dtype=float)
+        self.max_kg_array = np.array(self.max_kg, dtype=float)
+        self.hypergiant_array = np.array(self.hypergiant, dtype=bool)
+    
+    @classmethod
+    def for_graph(cls, graph: SpaceGraph) -> 'EnergyModel':
+        """Modelo del grafo (se reconstruye cuando cambia la versión del grafo)"""
+        return graph.cached('energy_model', lambda: cls(graph))
+    
+    def arrive(self, energy: float, grass: float, age: float, death_age: float,
+               distance: float, index: int) -> Tuple[int, float, float, float, float, Health, float, float]:
+        """
+        Aplica un paso del viaje hacia la estrella de índice denso 'index'.
+        
+        Retorna (acción, energía, pasto, edad, edad de muerte, salud, kg comidos,
+        energía por kg), con la acción como código de ACTIONS y la salud como
+        Health. Si el burro muere en el viaje o en la investigación, la energía es
+        la que tenía al morir y el pasto y la edad de muerte no cambian.
+        """
+        energy -= distance * ENERGY_CONSUMPTION_PER_LIGHT_YEAR
+        age += distance
+        
+        # Muerte en el viaje por falta de energía o por edad
+        if energy <= 0:
+            return DEATH_BY_ENERGY_TRAVEL, energy, grass, age, death_age, DEAD, 0.0, 0.0
+        if age >= death_age:
+            return DEATH_BY_AGE, energy, grass, age, death_age, DEAD, 0.0, 0.0
+        
+        # Investigación
+        energy -= self.research[index]
+        if energy <= 0:
+            return DEATH_BY_ENERGY_RESEARCH, energy, grass, age, death_age, DEAD, 0.0, 0.0
+        
+        death_age += self.life_change[index]
+        
+        # Comer si la energía es menor al 50%
+        action = TRAVEL
+        kg_eaten = 0.0
+        gain_rate = 0.0
+        if energy < HUNGER_THRESHOLD and grass > 0:
+            gain_rate = GAIN_RATES[health_code(energy)]
+            kg_desired = (HUNGER_THRESHOLD - energy) / gain_rate if gain_rate > 0 else 0
+            kg_eaten = min(self.max_kg[index], kg_desired, grass)
+            energy += kg_eaten * gain_rate
+            grass -= kg_eaten
+            action = EAT_AND_RESEARCH
+        
+        health = health_code(energy)
+        if health == DEAD:
+            return DEATH_BY_ENERGY, energy, grass, age, death_age, DEAD, kg_eaten, gain_rate
+        
+        # Recarga de estrella hipergigante
+        if self.hypergiant[index]:
+            energy = min(MAX_ENERGY, energy * HYPERGIANT_ENERGY_FACTOR)
+            grass *= HYPERGIANT_GRASS_FACTOR
+            action = HYPERGIANT_BOOST
+        
+        return action, energy, grass, age, death_age, health, kg_eaten, gain_rate
+    
+    def arrive_batch(self, energy: np.ndarray, grass: np.ndarray, age: np.ndarray,
+                     death_age: np.ndarray, distance: np.ndarray,
+                     index: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """
+        Variante vectorizada de arrive: un paso por trayectoria, con las mismas
+        operaciones en el mismo orden (los resultados coinciden con arrive).
+        
+        Retorna arreglos (acción, energía, pasto, edad, edad de muerte, salud).
+        """
+        energy = energy - distance * ENERGY_CONSUMPTION_PER_LIGHT_YEAR
+        age = age + distance
+        
+        dead_travel = energy <= 0
+        dead_age = ~dead_travel & (age >= death_age)
+        arrived = ~(dead_travel | dead_age)
+        
+        # Investigación
+        energy = np.where(arrived, energy - self.research_array[index], energy)
+        dead_research = arrived & (energy <= 0)
+        survived = arrived & ~dead_research
+        
+        # Cambio de vida y comida si la energía quedó por debajo del 50%
+        death_age = np.where(survived, death_age + self.life_change_array[index], death_age)
+        eats = survived & (energy < HUNGER_THRESHOLD) & (grass > 0)
+        rate = _GAIN_RATES_ARRAY[health_codes(energy)]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            kg_desired = np.where(rate > 0, (HUNGER_THRESHOLD - energy) / rate, 0.0)
+        kg_eaten = np.minimum(np.minimum(self.max_kg_array[index], kg_desired), grass)
+        energy = np.where(eats, energy + kg_eaten * rate, energy)
+        grass = np.where(eats, grass - kg_eaten, grass)
+        
+        health = health_codes(energy)
+        dead_energy = survived & (health == DEAD)
+        
+        # Recarga de estrella hipergigante
+        boosted = survived & ~dead_energy & self.hypergiant_array[index]
+        energy = np.where(boosted, np.minimum(MAX_ENERGY, energy * HYPERGIANT_ENERGY_FACTOR), energy)
+        grass = np.where(boosted, grass * HYPERGIANT_GRASS_FACTOR, grass)
+        
+        action = np.select(
+            [dead_travel, dead_age, dead_research, dead_energy, boosted, eats],
+            [DEATH_BY_ENERGY_TRAVEL, DEATH_BY_AGE, DEATH_BY_ENERGY_RESEARCH, DEATH_BY_ENERGY,
+             HYPERGIANT_BOOST, EAT_AND_RESEARCH],
+            TRAVEL
+        )
+        health = np.where(survived & ~dead_energy, health, DEAD)
+        return action, energy, grass, age, death_age, health
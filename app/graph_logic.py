@@ -1,22 +1,81 @@
 """
 Construcción y gestión del grafo espacial usando NetworkX
 """
+import heapq
+import math
 import networkx as nx
-from typing import Dict, List, Tuple, Set
+import numpy as np
+from array import array
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Tuple, Set, Optional
 from app.models import ConstellationData, Star, Constellation
 
 
 class SpaceGraph:
     """Grafo que representa el espacio de constelaciones"""
     
+    # Máximo de árboles de caminos más cortos (uno por origen) guardados en caché
+    PATH_CACHE_SIZE = 32
+    
+    # Hasta este número de estrellas la matriz de distancias se calcula al cargar
+    # el archivo; en grafos más grandes se calcula en la primera consulta
+    ALL_PAIRS_PRECOMPUTE_MAX_STARS = 300
+    
     def __init__(self, data: ConstellationData):
         self.data = data
         self.graph = nx.Graph()
         self.stars_dict: Dict[int, Star] = {}
         self.constellation_map: Dict[int, List[str]] = {}  # star_id -> [constellation_names]
         self.blocked_paths: Set[Tuple[int, int]] = set()  # Caminos bloqueados
+        
+        # Representación compacta CSR (compressed sparse row) de las conexiones:
+        # los vecinos de la estrella con índice i ocupan las posiciones
+        # csr_offsets[i]:csr_offsets[i + 1] de csr_targets / csr_weights
+        self.star_ids: List[int] = []  # índice denso -> star_id
+        self.star_index: Dict[int, int] = {}  # star_id -> índice denso
+        self.csr_offsets = array('q')
+        self.csr_targets = array('q')  # índice denso del vecino
+        self.csr_target_ids = array('q')  # star_id del vecino
+        self.csr_weights = array('d')  # distancia (años luz)
+        self.csr_blocked = bytearray()  # 1 si la conexión en esa posición está bloqueada
+        
+        # Coordenadas por índice denso y escala de la heurística de A*
+        # (None si los datos no permiten una heurística admisible)
+        self.star_x = array('d')
+        self.star_y = array('d')
+        self.heuristic_scale: Optional[float] = None
+        
+        # Versión del grafo: aumenta con cada bloqueo, desbloqueo o cambio de efectos.
+        # Caché LRU de árboles de Dijkstra: (origen, versión) -> (distancias, predecesores).
+        # Al bloquear o desbloquear una conexión los árboles se reparan en lugar de descartarse
+        self.version = 0
+        self._path_cache: OrderedDict = OrderedDict()
+        
+        # Matrices de todos los pares indexadas por índice denso: distancia más corta
+        # y predecesor de la columna en el camino desde la fila (-1 si no hay camino).
+        # Se recalculan al consultarlas si cambió la versión del grafo
+        self.distance_matrix: Optional[np.ndarray] = None
+        self.predecessor_matrix: Optional[np.ndarray] = None
+        self._matrix_version = -1
+        
+        # Datos derivados para los algoritmos: nombre -> (versión, valor)
+        self._derived_cache: Dict[str, Tuple[int, Any]] = {}
+        
         self._build_graph()
     
+    def __getstate__(self) -> Dict:
+        """
+        Estado para serializar el grafo (procesos de cálculo de rutas): las cachés
+        de caminos y las matrices de distancias no se copian, se recalculan si se usan
+        """
+        state = self.__dict__.copy()
+        state['_path_cache'] = OrderedDict()
+        state['distance_matrix'] = None
+        state['predecessor_matrix'] = None
+        state['_matrix_version'] = -1
+        state['_derived_cache'] = {}
+        return state
+    
     def _build_graph(self):
         """Construye el grafo a partir de los datos JSON"""
         # Primera pasada: agregar todos los nodos (estrellas)
@@ -65,6 +124,80 @@ class SpaceGraph:
                             link.starId,
                             weight=link.distance
                         )
+        
+        self._build_csr()
+    
+    def _build_csr(self):
+        """Construye los arreglos CSR a partir del grafo de NetworkX"""
+        self.star_ids = list(self.graph.nodes())
+        self.star_index = {star_id: index for index, star_id in enumerate(self.star_ids)}
+        
+        self.csr_offsets = array('q', [0])
+        self.csr_targets = array('q')
+        self.csr_target_ids = array('q')
+        self.csr_weights = array('d')
+        
+        for star_id in self.star_ids:
+            for neighbor_id, edge_data in self.graph.adj[star_id].items():
+                self.csr_targets.append(self.star_index[neighbor_id])
+                self.csr_target_ids.append(neighbor_id)
+                self.csr_weights.append(edge_data['weight'])
+            self.csr_offsets.append(len(self.csr_targets))
+        
+        self.csr_blocked = bytearray(len(self.csr_targets))
+        self._build_heuristic()
+    
+    def _build_heuristic(self):
+        """
+        Calcula la escala de la heurística euclidiana de A*.
+        
+        La escala es la menor razón distancia / distancia euclidiana entre los extremos
+        de cada conexión, así scale * euclidiana(v, destino) nunca supera la distancia
+        real restante (admisible y consistente). Si alguna estrella no tiene
+        coordenadas o no hay una escala positiva y finita, A* usa Dijkstra.
+        """
+        self.star_x = array('d')
+        self.star_y = array('d')
+        self.heuristic_scale = None
+        
+        for star_id in self.star_ids:
+            node = self.graph.nodes[star_id]
+            if 'x' not in node or 'y' not in node:
+                return
+            self.star_x.append(node['x'])
+            self.star_y.append(node['y'])
+        
+        scale = float('inf')
+        for index in range(len(self.star_ids)):
+            for position in range(self.csr_offsets[index], self.csr_offsets[index + 1]):
+                neighbor = self.csr_targets[position]
+                euclidean = math.hypot(self.star_x[index] - self.star_x[neighbor],
+                                       self.star_y[index] - self.star_y[neighbor])
+                if euclidean > 0:
+                    scale = min(scale, self.csr_weights[position] / euclidean)
+        
+        if 0 < scale < float('inf'):
+            self.heuristic_scale = scale
+    
+    def _edge_position(self, from_id: int, to_id: int) -> int:
+        """
+        Posición CSR de la conexión from_id -> to_id (-1 si no existe). Se busca en
+        la fila de from_id en lugar de un índice por conexión: las filas son cortas
+        y el índice ocupaba más memoria que los arreglos CSR
+        """
+        index = self.star_index.get(from_id)
+        if index is None:
+            return -1
+        try:
+            return self.csr_target_ids.index(to_id, self.csr_offsets[index], self.csr_offsets[index + 1])
+        except ValueError:
+            return -1
+    
+    def _set_blocked(self, from_id: int, to_id: int, blocked: bool):
+        """Marca ambas direcciones de una conexión en la máscara de bloqueos"""
+        for position in (self._edge_position(from_id, to_id), self._edge_position(to_id, from_id)):
+            if position >= 0:
+                self.csr_blocked[position] = 1 if blocked else 0
     
     def get_star(self, star_id: int) -> Star:
         """Obtiene una estrella por su ID"""
@@ -72,15 +205,26 @@ class SpaceGraph:
     
     def get_neighbors(self, star_id: int) -> List[Tuple[int, float]]:
         """Obtiene los vecinos de una estrella con sus distancias"""
-        if star_id not in self.graph:
+        index = self.star_index.get(star_id)
+        if index is None:
             return []
         
-        neighbors = []
-        for neighbor_id in self.graph.neighbors(star_id):
-            distance = self.graph[star_id][neighbor_id]['weight']
-            neighbors.append((neighbor_id, distance))
-        
-        return neighbors
+        start, end = self.csr_offsets[index], self.csr_offsets[index + 1]
+        return list(zip(self.csr_target_ids[start:end], self.csr_weights[start:end]))
+    
+    def has_edge(self, from_id: int, to_id: int) -> bool:
+        """Verifica si existe una conexión directa entre dos estrellas"""
+        return self._edge_position(from_id, to_id) >= 0
+    
+    def edge_weight(self, from_id: int, to_id: int, default: float = 0.0) -> float:
+        """
+        Obtiene la distancia de la conexión directa from_id -> to_id
+        (default si no existe)
+        """
+        position = self._edge_position(from_id, to_id)
+        if position < 0:
+            return default
+        return self.csr_weights[position]
     
     def get_shared_stars(self) -> Set[int]:
         """Identifica estrellas que pertenecen a múltiples constelaciones"""
@@ -166,29 +310,324 @@ class SpaceGraph:
         respetando los caminos bloqueados.
         Retorna (path, total_distance)
         """
-        # Si no hay caminos bloqueados, usar NetworkX directamente
-        if not self.blocked_paths:
-            try:
-                path = nx.shortest_path(self.graph, source, target, weight='weight')
-                distance = nx.shortest_path_length(self.graph, source, target, weight='weight')
-                return path, distance
-            except nx.NetworkXNoPath:
-                return [], float('inf')
+        path, distance, _ = self.search_path(source, target)
+        return path, distance
+    
+    def search_path(self, source: int, target: int,
+                    use_astar: bool = False) -> Tuple[List[int], float, int]:
+        """
+        Busca el camino más corto con Dijkstra o, si use_astar es True y los datos lo
+        permiten (heuristic_scale), con A* guiado por las coordenadas de las estrellas.
+        Dijkstra calcula el árbol completo del origen y lo guarda en caché hasta que
+        cambie la versión del grafo.
+        Retorna (path, total_distance, estrellas expandidas)
+        """
+        source_index = self.star_index.get(source)
+        target_index = self.star_index.get(target)
+        if source_index is None or target_index is None:
+            return [], float('inf'), 0
         
-        # Si hay caminos bloqueados, crear una vista del grafo sin esas aristas
-        # Crear lista de aristas bloqueadas
-        blocked_edges = [(from_id, to_id) for from_id, to_id in self.blocked_paths]
+        # Un árbol en caché responde cualquier destino sin volver a buscar; A* solo
+        # se ejecuta si no hay árbol para el origen
+        cached = self._path_cache.get((source_index, self.version))
+        if cached is not None or not use_astar or self.heuristic_scale is None:
+            distances, predecessors, expanded = self._shortest_path_tree(source_index)
+        else:
+            distances, predecessors, expanded = self._run_dijkstra(
+                source_index, target_index, self.heuristic_scale
+            )
         
-        # Crear una copia del grafo sin las aristas bloqueadas
-        temp_graph = self.graph.copy()
-        temp_graph.remove_edges_from(blocked_edges)
+        if distances[target_index] == float('inf'):
+            return [], float('inf'), expanded
         
-        try:
-            path = nx.shortest_path(temp_graph, source, target, weight='weight')
-            distance = nx.shortest_path_length(temp_graph, source, target, weight='weight')
-            return path, distance
-        except nx.NetworkXNoPath:
-            return [], float('inf')
+        # Reconstruir el camino desde el destino
+        path = []
+        index = target_index
+        while index != -1:
+            path.append(self.star_ids[index])
+            index = predecessors[index]
+        path.reverse()
+        
+        return path, distances[target_index], expanded
+    
+    def shortest_distances(self, source: int) -> Dict[int, float]:
+        """
+        Calcula con Dijkstra la distancia más corta desde una estrella a todas las
+        estrellas alcanzables, respetando los caminos bloqueados.
+        Retorna {star_id: distancia}
+        """
+        source_index = self.star_index.get(source)
+        if source_index is None:
+            return {}
+        
+        distances, _, _ = self._shortest_path_tree(source_index)
+        return {
+            self.star_ids[index]: distance
+            for index, distance in enumerate(distances)
+            if distance != float('inf')
+        }
+    
+    def _shortest_path_tree(self, source_index: int) -> Tuple[List[float], List[int], int]:
+        """
+        Árbol de caminos más cortos desde una posición, guardado en la caché LRU.
+        Retorna (distancias, predecesores, estrellas expandidas); las expandidas
+        son 0 si el árbol ya estaba en caché.
+        """
+        key = (source_index, self.version)
+        cached = self._path_cache.get(key)
+        if cached is not None:
+            self._path_cache.move_to_end(key)
+            return cached[0], cached[1], 0
+        
+        distances, predecessors, expanded = self._run_dijkstra(source_index)
+        self._path_cache[key] = (distances, predecessors)
+        if len(self._path_cache) > self.PATH_CACHE_SIZE:
+            self._path_cache.popitem(last=False)
+        
+        return distances, predecessors, expanded
+    
+    def cached(self, name: str, builder: Callable[[], Any]) -> Any:
+        """
+        Datos derivados del grafo (por ejemplo tablas de cotas de los algoritmos),
+        calculados con builder() una sola vez por versión del grafo
+        """
+        entry = self._derived_cache.get(name)
+        if entry is None or entry[0] != self.version:
+            entry = (self.version, builder())
+            self._derived_cache[name] = entry
+        return entry[1]
+    
+    def _bump_version(self, from_id: Optional[int] = None, to_id: Optional[int] = None,
+                      blocked: bool = False):
+        """
+        Aumenta la versión del grafo después de modificarlo.
+        
+        Si se indica la conexión from_id - to_id que acaba de bloquearse o
+        desbloquearse, los árboles en caché se reparan de forma incremental y pasan
+        a la nueva versión; si no, solo cambiaron los efectos de las estrellas, que
+        no alteran las distancias, y los árboles se conservan tal cual.
+        """
+        old_version = self.version
+        self.version += 1
+        
+        position = -1 if from_id is None else self._edge_position(from_id, to_id)
+        if position < 0 and self._matrix_version == old_version:
+            self._matrix_version = self.version
+        
+        repaired = OrderedDict()
+        for (source_index, version), (distances, predecessors) in self._path_cache.items():
+            if version != old_version:
+                continue
+            if position >= 0:
+                u, v = self.star_index[from_id], self.star_index[to_id]
+                if blocked:
+                    self._repair_after_block(distances, predecessors, u, v)
+                else:
+                    self._repair_after_unblock(distances, predecessors, u, v,
+                                               self.csr_weights[position])
+            repaired[(source_index, self.version)] = (distances, predecessors)
+        self._path_cache = repaired
+    
+    def _repair_after_block(self, distances: List[float], predecessors: List[int],
+                            u: int, v: int):
+        """
+        Repara un árbol de caminos más cortos después de bloquear la conexión u - v.
+        
+        Solo cambia si la conexión era parte del árbol: el subárbol que colgaba de
+        ella se reinicia y se vuelve a relajar desde sus vecinos fuera del subárbol.
+        """
+        if predecessors[v] == u:
+            root = v
+        elif predecessors[u] == v:
+            root = u
+        else:
+            return
+        
+        offsets = self.csr_offsets
+        targets = self.csr_targets
+        weights = self.csr_weights
+        blocked = self.csr_blocked
+        infinity = float('inf')
+        
+        # Recolectar el subárbol que colgaba de la conexión bloqueada
+        subtree = [root]
+        in_subtree = {root}
+        for index in subtree:
+            for position in range(offsets[index], offsets[index + 1]):
+                neighbor = targets[position]
+                if predecessors[neighbor] == index and neighbor not in in_subtree:
+                    in_subtree.add(neighbor)
+                    subtree.append(neighbor)
+        
+        for index in subtree:
+            distances[index] = infinity
+            predecessors[index] = -1
+        
+        # Mejor entrada de cada estrella del subárbol desde fuera de él
+        heap = []
+        for index in subtree:
+            for position in range(offsets[index], offsets[index + 1]):
+                neighbor = targets[position]
+                if blocked[position] or neighbor in in_subtree:
+                    continue
+                new_distance = distances[neighbor] + weights[position]
+                if new_distance < distances[index]:
+                    distances[index] = new_distance
+                    predecessors[index] = neighbor
+            if distances[index] < infinity:
+                heap.append((distances[index], index))
+        
+        heapq.heapify(heap)
+        self._propagate_distances(distances, predecessors, heap)
+    
+    def _repair_after_unblock(self, distances: List[float], predecessors: List[int],
+                              u: int, v: int, weight: float):
+        """
+        Repara un árbol de caminos más cortos después de desbloquear la conexión u - v,
+        propagando solo las mejoras que la conexión habilita.
+        """
+        heap = []
+        for start, end in ((u, v), (v, u)):
+            new_distance = distances[start] + weight
+            if new_distance < distances[end]:
+                distances[end] = new_distance
+                predecessors[end] = start
+                heap.append((new_distance, end))
+        
+        heapq.heapify(heap)
+        self._propagate_distances(distances, predecessors, heap)
+    
+    def _propagate_distances(self, distances: List[float], predecessors: List[int],
+                             heap: List[Tuple[float, int]]):
+        """Continúa Dijkstra desde las estrellas del heap con distancias ya mejoradas"""
+        offsets = self.csr_offsets
+        targets = self.csr_targets
+        weights = self.csr_weights
+        blocked = self.csr_blocked
+        
+        while heap:
+            distance, index = heapq.heappop(heap)
+            if distance > distances[index]:
+                continue
+            
+            for position in range(offsets[index], offsets[index + 1]):
+                if blocked[position]:
+                    continue
+                neighbor = targets[position]
+                new_distance = distance + weights[position]
+                if new_distance < distances[neighbor]:
+                    distances[neighbor] = new_distance
+                    predecessors[neighbor] = index
+                    heapq.heappush(heap, (new_distance, neighbor))
+    
+    def _run_dijkstra(self, source_index: int, target_index: int = -1,
+                      scale: Optional[float] = None) -> Tuple[List[float], List[int], int]:
+        """
+        Dijkstra (o A* si se da 'scale') sobre los arreglos CSR desde una posición.
+        Se detiene al asentar target_index; con -1 recorre todo el grafo.
+        Retorna (distancias, predecesores, estrellas expandidas) indexados por posición.
+        
+        Recorre los arreglos CSR y omite las conexiones marcadas en la máscara de
+        bloqueos, sin copiar el grafo; el camino y la distancia salen de una sola pasada.
+        """
+        offsets = self.csr_offsets
+        targets = self.csr_targets
+        weights = self.csr_weights
+        blocked = self.csr_blocked
+        infinity = float('inf')
+        
+        if scale is not None:
+            star_x, star_y = self.star_x, self.star_y
+            target_x, target_y = star_x[target_index], star_y[target_index]
+        
+        distances = [infinity] * len(self.star_ids)
+        predecessors = [-1] * len(self.star_ids)
+        settled = bytearray(len(self.star_ids))
+        distances[source_index] = 0.0
+        heap = [(0.0, source_index)]
+        expanded = 0
+        
+        while heap:
+            _, index = heapq.heappop(heap)
+            if settled[index]:
+                continue
+            if index == target_index:
+                break
+            settled[index] = 1
+            expanded += 1
+            distance = distances[index]
+            
+            for position in range(offsets[index], offsets[index + 1]):
+                if blocked[position]:
+                    continue
+                neighbor = targets[position]
+                new_distance = distance + weights[position]
+                if new_distance < distances[neighbor]:
+                    distances[neighbor] = new_distance
+                    predecessors[neighbor] = index
+                    priority = new_distance
+                    if scale is not None:
+                        priority += scale * math.hypot(star_x[neighbor] - target_x,
+                                                       star_y[neighbor] - target_y)
+                    heapq.heappush(heap, (priority, neighbor))
+        
+        return distances, predecessors, expanded
+    
+    def precompute_all_pairs(self):
+        """
+        Calcula las matrices de distancias y predecesores entre todos los pares de
+        estrellas (un Dijkstra sobre los arreglos CSR por estrella), respetando los
+        caminos bloqueados.
+        """
+        count = len(self.star_ids)
+        distances = np.full((count, count), np.inf)
+        predecessors = np.full((count, count), -1, dtype=np.int32)
+        
+        for index in range(count):
+            row_distances, row_predecessors, _ = self._run_dijkstra(index)
+            distances[index] = row_distances
+            predecessors[index] = row_predecessors
+        
+        self.distance_matrix = distances
+        self.predecessor_matrix = predecessors
+        self._matrix_version = self.version
+    
+    def matrix_distance(self, source: int, target: int) -> float:
+        """
+        Distancia más corta entre dos estrellas según la matriz de todos los pares
+        (float('inf') si no hay camino)
+        """
+        source_index = self.star_index.get(source)
+        target_index = self.star_index.get(target)
+        if source_index is None or target_index is None:
+            return float('inf')
+        
+        self._ensure_all_pairs()
+        return float(self.distance_matrix[source_index, target_index])
+    
+    def matrix_path(self, source: int, target: int) -> List[int]:
+        """
+        Camino más corto entre dos estrellas reconstruido con la matriz de
+        predecesores ([] si no hay camino)
+        """
+        if self.matrix_distance(source, target) == float('inf'):
+            return []
+        
+        source_index = self.star_index[source]
+        row = self.predecessor_matrix[source_index]
+        path = []
+        index = self.star_index[target]
+        while index != -1:
+            path.append(self.star_ids[index])
+            index = int(row[index])
+        path.reverse()
+        
+        return path
+    
+    def _ensure_all_pairs(self):
+        """Calcula las matrices si no existen o si cambiaron los caminos bloqueados"""
+        if self.distance_matrix is None or self._matrix_version != self.version:
+            self.precompute_all_pairs()
     
     def is_connected(self) -> bool:
         """Verifica si el grafo está completamente conectado"""
@@ -196,7 +635,18 @@ class SpaceGraph:
     
     def get_all_stars(self) -> List[int]:
         """Obtiene lista de todos los IDs de estrellas"""
-        return list(self.graph.nodes())
+        return list(self.star_ids)
+    
+    def update_star_effects(self, star_id: int, life_gained: float, life_lost: float):
+        """Actualiza los efectos de investigación de una estrella (años de vida)"""
+        star = self.stars_dict[star_id]
+        star.lifeYearsGained = life_gained
+        star.lifeYearsLost = life_lost
+        
+        # También actualizar en el grafo
+        self.graph.nodes[star_id]['lifeYearsGained'] = life_gained
+        self.graph.nodes[star_id]['lifeYearsLost'] = life_lost
+        self._bump_version()
     
     # ===== MÉTODOS PARA BLOQUEO DE CAMINOS =====
     
@@ -204,11 +654,33 @@ class SpaceGraph:
         """Bloquea un camino entre dos estrellas (bidireccional)"""
         self.blocked_paths.add((from_id, to_id))
         self.blocked_paths.add((to_id, from_id))
+        self._set_blocked(from_id, to_id, True)
+        self._bump_version(from_id, to_id, blocked=True)
     
     def unblock_path(self, from_id: int, to_id: int):
         """Desbloquea un camino entre dos estrellas (bidireccional)"""
         self.blocked_paths.discard((from_id, to_id))
         self.blocked_paths.discard((to_id, from_id))
+        self._set_blocked(from_id, to_id, False)
+        self._bump_version(from_id, to_id, blocked=False)
+    
+    def set_paths_blocked(self, pairs: List[Tuple[int, int]], blocked: bool):
+        """
+        Bloquea o desbloquea varias conexiones de una vez (bidireccional).
+        Los árboles de caminos en caché se descartan en lugar de repararse por cada
+        conexión, así que conviene para cambios grandes como un escenario de meteoritos.
+        """
+        for from_id, to_id in pairs:
+            if blocked:
+                self.blocked_paths.add((from_id, to_id))
+                self.blocked_paths.add((to_id, from_id))
+            else:
+                self.blocked_paths.discard((from_id, to_id))
+                self.blocked_paths.discard((to_id, from_id))
+            self._set_blocked(from_id, to_id, blocked)
+        
+        self._path_cache.clear()
+        self.version += 1
     
     def is_path_blocked(self, from_id: int, to_id: int) -> bool:
         """Verifica si un camino está bloqueado"""
@@ -227,6 +699,15 @@ class SpaceGraph:
     
     def get_neighbors_unblocked(self, star_id: int) -> List[Tuple[int, float]]:
         """Obtiene vecinos de una estrella excluyendo caminos bloqueados"""
-        all_neighbors = self.get_neighbors(star_id)
-        return [(nid, dist) for nid, dist in all_neighbors 
-                if not self.is_path_blocked(star_id, nid)]
+        if not self.blocked_paths:
+            return self.get_neighbors(star_id)
+        
+        index = self.star_index.get(star_id)
+        if index is None:
+            return []
+        
+        return [
+            (self.csr_target_ids[position], self.csr_weights[position])
+            for position in range(self.csr_offsets[index], self.csr_offsets[index + 1])
+            if not self.csr_blocked[position]
+        ]
@@ -2,18 +2,23 @@
 FastAPI - Servidor principal
 Endpoints para el sistema de navegación espacial del burro de la NASA
 """
-from fastapi import FastAPI, File, UploadFile, HTTPException, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request, Depends, Query
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import ValidationError
+import asyncio
 import json
-from typing import Optional
-
-from app.models import ConstellationData, RouteRequest, DonkeyState, BlockPathRequest
+import time
+from app.models import ConstellationData, RouteRequest, BatchRouteRequest, DonkeyState, BlockPathRequest, SimulateRequest, BatchSimulateRequest, MeteorScenarioRequest, Health
 from app.graph_logic import SpaceGraph
-from app.algorithms import RouteOptimizer
+from app.route_pool import RoutePool, RouteTimeoutError
+from app.route_jobs import RouteJobManager, JobQueueFullError
+from app.energy_model import HEALTH_STATES
 from app.simulation import DonkeySimulation
+from app.batch_simulation import BatchSimulator
+from app.meteor_scenarios import MeteorScenarioEngine
+from app.sessions import SessionRegistry, Workspace, SESSION_HEADER, SESSION_COOKIE
 from app.utils import validate_json_structure, get_constellation_statistics
 
 # Inicializar FastAPI
@@ -27,10 +32,70 @@ app = FastAPI(
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 templates = Jinja2Templates(directory="app/templates")
 
-# Variables globales para mantener el estado
-current_graph: Optional[SpaceGraph] = None
-current_data: Optional[ConstellationData] = None
-current_simulation: Optional[DonkeySimulation] = None
+# Estado por sesión: cada operador tiene su propio grafo y simulación
+sessions = SessionRegistry()
+
+# Procesos para calcular rutas sin bloquear el event loop, y trabajos en segundo plano
+route_pool = RoutePool()
+route_jobs = RouteJobManager(route_pool)
+
+# Análisis de escenarios de meteoritos (usa los mismos procesos)
+meteor_scenarios = MeteorScenarioEngine(route_pool)
+
+
+@app.on_event("shutdown")
+def shutdown_route_pool():
+    """Detiene los trabajos y los procesos de cálculo de rutas al apagar el servidor"""
+    route_jobs.shutdown()
+    route_pool.shutdown()
+
+
+@app.middleware("http")
+async def attach_session(request: Request, call_next):
+    """
+    Identifica la sesión del operador por el header X-Session-ID o la cookie
+    session_id; si no viene ninguna (o no es válida) se crea una nueva
+    """
+    session_id = request.headers.get(SESSION_HEADER) or request.cookies.get(SESSION_COOKIE)
+    if not session_id or len(session_id) > 64 or not session_id.isalnum():
+        session_id = SessionRegistry.new_session_id()
+    request.state.session_id = session_id
+    
+    response = await call_next(request)
+    
+    response.headers[SESSION_HEADER] = session_id
+    if request.cookies.get(SESSION_COOKIE) != session_id:
+        response.set_cookie(SESSION_COOKIE, session_id, httponly=True, samesite="lax")
+    return response
+
+
+def get_workspace(request: Request) -> Workspace:
+    """
+    Obtiene el espacio de trabajo (grafo, datos y simulación) de la sesión. Si la
+    sesión no cargó datos retorna uno vacío sin registrarlo
+    """
+    session_id = request.state.session_id
+    return sessions.get(session_id) or Workspace(session_id)
+
+
+def get_or_create_workspace(request: Request) -> Workspace:
+    """Obtiene el espacio de trabajo de la sesión y lo registra si no existe (al cargar datos)"""
+    return sessions.get_or_create(request.state.session_id)
+
+
+def _initial_state(workspace: Workspace, origin: int) -> DonkeyState:
+    """Estado inicial del burro en 'origin' según los datos cargados en la sesión"""
+    data = workspace.data
+    return DonkeyState(
+        current_star_id=origin,
+        energy=data.burroenergiaInicial,
+        health=data.estadoSalud,
+        grass=data.pasto,
+        age=data.startAge,
+        death_age=data.deathAge,
+        visited_stars=[],
+        is_alive=True
+    )
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -40,12 +105,11 @@ async def home(request: Request):
 
 
 @app.post("/api/upload")
-async def upload_json(file: UploadFile = File(...)):
+async def upload_json(file: UploadFile = File(...),
+                      workspace: Workspace = Depends(get_or_create_workspace)):
     """
     Endpoint para cargar el archivo JSON con las constelaciones
     """
-    global current_graph, current_data, current_simulation
-    
     try:
         # Leer el contenido del archivo
         content = await file.read()
@@ -60,24 +124,29 @@ async def upload_json(file: UploadFile = File(...)):
         
         # Validar con Pydantic
         try:
-            current_data = ConstellationData(**data_dict)
+            workspace.data = ConstellationData(**data_dict)
         except ValidationError as e:
             raise HTTPException(
                 status_code=400,
                 detail=f"Error de validación: {str(e)}"
             )
         
-        # Construir el grafo
-        current_graph = SpaceGraph(current_data)
+        # Construir el grafo (y la matriz de distancias si el grafo es pequeño)
+        workspace.graph = SpaceGraph(workspace.data)
+        if len(workspace.graph.star_ids) <= SpaceGraph.ALL_PAIRS_PRECOMPUTE_MAX_STARS:
+            workspace.graph.precompute_all_pairs()
         
         # Resetear simulación
-        current_simulation = None
+        workspace.simulation = None
+        
+        # Aplicar el límite de memoria de las sesiones con el nuevo grafo
+        sessions.touch(workspace.session_id)
         
         # Obtener estadísticas
-        stats = get_constellation_statistics(current_data)
+        stats = get_constellation_statistics(workspace.data)
         
         # Obtener datos para visualización
-        graph_data = current_graph.get_graph_data_for_visualization()
+        graph_data = workspace.graph.get_graph_data_for_visualization()
         
         return JSONResponse({
             "success": True,
@@ -85,11 +154,11 @@ async def upload_json(file: UploadFile = File(...)):
             "statistics": stats,
             "graph_data": graph_data,
             "donkey_initial_state": {
-                "energy": current_data.burroenergiaInicial,
-                "health": current_data.estadoSalud,
-                "grass": current_data.pasto,
-                "age": current_data.startAge,
-                "death_age": current_data.deathAge
+                "energy": workspace.data.burroenergiaInicial,
+                "health": workspace.data.estadoSalud,
+                "grass": workspace.data.pasto,
+                "age": workspace.data.startAge,
+                "death_age": workspace.data.deathAge
             }
         })
         
@@ -120,70 +189,51 @@ async def upload_json(file: UploadFile = File(...)):
 
 
 @app.get("/api/graph-data")
-async def get_graph_data():
+async def get_graph_data(workspace: Workspace = Depends(get_workspace)):
     """
     Obtiene los datos del grafo para visualización
     """
-    if current_graph is None:
+    if workspace.graph is None:
         raise HTTPException(
             status_code=400,
             detail="Primero debe cargar un archivo JSON"
         )
     
-    graph_data = current_graph.get_graph_data_for_visualization()
+    graph_data = workspace.graph.get_graph_data_for_visualization()
     return JSONResponse(graph_data)
 
 
 @app.post("/api/calculate-route")
-async def calculate_route(request: RouteRequest):
+async def calculate_route(request: RouteRequest,
+                          workspace: Workspace = Depends(get_workspace)):
     """
     Calcula una ruta óptima según el algoritmo seleccionado
     - maximize_stars: Mayor cantidad de estrellas (Punto 2)
+    - maximize_stars_dp: Igual que maximize_stars, con programación dinámica
+      (aproximado en grafos grandes: ver 'proven_optimal' en las estadísticas)
     - minimize_cost: Menor gasto posible (Punto 3)
     """
-    if current_graph is None or current_data is None:
+    if workspace.graph is None or workspace.data is None:
         raise HTTPException(
             status_code=400,
             detail="Primero debe cargar un archivo JSON"
         )
     
     # Verificar que la estrella origen existe
-    if request.origin_star_id not in current_graph.get_all_stars():
+    if request.origin_star_id not in workspace.graph.get_all_stars():
         raise HTTPException(
             status_code=400,
             detail=f"La estrella {request.origin_star_id} no existe"
         )
     
     # Crear estado inicial del burro
-    initial_state = DonkeyState(
-        current_star_id=request.origin_star_id,
-        energy=current_data.burroenergiaInicial,
-        health=current_data.estadoSalud,
-        grass=current_data.pasto,
-        age=current_data.startAge,
-        death_age=current_data.deathAge,
-        visited_stars=[],
-        is_alive=True
-    )
-    
-    # Crear optimizador de rutas
-    optimizer = RouteOptimizer(current_graph, initial_state)
+    initial_state = _initial_state(workspace, request.origin_star_id)
     
     try:
-        if request.algorithm == "maximize_stars":
-            # Punto 2: Maximizar estrellas visitadas
-            route, stats = optimizer.maximize_stars_visited(request.origin_star_id)
-            algorithm_name = "Maximizar Estrellas Visitadas"
-        else:
-            # Punto 3: Minimizar costo
-            if request.destination_star_id:
-                # Con destino: usar Dijkstra puro
-                route, stats = optimizer.minimize_cost_route(request.origin_star_id, request.destination_star_id)
-                algorithm_name = f"Minimizar Costo (Dijkstra: {request.origin_star_id} → {request.destination_star_id})"
-            else:
-                # Sin destino: greedy conservador
-                route, stats = optimizer.minimize_cost_route(request.origin_star_id)
-                algorithm_name = "Minimizar Costo (Greedy)"
+        # Calcular en un proceso del pool para no bloquear los demás endpoints
+        route, stats, algorithm_name = await route_pool.solve(
+            workspace.graph, initial_state, request
+        )
         
         if not route:
             return JSONResponse({
@@ -192,7 +242,7 @@ async def calculate_route(request: RouteRequest):
             })
         
         # Formatear ruta con nombres de estrellas
-        route_labels = [current_graph.get_star(sid).get_label() for sid in route]
+        route_labels = [workspace.graph.get_star(sid).get_label() for sid in route]
         
         return JSONResponse({
             "success": True,
@@ -202,6 +252,11 @@ async def calculate_route(request: RouteRequest):
             "statistics": stats
         })
         
+    except RouteTimeoutError as e:
+        raise HTTPException(
+            status_code=504,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -209,14 +264,110 @@ async def calculate_route(request: RouteRequest):
         )
 
 
+@app.post("/api/calculate-routes")
+async def calculate_routes_batch(request: BatchRouteRequest,
+                                 workspace: Workspace = Depends(get_workspace)):
+    """
+    Calcula varias rutas (origen, algoritmo, destino) en paralelo en una sola
+    llamada, compartiendo el grafo y sus tablas entre todas.
+    Retorna un resultado por ruta con su tiempo de cálculo.
+    """
+    if workspace.graph is None or workspace.data is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Primero debe cargar un archivo JSON"
+        )
+    
+    star_ids = set(workspace.graph.get_all_stars())
+    missing = sorted({route.origin_star_id for route in request.routes} - star_ids)
+    if missing:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Las estrellas {missing} no existen"
+        )
+    
+    items = []
+    for route_request in request.routes:
+        initial_state = _initial_state(workspace, route_request.origin_star_id)
+        items.append((initial_state, route_request))
+    
+    start = time.perf_counter()
+    results = await route_pool.solve_batch(workspace.graph, items)
+    
+    return JSONResponse({
+        "success": True,
+        "count": len(results),
+        "total_time_ms": (time.perf_counter() - start) * 1000,
+        "results": results
+    })
+
+
+@app.post("/api/route-jobs", status_code=202)
+async def create_route_job(request: RouteRequest,
+                           workspace: Workspace = Depends(get_workspace)):
+    """
+    Encola el cálculo de una ruta en segundo plano y retorna el id del trabajo
+    de inmediato (pensado para búsquedas largas de maximize_stars)
+    """
+    if workspace.graph is None or workspace.data is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Primero debe cargar un archivo JSON"
+        )
+    
+    if request.origin_star_id not in workspace.graph.get_all_stars():
+        raise HTTPException(
+            status_code=400,
+            detail=f"La estrella {request.origin_star_id} no existe"
+        )
+    
+    initial_state = _initial_state(workspace, request.origin_star_id)
+    
+    try:
+        job = route_jobs.submit(workspace.session_id, workspace.graph, initial_state, request)
+    except JobQueueFullError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e)
+        )
+    
+    return JSONResponse(status_code=202, content=job.to_dict())
+
+
+@app.get("/api/route-jobs/{job_id}")
+async def get_route_job(job_id: str, workspace: Workspace = Depends(get_workspace)):
+    """Obtiene el estado, el progreso y (al terminar) el resultado de un trabajo"""
+    job = route_jobs.get(workspace.session_id, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Trabajo {job_id} no encontrado"
+        )
+    
+    return JSONResponse(job.to_dict())
+
+
+@app.delete("/api/route-jobs/{job_id}")
+async def cancel_route_job(job_id: str, workspace: Workspace = Depends(get_workspace)):
+    """Cancela un trabajo (si estaba en curso conserva la mejor ruta encontrada)"""
+    job = route_jobs.get(workspace.session_id, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Trabajo {job_id} no encontrado"
+        )
+    
+    route_jobs.cancel(job)
+    return JSONResponse(job.to_dict())
+
+
 @app.post("/api/start-simulation")
-async def start_simulation(request: Request):
+async def start_simulation(request: Request,
+                           workspace: Workspace = Depends(get_workspace)):
     """
     Inicia una simulación paso a paso con una ruta calculada
     """
-    global current_simulation
-    
-    if current_graph is None or current_data is None:
+    if workspace.graph is None or workspace.data is None:
         raise HTTPException(
             status_code=400,
             detail="Primero debe cargar un archivo JSON"
@@ -250,19 +401,11 @@ async def start_simulation(request: Request):
         )
     
     # Crear estado inicial del burro
-    initial_state = DonkeyState(
-        current_star_id=origin_star_id,
-        energy=current_data.burroenergiaInicial,
-        health=current_data.estadoSalud,
-        grass=current_data.pasto,
-        age=current_data.startAge,
-        death_age=current_data.deathAge,
-        visited_stars=[],
-        is_alive=True
-    )
+    initial_state = _initial_state(workspace, origin_star_id)
     
     # Crear simulación
-    current_simulation = DonkeySimulation(current_graph, route, initial_state)
+    workspace.simulation = DonkeySimulation(workspace.graph, route, initial_state)
+    sessions.touch(workspace.session_id)
     
     return JSONResponse({
         "success": True,
@@ -271,76 +414,233 @@ async def start_simulation(request: Request):
     })
 
 
+# Formato de los pasos de la simulación: 'compact' (deltas) o 'full' (formato anterior)
+STEP_FORMAT_PATTERN = "^(compact|full)$"
+
+
+def _summary_json(summary: dict) -> dict:
+    """Resumen de una simulación con la salud final como texto (internamente es un código Health)"""
+    return {**summary, "final_health": Health(summary["final_health"]).label}
+
+
+def _trajectory_json(trajectory: dict) -> dict:
+    """Trayectoria compacta con la salud de cada paso como texto"""
+    return {**trajectory, "health": [HEALTH_STATES[code] for code in trajectory["health"]]}
+
+
 @app.get("/api/simulation/next")
-async def simulation_next_step():
+async def simulation_next_step(step_format: str = Query("compact", alias="format", pattern=STEP_FORMAT_PATTERN),
+                               workspace: Workspace = Depends(get_workspace)):
     """
-    Ejecuta el siguiente paso de la simulación
+    Ejecuta el siguiente paso de la simulación.
+    Con format=full se envía el paso completo (estrella y estado del burro enteros)
     """
-    if current_simulation is None:
+    if workspace.simulation is None:
         raise HTTPException(
             status_code=400,
             detail="Primero debe iniciar una simulación"
         )
     
-    step = current_simulation.next_step()
+    step = workspace.simulation.next_step()
     
     if step is None:
         return JSONResponse({
             "success": False,
             "message": "La simulación ha terminado",
-            "summary": current_simulation.get_summary()
+            "summary": _summary_json(workspace.simulation.get_summary())
         })
     
-    # Serializar el paso con todos los datos anidados
-    step_data = step.model_dump(mode='json')
+    step_data = workspace.simulation.step_payload(step, compact=step_format == "compact")
     
     return JSONResponse({
         "success": True,
         "step": step_data,
-        "is_complete": current_simulation.is_complete
+        "is_complete": workspace.simulation.is_complete
+    })
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """Formatea un evento Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.get("/api/simulation/stream")
+async def simulation_stream(request: Request,
+                            interval_ms: int = Query(500, ge=0, le=10000),
+                            step_format: str = Query("compact", alias="format", pattern=STEP_FORMAT_PATTERN),
+                            workspace: Workspace = Depends(get_workspace)):
+    """
+    Transmite los pasos de la simulación como Server-Sent Events.
+    
+    Una sola conexión reemplaza una solicitud a /api/simulation/next por paso.
+    Cada paso se envía como evento 'step' (mismo contenido que /api/simulation/next)
+    y al terminar se envía el evento 'summary' y se cierra la conexión.
+    
+    'interval_ms' marca el ritmo de la animación desde el servidor. Los pasos se
+    calculan a medida que se envían: si el cliente lee más lento, el envío espera
+    y la simulación no avanza (no se acumulan pasos en memoria).
+    """
+    if workspace.simulation is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Primero debe iniciar una simulación"
+        )
+    
+    simulation = workspace.simulation
+    
+    async def events():
+        while True:
+            # Se detiene si el cliente se desconectó o si se inició otra simulación
+            if await request.is_disconnected() or workspace.simulation is not simulation:
+                return
+            
+            step = simulation.next_step()
+            if step is None:
+                yield _sse_event("summary", _summary_json(simulation.get_summary()))
+                return
+            
+            yield _sse_event("step", {
+                "step": simulation.step_payload(step, compact=step_format == "compact"),
+                "is_complete": simulation.is_complete
+            })
+            
+            if interval_ms:
+                await asyncio.sleep(interval_ms / 1000)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/api/simulate")
+async def simulate_route(request: SimulateRequest,
+                         workspace: Workspace = Depends(get_workspace)):
+    """
+    Simula una ruta completa de una vez y retorna el resumen y la trayectoria
+    compacta (una lista por campo del estado del burro).
+    
+    Usa el camino rápido de la simulación (sin mensajes ni objetos por paso) y no
+    modifica la simulación paso a paso de la sesión.
+    """
+    if workspace.graph is None or workspace.data is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Primero debe cargar un archivo JSON"
+        )
+    
+    # Verificar que la estrella origen existe y que la ruta comienza en ella
+    if request.origin_star_id not in workspace.graph.get_all_stars():
+        raise HTTPException(
+            status_code=400,
+            detail=f"La estrella {request.origin_star_id} no existe"
+        )
+    
+    if request.route[0] != request.origin_star_id:
+        raise HTTPException(
+            status_code=400,
+            detail=f"La ruta debe comenzar en la estrella origen {request.origin_star_id}"
+        )
+    
+    unknown = [star_id for star_id in request.route if workspace.graph.get_star(star_id) is None]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Las estrellas {unknown} no existen"
+        )
+    
+    initial_state = _initial_state(workspace, request.origin_star_id)
+    
+    def simulate():
+        simulation = DonkeySimulation(workspace.graph, list(request.route), initial_state, keep_messages=False)
+        summary = simulation.replay()
+        trajectory = simulation.history.trajectory() if request.include_trajectory else None
+        return summary, trajectory
+    
+    # En un hilo: la ruta no tiene límite de largo y no debe bloquear los demás endpoints
+    start = time.perf_counter()
+    summary, trajectory = await asyncio.to_thread(simulate)
+    
+    return JSONResponse({
+        "success": True,
+        "summary": _summary_json(summary),
+        "trajectory": _trajectory_json(trajectory) if trajectory is not None else None,
+        "compute_time_ms": (time.perf_counter() - start) * 1000
+    })
+
+
+@app.post("/api/simulate-batch")
+async def simulate_routes_batch(request: BatchSimulateRequest,
+                                workspace: Workspace = Depends(get_workspace)):
+    """
+    Simula muchas rutas a la vez con el simulador vectorizado y retorna el
+    resumen de cada una, en el mismo orden
+    """
+    if workspace.graph is None or workspace.data is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Primero debe cargar un archivo JSON"
+        )
+    
+    def simulate():
+        simulator = BatchSimulator(workspace.graph)
+        return simulator.summaries(simulator.simulate(request.routes))
+    
+    # En un hilo: hasta miles de rutas (y el replay de las que pasan por caminos
+    # bloqueados) no deben bloquear los demás endpoints
+    start = time.perf_counter()
+    try:
+        results = await asyncio.to_thread(simulate)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    
+    return JSONResponse({
+        "success": True,
+        "results": [_summary_json(result) for result in results],
+        "compute_time_ms": (time.perf_counter() - start) * 1000
     })
 
 
 @app.get("/api/simulation/summary")
-async def simulation_summary():
+async def simulation_summary(workspace: Workspace = Depends(get_workspace)):
     """
     Obtiene el resumen de la simulación actual
     """
-    if current_simulation is None:
+    if workspace.simulation is None:
         raise HTTPException(
             status_code=400,
             detail="No hay simulación activa"
         )
     
-    return JSONResponse(current_simulation.get_summary())
+    return JSONResponse(_summary_json(workspace.simulation.get_summary()))
 
 
 @app.put("/api/star/update-effects")
-async def update_star_effects(star_id: int, life_gained: float = 0, life_lost: float = 0):
+async def update_star_effects(star_id: int, life_gained: float = 0, life_lost: float = 0,
+                              workspace: Workspace = Depends(get_workspace)):
     """
     Actualiza los efectos de investigación de una estrella
     (Permite al científico modificar los valores antes de iniciar el viaje)
     """
-    if current_graph is None:
+    if workspace.graph is None:
         raise HTTPException(
             status_code=400,
             detail="Primero debe cargar un archivo JSON"
         )
     
-    star = current_graph.get_star(star_id)
+    star = workspace.graph.get_star(star_id)
     if star is None:
         raise HTTPException(
             status_code=404,
             detail=f"Estrella {star_id} no encontrada"
         )
     
-    # Actualizar valores
-    star.lifeYearsGained = life_gained
-    star.lifeYearsLost = life_lost
-    
-    # También actualizar en el grafo
-    current_graph.graph.nodes[star_id]['lifeYearsGained'] = life_gained
-    current_graph.graph.nodes[star_id]['lifeYearsLost'] = life_lost
+    # Actualizar valores (invalida los caminos en caché del grafo)
+    workspace.graph.update_star_effects(star_id, life_gained, life_lost)
     
     return JSONResponse({
         "success": True,
@@ -355,37 +655,37 @@ async def update_star_effects(star_id: int, life_gained: float = 0, life_lost: f
 
 
 @app.get("/api/constellation-stats")
-async def get_constellation_stats():
+async def get_constellation_stats(workspace: Workspace = Depends(get_workspace)):
     """
     Obtiene estadísticas de las constelaciones cargadas
     """
-    if current_data is None:
+    if workspace.data is None:
         raise HTTPException(
             status_code=400,
             detail="Primero debe cargar un archivo JSON"
         )
     
-    stats = get_constellation_statistics(current_data)
+    stats = get_constellation_statistics(workspace.data)
     return JSONResponse(stats)
 
 
 @app.get("/api/hypergiant-stars")
-async def get_hypergiant_stars():
+async def get_hypergiant_stars(workspace: Workspace = Depends(get_workspace)):
     """
     Obtiene todas las estrellas hipergigantes disponibles
     """
-    if current_graph is None:
+    if workspace.graph is None:
         raise HTTPException(
             status_code=400,
             detail="Primero debe cargar un archivo JSON"
         )
     
-    hypergiant_ids = current_graph.get_hypergiant_stars()
+    hypergiant_ids = workspace.graph.get_hypergiant_stars()
     hypergiants = [
         {
             "id": star_id,
-            "label": current_graph.get_star(star_id).get_label(),
-            "constellations": current_graph.constellation_map[star_id]
+            "label": workspace.graph.get_star(star_id).get_label(),
+            "constellations": workspace.graph.constellation_map[star_id]
         }
         for star_id in hypergiant_ids
     ]
@@ -397,29 +697,29 @@ async def get_hypergiant_stars():
 
 
 @app.post("/api/block-path")
-async def block_path(request: BlockPathRequest):
+async def block_path(request: BlockPathRequest,
+                     workspace: Workspace = Depends(get_workspace)):
     """Bloquea o desbloquea un camino entre dos estrellas"""
-    if current_graph is None:
+    if workspace.graph is None:
         raise HTTPException(
             status_code=400,
             detail="Primero debe cargar un archivo JSON"
         )
     
     # Verificar que ambas estrellas existen
-    if request.from_star_id not in current_graph.get_all_stars():
+    if request.from_star_id not in workspace.graph.get_all_stars():
         raise HTTPException(
             status_code=404,
             detail=f"Estrella origen {request.from_star_id} no encontrada"
         )
-    if request.to_star_id not in current_graph.get_all_stars():
+    if request.to_star_id not in workspace.graph.get_all_stars():
         raise HTTPException(
             status_code=404,
             detail=f"Estrella destino {request.to_star_id} no encontrada"
         )
     
     # Verificar que existe una conexión entre las estrellas
-    neighbors = current_graph.get_neighbors(request.from_star_id)
-    if not any(nid == request.to_star_id for nid, _ in neighbors):
+    if not workspace.graph.has_edge(request.from_star_id, request.to_star_id):
         raise HTTPException(
             status_code=400,
             detail=f"No existe conexión directa entre estrellas {request.from_star_id} y {request.to_star_id}"
@@ -427,14 +727,14 @@ async def block_path(request: BlockPathRequest):
     
     # Bloquear o desbloquear
     if request.block:
-        current_graph.block_path(request.from_star_id, request.to_star_id)
+        workspace.graph.block_path(request.from_star_id, request.to_star_id)
         action = "bloqueado"
     else:
-        current_graph.unblock_path(request.from_star_id, request.to_star_id)
+        workspace.graph.unblock_path(request.from_star_id, request.to_star_id)
         action = "desbloqueado"
     
-    star_from = current_graph.get_star(request.from_star_id)
-    star_to = current_graph.get_star(request.to_star_id)
+    star_from = workspace.graph.get_star(request.from_star_id)
+    star_to = workspace.graph.get_star(request.to_star_id)
     
     return JSONResponse({
         "success": True,
@@ -452,22 +752,65 @@ async def block_path(request: BlockPathRequest):
     })
 
 
+@app.post("/api/meteor-scenarios")
+async def analyze_meteor_scenarios(request: MeteorScenarioRequest,
+                                   workspace: Workspace = Depends(get_workspace)):
+    """
+    Análisis what-if: simula miles de escenarios de bloqueos aleatorios por
+    meteoritos sobre una ruta (con el recálculo de ruta de la simulación) y estima
+    la probabilidad de completarla y las estrellas visitadas en promedio.
+    Los bloqueos actuales del grafo se mantienen en todos los escenarios.
+    """
+    if workspace.graph is None or workspace.data is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Primero debe cargar un archivo JSON"
+        )
+    
+    unknown = [star_id for star_id in request.route if workspace.graph.get_star(star_id) is None]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Las estrellas {unknown} no existen"
+        )
+    
+    initial_state = _initial_state(workspace, request.origin_star_id)
+    
+    try:
+        result = await meteor_scenarios.analyze(workspace.graph, initial_state, request)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    except RouteTimeoutError as e:
+        raise HTTPException(
+            status_code=504,
+            detail=str(e)
+        )
+    
+    return JSONResponse({
+        "success": True,
+        **result
+    })
+
+
 @app.get("/api/blocked-paths")
-async def get_blocked_paths():
+async def get_blocked_paths(workspace: Workspace = Depends(get_workspace)):
     """Obtiene la lista de todos los caminos actualmente bloqueados"""
-    if current_graph is None:
+    if workspace.graph is None:
         raise HTTPException(
             status_code=400,
             detail="Primero debe cargar un archivo JSON"
         )
     
-    blocked_paths = current_graph.get_blocked_paths()
+    blocked_paths = workspace.graph.get_blocked_paths()
     
     # Convertir a formato legible
     blocked_list = []
     for from_id, to_id in blocked_paths:
-        star_from = current_graph.get_star(from_id)
-        star_to = current_graph.get_star(to_id)
+        star_from = workspace.graph.get_star(from_id)
+        star_to = workspace.graph.get_star(to_id)
         blocked_list.append({
             "from_star_id": from_id,
             "to_star_id": to_id,
@@ -0,0 +1,231 @@
+"""
+Análisis de escenarios aleatorios de bloqueo por meteoritos
+"""
+import asyncio
+import math
+import time
+import numpy as np
+from typing import Dict, List, Tuple
+
+from app.models import DonkeyState, MeteorScenarioRequest
+from app.graph_logic import SpaceGraph
+from app.simulation import DonkeySimulation, StepHistory
+from app.route_pool import RoutePool
+
+
+# Escenarios que se muestrean juntos (acota la memoria de la matriz de bloqueos)
+SAMPLE_BATCH_SIZE = 1024
+
+_EXHAUSTION = StepHistory.ACTIONS.index('death_by_exhaustion')
+_RECALCULATED = StepHistory.ACTIONS.index('route_recalculated')
+_BLOCKED_DEATH = StepHistory.ACTIONS.index('death_by_blocked_path')
+
+
+def scenario_edges(graph: SpaceGraph) -> Tuple[List[Tuple[int, int]], Dict[Tuple[int, int], int]]:
+    """
+    Conexiones que pueden bloquearse (cada par de estrellas una vez) y la columna
+    de cada una, indexada en ambas direcciones
+    """
+    edges = list(graph.graph.edges())
+    columns = {}
+    for column, (from_id, to_id) in enumerate(edges):
+        columns[(from_id, to_id)] = column
+        columns[(to_id, from_id)] = column
+    return edges, columns
+
+
+def edge_probability_vector(request: MeteorScenarioRequest, edges: List[Tuple[int, int]],
+                            columns: Dict[Tuple[int, int], int]) -> np.ndarray:
+    """Probabilidad de bloqueo de cada conexión (la general o la indicada para ella)"""
+    probabilities = np.full(len(edges), request.edge_probability)
+    for edge in request.edge_probabilities:
+        column = columns.get((edge.from_star_id, edge.to_star_id))
+        if column is None:
+            raise ValueError(f"No existe conexión entre {edge.from_star_id} y {edge.to_star_id}")
+        probabilities[column] = edge.probability
+    return probabilities
+
+
+def constellation_incidence(graph: SpaceGraph, edges: List[Tuple[int, int]]) -> np.ndarray:
+    """
+    Matriz (constelaciones x conexiones): 1 si la conexión toca una estrella de la
+    constelación
+    """
+    names = sorted({name for star_names in graph.constellation_map.values() for name in star_names})
+    rows = {name: row for row, name in enumerate(names)}
+    incidence = np.zeros((len(names), len(edges)), dtype=np.uint8)
+    for column, (from_id, to_id) in enumerate(edges):
+        for star_id in (from_id, to_id):
+            for name in graph.constellation_map.get(star_id, []):
+                incidence[rows[name], column] = 1
+    return incidence
+
+
+def sample_blocked(rng: np.random.Generator, request: MeteorScenarioRequest,
+                   probabilities: np.ndarray, incidence: np.ndarray, samples: int) -> np.ndarray:
+    """
+    Muestrea qué conexiones quedan bloqueadas en cada escenario (samples x conexiones).
+    
+    Con constellation_storm_probability > 0 los bloqueos se correlacionan: en cada
+    escenario cada constelación tiene una lluvia de meteoritos con esa probabilidad,
+    y sus conexiones se bloquean con al menos storm_edge_probability.
+    """
+    edge_probabilities = np.broadcast_to(probabilities, (samples, len(probabilities)))
+    
+    if request.constellation_storm_probability > 0 and len(incidence):
+        storms = rng.random((samples, len(incidence))) < request.constellation_storm_probability
+        in_storm = (storms.astype(np.uint8) @ incidence) > 0
+        edge_probabilities = np.where(
+            in_storm, np.maximum(edge_probabilities, request.storm_edge_probability), edge_probabilities
+        )
+    
+    return rng.random((samples, len(probabilities))) < edge_probabilities
+
+
+def run_scenario(graph: SpaceGraph, initial_state: DonkeyState, route: List[int]) -> Dict:
+    """
+    Simula la ruta con los bloqueos actuales del grafo (con el recálculo de ruta de
+    la simulación) y resume el resultado
+    """
+    state = initial_state.model_copy(update={'visited_stars': list(initial_state.visited_stars)})
+    simulation = DonkeySimulation(graph, list(route), state, keep_messages=False)
+    summary = simulation.replay()
+    actions = simulation.history.action
+    
+    return {
+        'completed': len(actions) > 0 and actions[-1] == _EXHAUSTION,
+        'stars_visited': summary['stars_visited'],
+        'recalculated': _RECALCULATED in actions,
+        'blocked_death': len(actions) > 0 and actions[-1] == _BLOCKED_DEATH
+    }
+
+
+def evaluate_meteor_samples(graph: SpaceGraph, initial_state: DonkeyState,
+                            request: MeteorScenarioRequest, seed: np.random.SeedSequence,
+                            samples: int) -> Dict:
+    """
+    Simula 'samples' escenarios y retorna los totales (se ejecuta en un proceso del
+    pool sobre su copia del grafo).
+    
+    Cada escenario bloquea sus conexiones sobre el grafo, simula y las vuelve a
+    desbloquear, así que el grafo queda como estaba y la memoria no crece con los
+    escenarios. Si ningún tramo de la ruta queda bloqueado el resultado es el de la
+    ruta sin bloqueos nuevos, que se simula una sola vez (solo cuando esa ruta no
+    recalcula: si ya se desvía, cada escenario se simula).
+    """
+    rng = np.random.default_rng(seed)
+    edges, columns = scenario_edges(graph)
+    probabilities = edge_probability_vector(request, edges, columns)
+    incidence = constellation_incidence(graph, edges)
+    
+    route = request.route
+    legs = sorted({
+        columns[(from_id, to_id)] for from_id, to_id in zip(route, route[1:])
+        if (from_id, to_id) in columns
+    })
+    already_blocked = np.array([graph.is_path_blocked(from_id, to_id) for from_id, to_id in edges], dtype=bool)
+    
+    baseline = run_scenario(graph, initial_state, route)
+    totals = {
+        'samples': 0,
+        'completed': 0,
+        'stars_visited': 0,
+        'stars_visited_squared': 0,
+        'recalculated': 0,
+        'blocked_deaths': 0
+    }
+    
+    def add(outcome: Dict, count: int):
+        totals['samples'] += count
+        totals['completed'] += count * outcome['completed']
+        totals['stars_visited'] += count * outcome['stars_visited']
+        totals['stars_visited_squared'] += count * outcome['stars_visited'] ** 2
+        totals['recalculated'] += count * outcome['recalculated']
+        totals['blocked_deaths'] += count * outcome['blocked_death']
+    
+    remaining = samples
+    while remaining > 0:
+        batch = min(SAMPLE_BATCH_SIZE, remaining)
+        remaining -= batch
+        
+        blocked = sample_blocked(rng, request, probabilities, incidence, batch) & ~already_blocked
+        if baseline['recalculated']:
+            # La ruta base ya se desvía por bloqueos del grafo: un escenario puede
+            # bloquear el desvío sin tocar ningún tramo de la ruta
+            hits = np.ones(batch, dtype=bool)
+        elif legs:
+            hits = blocked[:, legs].any(axis=1)
+        else:
+            hits = np.zeros(batch, dtype=bool)
+        add(baseline, int(batch - hits.sum()))
+        
+        for row in np.flatnonzero(hits):
+            pairs = [edges[column] for column in np.flatnonzero(blocked[row])]
+            graph.set_paths_blocked(pairs, True)
+            try:
+                add(run_scenario(graph, initial_state, route), 1)
+            finally:
+                graph.set_paths_blocked(pairs, False)
+    
+    return totals
+
+
+class MeteorScenarioEngine:
+    """
+    Análisis what-if de bloqueos por meteoritos: muestrea miles de escenarios de
+    conexiones bloqueadas y estima la probabilidad de que el burro complete una ruta
+    y las estrellas que visita en promedio.
+    
+    Los escenarios se reparten entre los procesos del RoutePool; cada proceso usa la
+    copia del grafo que ya tiene cargada (el grafo se serializa una vez por versión).
+    """
+    
+    # Tiempo máximo del análisis (segundos)
+    TIMEOUT_SECONDS = 300.0
+    
+    def __init__(self, route_pool: RoutePool):
+        self.route_pool = route_pool
+    
+    async def analyze(self, graph: SpaceGraph, initial_state: DonkeyState,
+                      request: MeteorScenarioRequest) -> Dict:
+        """Simula los escenarios en paralelo y retorna las estimaciones"""
+        edges, columns = scenario_edges(graph)
+        edge_probability_vector(request, edges, columns)  # valida las conexiones indicadas
+        
+        start = time.perf_counter()
+        workers = min(self.route_pool.max_workers, request.samples)
+        counts = [request.samples // workers + (1 if index < request.samples % workers else 0)
+                  for index in range(workers)]
+        seeds = np.random.SeedSequence(request.seed).spawn(workers)
+        
+        partials = await asyncio.gather(*(
+            self.route_pool.run(graph, evaluate_meteor_samples, initial_state, request, seed, count,
+                                timeout=self.TIMEOUT_SECONDS)
+            for seed, count in zip(seeds, counts)
+        ))
+        
+        totals = {name: sum(partial[name] for partial in partials) for name in partials[0]}
+        baseline = run_scenario(graph, initial_state, request.route)
+        
+        result = self.summarize(totals)
+        result['baseline'] = baseline
+        result['compute_time_ms'] = (time.perf_counter() - start) * 1000
+        return result
+    
+    @staticmethod
+    def summarize(totals: Dict) -> Dict:
+        """Probabilidades y promedios a partir de los totales de los escenarios"""
+        samples = totals['samples']
+        survival = totals['completed'] / samples
+        mean_stars = totals['stars_visited'] / samples
+        variance = max(0.0, totals['stars_visited_squared'] / samples - mean_stars ** 2)
+        
+        return {
+            'samples': samples,
+            'survival_probability': survival,
+            'survival_std_error': math.sqrt(survival * (1 - survival) / samples),
+            'expected_stars_visited': mean_stars,
+            'stars_visited_std': math.sqrt(variance),
+            'recalculation_probability': totals['recalculated'] / samples,
+            'blocked_death_probability': totals['blocked_deaths'] / samples
+        }
@@ -1,10 +1,39 @@
 """
 Modelos Pydantic para validación de datos del JSON
 """
-from pydantic import BaseModel, Field, field_validator
+import os
+from enum import IntEnum
+from pydantic import BaseModel, Field, field_serializer, field_validator
 from typing import List, Optional
 
 
+class Health(IntEnum):
+    """
+    Estado de salud del burro como código entero (de mejor a peor).
+    
+    Se usa internamente en la simulación y los algoritmos; en el JSON de entrada
+    y en las respuestas de la API se usa su nombre en español (label).
+    """
+    EXCELENTE = 0
+    BUENA = 1
+    MALA = 2
+    MORIBUNDO = 3
+    MUERTO = 4
+    
+    @property
+    def label(self) -> str:
+        """Nombre en español ('Excelente', 'Buena', 'Mala', 'Moribundo', 'Muerto')"""
+        return self.name.capitalize()
+    
+    @classmethod
+    def from_label(cls, label: str) -> 'Health':
+        """Código de un nombre en español"""
+        try:
+            return cls[label.upper()]
+        except KeyError:
+            raise ValueError(f"Estado de salud debe ser uno de: {[health.label for health in cls]}")
+
+
 class Coordinates(BaseModel):
     """Coordenadas de una estrella en el espacio"""
     x: float
@@ -96,29 +125,50 @@ class DonkeyState(BaseModel):
     """Estado actual del burro durante la simulación"""
     current_star_id: int
     energy: float = Field(ge=0, le=100)
-    health: str
+    health: Health
     grass: float = Field(ge=0)
     age: float = Field(ge=0)
     death_age: float
     visited_stars: List[int] = Field(default_factory=list)
     is_alive: bool = True
     
+    @field_validator('health', mode='before')
+    @classmethod
+    def parse_health(cls, v):
+        """Acepta el nombre en español del estado de salud (como en el JSON)"""
+        if isinstance(v, str):
+            return Health.from_label(v)
+        return v
+    
+    @field_serializer('health', when_used='json')
+    def serialize_health(self, health: Health) -> str:
+        """En JSON el estado de salud se envía con su nombre en español"""
+        return Health(health).label
+    
     def remaining_life(self) -> float:
         """Calcula el tiempo de vida restante"""
         return max(0, self.death_age - self.age)
     
     def is_dead(self) -> bool:
         """Verifica si el burro está muerto"""
-        return self.age >= self.death_age or self.health == "Muerto"
+        return self.age >= self.death_age or self.health == Health.MUERTO
 
 
 class RouteRequest(BaseModel):
     """Solicitud para calcular una ruta"""
     origin_star_id: int
-    algorithm: str = Field(pattern="^(maximize_stars|minimize_cost)$")
+    algorithm: str = Field(pattern="^(maximize_stars|maximize_stars_dp|minimize_cost)$")
     destination_star_id: int = None  # Opcional: solo para minimize_cost
+    time_budget_ms: Optional[float] = Field(default=None, gt=0, description="Tiempo máximo de búsqueda para maximize_stars")
+    workers: Optional[int] = Field(default=None, ge=1, le=os.cpu_count() or 1, description="Procesos para maximize_stars en paralelo (como máximo la cantidad de CPUs)")
+    search: str = Field(default="dijkstra", pattern="^(dijkstra|astar|resource_constrained)$", description="Búsqueda para minimize_cost con destino")
     
     
+class BatchRouteRequest(BaseModel):
+    """Solicitud para calcular varias rutas (por ejemplo desde cada estrella) en una llamada"""
+    routes: List[RouteRequest] = Field(min_length=1, max_length=1000)
+
+
 class SimulationStep(BaseModel):
     """Paso de la simulación"""
     step: int
@@ -128,6 +178,37 @@ class SimulationStep(BaseModel):
     message: str
 
 
+class SimulateRequest(BaseModel):
+    """Solicitud para simular una ruta completa en una sola llamada"""
+    origin_star_id: int
+    route: List[int] = Field(min_length=1)
+    include_trajectory: bool = Field(default=True, description="Incluir el estado del burro en cada paso")
+
+
+class BatchSimulateRequest(BaseModel):
+    """Solicitud para simular muchas rutas candidatas en una sola llamada"""
+    routes: List[List[int]] = Field(min_length=1, max_length=10000, description="Cada ruta empieza en su estrella de origen")
+
+
+class EdgeProbability(BaseModel):
+    """Probabilidad de que los meteoritos bloqueen una conexión específica"""
+    from_star_id: int
+    to_star_id: int
+    probability: float = Field(ge=0, le=1)
+
+
+class MeteorScenarioRequest(BaseModel):
+    """Solicitud de análisis de escenarios aleatorios de bloqueo por meteoritos"""
+    origin_star_id: int
+    route: List[int] = Field(min_length=1)
+    samples: int = Field(default=1000, ge=1, le=100000, description="Escenarios a simular")
+    edge_probability: float = Field(default=0.05, ge=0, le=1, description="Probabilidad de bloqueo de cada conexión")
+    edge_probabilities: List[EdgeProbability] = Field(default_factory=list, description="Probabilidades por conexión")
+    constellation_storm_probability: float = Field(default=0, ge=0, le=1, description="Probabilidad de lluvia de meteoritos en cada constelación")
+    storm_edge_probability: float = Field(default=0.5, ge=0, le=1, description="Probabilidad de bloqueo de las conexiones de una constelación con lluvia")
+    seed: Optional[int] = Field(default=None, ge=0)
+
+
 class BlockPathRequest(BaseModel):
     """Solicitud para bloquear/desbloquear un camino entre estrellas"""
     from_star_id: int
@@ -0,0 +1,176 @@
+"""
+Trabajos de cálculo de rutas en segundo plano con progreso y cancelación
+"""
+import asyncio
+import multiprocessing
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from app.models import DonkeyState, RouteRequest
+from app.graph_logic import SpaceGraph
+from app.route_pool import RoutePool, RouteTimeoutError
+
+
+class JobQueueFullError(Exception):
+    """Hay demasiados trabajos esperando turno"""
+    pass
+
+
+class RouteJob:
+    """Un cálculo de ruta en segundo plano"""
+    
+    def __init__(self, session_id: str, request: RouteRequest, progress_state, cancel_event):
+        self.job_id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.request = request
+        self.status = 'queued'  # queued, running, done, cancelled, failed
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.progress_state = progress_state
+        self.cancel_event = cancel_event
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+    
+    def is_finished(self) -> bool:
+        """Indica si el trabajo ya no se ejecutará más"""
+        return self.status in ('done', 'cancelled', 'failed')
+    
+    def to_dict(self) -> Dict:
+        """Estado del trabajo para la API"""
+        if self.started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+        
+        progress = {
+            'nodes_expanded': 0,
+            'best_stars': 0,
+            'elapsed_ms': elapsed * 1000
+        }
+        if self.progress_state is not None:
+            progress.update(dict(self.progress_state))
+        
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'algorithm': self.request.algorithm,
+            'origin_star_id': self.request.origin_star_id,
+            'progress': progress,
+            'result': self.result,
+            'error': self.error
+        }
+
+
+class RouteJobManager:
+    """
+    Planificador de trabajos de rutas.
+    
+    Como máximo 'max_running' trabajos se calculan a la vez en el pool de procesos;
+    los demás esperan en cola (hasta 'max_queued') para que una ráfaga de
+    solicitudes no sature la máquina. Los trabajos terminados se conservan para
+    consultarlos, hasta 'max_finished'.
+    """
+    
+    # Tiempo máximo de un trabajo (segundos): son búsquedas largas a propósito
+    JOB_TIMEOUT_SECONDS = 600.0
+    
+    def __init__(self, route_pool: RoutePool, max_running: int = 2, max_queued: int = 32,
+                 max_finished: int = 100):
+        self.route_pool = route_pool
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.max_finished = max_finished
+        self._jobs: OrderedDict = OrderedDict()  # job_id -> RouteJob
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._manager = None
+    
+    def _shared(self):
+        """Crea el Manager que comparte progreso y cancelación con los procesos"""
+        if self._manager is None:
+            self._manager = multiprocessing.Manager()
+        return self._manager
+    
+    def submit(self, session_id: str, graph: SpaceGraph, initial_state: DonkeyState,
+               request: RouteRequest) -> RouteJob:
+        """Encola un trabajo y retorna de inmediato"""
+        queued = sum(1 for job in self._jobs.values() if job.status == 'queued')
+        if queued >= self.max_queued:
+            raise JobQueueFullError(f'Hay {queued} trabajos en cola, intente más tarde')
+        
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_running)
+        
+        manager = self._shared()
+        job = RouteJob(session_id, request, manager.dict(), manager.Event())
+        self._jobs[job.job_id] = job
+        job.task = asyncio.create_task(self._run(job, graph, initial_state))
+        self._prune_finished()
+        return job
+    
+    def get(self, session_id: str, job_id: str) -> Optional[RouteJob]:
+        """Obtiene un trabajo de la sesión (None si no existe o es de otra sesión)"""
+        job = self._jobs.get(job_id)
+        if job is None or job.session_id != session_id:
+            return None
+        return job
+    
+    def cancel(self, job: RouteJob):
+        """
+        Cancela un trabajo: si estaba en cola no llega a ejecutarse; si estaba en
+        curso la búsqueda se detiene y conserva la mejor ruta encontrada
+        """
+        if job.is_finished():
+            return
+        job.cancel_event.set()
+        if job.status == 'queued':
+            job.status = 'cancelled'
+            job.finished_at = time.time()
+    
+    async def _run(self, job: RouteJob, graph: SpaceGraph, initial_state: DonkeyState):
+        """Espera turno en el planificador y ejecuta el trabajo en el pool"""
+        async with self._semaphore:
+            if job.cancel_event.is_set():
+                return
+            
+            job.status = 'running'
+            job.started_at = time.time()
+            try:
+                route, stats, algorithm_name = await self.route_pool.solve(
+                    graph, initial_state, job.request, timeout=self.JOB_TIMEOUT_SECONDS,
+                    progress_state=job.progress_state, cancel_event=job.cancel_event
+                )
+                job.result = {
+                    'algorithm': algorithm_name,
+                    'route': route,
+                    'route_labels': [graph.get_star(sid).get_label() for sid in route],
+                    'statistics': stats
+                }
+                job.status = 'cancelled' if job.cancel_event.is_set() else 'done'
+            except RouteTimeoutError as e:
+                job.cancel_event.set()
+                job.status = 'failed'
+                job.error = str(e)
+            except Exception as e:
+                job.status = 'failed'
+                job.error = f'Error al calcular la ruta: {str(e)}'
+            finally:
+                job.finished_at = time.time()
+    
+    def _prune_finished(self):
+        """Descarta los trabajos terminados más antiguos"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.is_finished()]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+    
+    def shutdown(self):
+        """Cancela los trabajos pendientes y detiene el Manager"""
+        for job in self._jobs.values():
+            if not job.is_finished():
+                job.cancel_event.set()
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
@@ -0,0 +1,337 @@
+"""
+Cálculo de rutas en procesos separados para no bloquear el servidor
+"""
+import asyncio
+import multiprocessing
+import os
+import pickle
+import shutil
+import tempfile
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.models import DonkeyState, RouteRequest
+from app.graph_logic import SpaceGraph
+from app.algorithms import RouteOptimizer
+
+
+class RouteTimeoutError(Exception):
+    """El cálculo de la ruta superó el tiempo máximo permitido"""
+    pass
+
+
+def compute_route(graph: SpaceGraph, initial_state: DonkeyState, request: RouteRequest,
+                  progress: Optional[Callable[[int, int], None]] = None,
+                  cancel_event=None, deadline: Optional[float] = None,
+                  worker_slots=None) -> Tuple[List[int], Dict, str]:
+    """
+    Ejecuta el algoritmo pedido en la solicitud.
+    'progress' y 'cancel_event' se usan en maximize_stars y maximize_stars_dp.
+    'deadline' es un instante de time.time(): las búsquedas de maximize_stars y
+    maximize_stars_dp terminan antes con la mejor ruta encontrada.
+    'worker_slots' acota los procesos de la búsqueda paralela.
+    Retorna (ruta, estadísticas, nombre del algoritmo)
+    """
+    optimizer = RouteOptimizer(graph, initial_state)
+    
+    time_budget_ms = request.time_budget_ms
+    if deadline is not None:
+        remaining_ms = max(0.0, (deadline - time.time()) * 1000)
+        time_budget_ms = remaining_ms if time_budget_ms is None else min(time_budget_ms, remaining_ms)
+    
+    if request.algorithm == "maximize_stars":
+        # Punto 2: Maximizar estrellas visitadas
+        if request.workers and request.workers > 1:
+            route, stats = optimizer.maximize_stars_visited_parallel(
+                request.origin_star_id, max_workers=request.workers,
+                time_budget_ms=time_budget_ms, progress=progress, cancel_event=cancel_event,
+                worker_slots=worker_slots
+            )
+        else:
+            route, stats = optimizer.maximize_stars_visited(
+                request.origin_star_id, time_budget_ms=time_budget_ms,
+                progress=progress, cancel_event=cancel_event
+            )
+        algorithm_name = "Maximizar Estrellas Visitadas"
+    elif request.algorithm == "maximize_stars_dp":
+        # Punto 2: Maximizar estrellas con programación dinámica (grafos grandes)
+        route, stats = optimizer.maximize_stars_dp(
+            request.origin_star_id, time_budget_ms=time_budget_ms,
+            progress=progress, cancel_event=cancel_event
+        )
+        algorithm_name = "Maximizar Estrellas Visitadas (Programación Dinámica)"
+    else:
+        # Punto 3: Minimizar costo
+        if request.destination_star_id:
+            # Con destino: usar Dijkstra puro (o A* guiado por coordenadas, o la
+            # ruta más corta en la que el burro sobrevive)
+            use_astar = request.search == "astar"
+            resource_constrained = request.search == "resource_constrained"
+            route, stats = optimizer.minimize_cost_route(
+                request.origin_star_id, request.destination_star_id,
+                use_astar=use_astar, resource_constrained=resource_constrained
+            )
+            # Si el grafo no admite la heurística, A* recurre a Dijkstra
+            if resource_constrained:
+                search_name = "Ruta Sobrevivible"
+            else:
+                search_name = "A*" if stats['algorithm'].startswith("A*") else "Dijkstra"
+            algorithm_name = f"Minimizar Costo ({search_name}: {request.origin_star_id} → {request.destination_star_id})"
+        else:
+            # Sin destino: greedy conservador
+            route, stats = optimizer.minimize_cost_route(request.origin_star_id)
+            algorithm_name = "Minimizar Costo (Greedy)"
+    
+    return route, stats, algorithm_name
+
+
+class RoutePool:
+    """
+    Pool acotado de procesos para los algoritmos de rutas.
+    
+    Cada grafo se serializa una sola vez por versión en un archivo temporal; las
+    tareas solo llevan la ruta del archivo y cada proceso conserva en memoria los
+    últimos grafos que cargó, así que el grafo viaja una vez por proceso.
+    """
+    
+    # Tiempo máximo por solicitud (segundos)
+    DEFAULT_TIMEOUT_SECONDS = 30.0
+    
+    # Las búsquedas terminan este margen antes del tiempo máximo (como máximo una
+    # fracción de él) para que el resultado alcance a volver del proceso
+    RESULT_MARGIN_SECONDS = 1.0
+    RESULT_MARGIN_FRACTION = 0.2
+    
+    # Versiones serializadas que se conservan por grafo (las tareas en cola pueden
+    # seguir apuntando a una versión anterior)
+    KEPT_GRAPH_VERSIONS = 3
+    
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._directory: Optional[str] = None
+        self._tokens = weakref.WeakKeyDictionary()  # SpaceGraph -> identificador
+        self._files: Dict[str, List[str]] = {}  # identificador -> archivos, el último es el actual
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """
+        Crea el pool de procesos en el primer uso. Las búsquedas paralelas de todos
+        los procesos comparten un cupo de una CPU por proceso de búsqueda
+        """
+        if self._executor is None:
+            search_slots = multiprocessing.BoundedSemaphore(os.cpu_count() or 1)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_pool_worker,
+                initargs=(search_slots,)
+            )
+        return self._executor
+    
+    def _graph_file(self, graph: SpaceGraph) -> Tuple[str, str]:
+        """
+        Serializa el grafo si esta versión aún no está en disco.
+        Retorna (clave del grafo, ruta del archivo)
+        """
+        if self._directory is None:
+            self._directory = tempfile.mkdtemp(prefix='burro-graphs-')
+        
+        token = self._tokens.get(graph)
+        if token is None:
+            token = uuid.uuid4().hex
+            self._tokens[graph] = token
+            self._files[token] = []
+            # Al liberar el grafo (sesión desalojada) se borran sus archivos
+            weakref.finalize(graph, self._forget, token)
+        
+        key = f'{token}-{graph.version}'
+        path = os.path.join(self._directory, f'{key}.pkl')
+        files = self._files[token]
+        
+        if not files or files[-1] != path:
+            with open(path, 'wb') as f:
+                pickle.dump(graph, f, protocol=pickle.HIGHEST_PROTOCOL)
+            files.append(path)
+            
+            while len(files) > self.KEPT_GRAPH_VERSIONS:
+                self._remove_file(files.pop(0))
+        
+        return key, path
+    
+    def _forget(self, token: str):
+        """Borra los archivos de un grafo que ya no existe"""
+        for path in self._files.pop(token, []):
+            self._remove_file(path)
+    
+    @staticmethod
+    def _remove_file(path: str):
+        if os.path.exists(path):
+            os.remove(path)
+    
+    async def solve(self, graph: SpaceGraph, initial_state: DonkeyState, request: RouteRequest,
+                    timeout: Optional[float] = None, progress_state=None,
+                    cancel_event=None) -> Tuple[List[int], Dict, str]:
+        """
+        Calcula la ruta en un proceso del pool sin bloquear el event loop.
+        
+        'progress_state' (dict compartido de un multiprocessing.Manager) recibe
+        'nodes_expanded' y 'best_stars' durante la búsqueda; 'cancel_event' (Event
+        del mismo Manager) la detiene y se retorna la mejor ruta hasta ese momento.
+        
+        Si se supera el tiempo máximo lanza RouteTimeoutError; la tarea se cancela
+        si aún no había empezado. El tiempo máximo cuenta desde el envío (incluye
+        la espera en cola y la carga del grafo): las búsquedas de maximize_stars y
+        maximize_stars_dp reciben el mismo instante límite, menos un margen para
+        retornar, así que terminan por sí mismas con la mejor ruta encontrada.
+        """
+        timeout = timeout or self.DEFAULT_TIMEOUT_SECONDS
+        margin = min(self.RESULT_MARGIN_SECONDS, timeout * self.RESULT_MARGIN_FRACTION)
+        deadline = time.time() + timeout - margin
+        
+        key, path = self._graph_file(graph)
+        loop = asyncio.get_running_loop()
+        
+        try:
+            future = loop.run_in_executor(
+                self._get_executor(), _solve_in_worker, key, path, initial_state, request,
+                progress_state, cancel_event, deadline
+            )
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise RouteTimeoutError(f'El cálculo superó el tiempo máximo de {timeout:.0f} segundos')
+        except BrokenProcessPool:
+            # Un proceso murió: se crea un pool nuevo en la próxima solicitud
+            self._executor = None
+            raise
+    
+    async def run(self, graph: SpaceGraph, function: Callable, *args, timeout: Optional[float] = None):
+        """
+        Ejecuta function(grafo, *args) en un proceso del pool sobre la copia del grafo
+        que ese proceso ya tiene cargada. 'function' debe ser una función de módulo
+        (se envía por pickle) y dejar el grafo como lo encontró.
+        """
+        timeout = timeout or self.DEFAULT_TIMEOUT_SECONDS
+        key, path = self._graph_file(graph)
+        loop = asyncio.get_running_loop()
+        
+        try:
+            future = loop.run_in_executor(self._get_executor(), _run_in_worker, key, path, function, args)
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise RouteTimeoutError(f'El cálculo superó el tiempo máximo de {timeout:.0f} segundos')
+        except BrokenProcessPool:
+            self._executor = None
+            raise
+    
+    async def solve_batch(self, graph: SpaceGraph, items: List[Tuple[DonkeyState, RouteRequest]],
+                          timeout: Optional[float] = None) -> List[Dict]:
+        """
+        Calcula varias rutas sobre el mismo grafo en paralelo.
+        
+        El grafo se serializa una sola vez para todo el lote y cada proceso lo carga
+        una vez; las tablas derivadas (SpaceGraph.cached) y los árboles de caminos
+        que calcula un proceso se reutilizan en las siguientes rutas que le toquen.
+        Retorna un resultado por solicitud, en el mismo orden; un error en una
+        solicitud no afecta a las demás.
+        
+        Solo se envían tantas rutas como procesos a la vez, así el tiempo máximo
+        de cada una no incluye la espera en cola.
+        """
+        in_flight = asyncio.Semaphore(self.max_workers)
+        
+        async def solve_one(initial_state: DonkeyState, request: RouteRequest):
+            async with in_flight:
+                return await self.solve(graph, initial_state, request, timeout)
+        
+        results = await asyncio.gather(
+            *(solve_one(initial_state, request) for initial_state, request in items),
+            return_exceptions=True
+        )
+        
+        batch = []
+        for (_, request), result in zip(items, results):
+            item = {
+                'origin_star_id': request.origin_star_id,
+                'algorithm': request.algorithm,
+                'destination_star_id': request.destination_star_id
+            }
+            if isinstance(result, BaseException):
+                item.update(success=False, error=str(result), compute_time_ms=None)
+            else:
+                route, stats, algorithm_name = result
+                item.update(
+                    success=bool(route),
+                    algorithm_name=algorithm_name,
+                    route=route,
+                    route_labels=[graph.get_star(sid).get_label() for sid in route],
+                    statistics=stats,
+                    compute_time_ms=stats['compute_time_ms']
+                )
+            batch.append(item)
+        
+        return batch
+    
+    def shutdown(self):
+        """Detiene los procesos y elimina los grafos serializados"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
+            self._files.clear()
+            self._tokens = weakref.WeakKeyDictionary()
+
+
+# Estado de cada proceso del pool: últimos grafos cargados (clave -> SpaceGraph)
+# y cupos compartidos para los procesos de las búsquedas paralelas
+_WORKER_GRAPH_CACHE_SIZE = 4
+_worker_graphs: OrderedDict = OrderedDict()
+_worker_search_slots = None
+
+
+def _init_pool_worker(search_slots):
+    """Inicializa cada proceso del pool con los cupos de búsqueda compartidos"""
+    global _worker_search_slots
+    _worker_search_slots = search_slots
+
+
+def _worker_graph(key: str, path: str) -> SpaceGraph:
+    """Grafo del proceso para la clave (lo carga del archivo si no lo tiene)"""
+    graph = _worker_graphs.get(key)
+    if graph is None:
+        with open(path, 'rb') as f:
+            graph = pickle.load(f)
+        _worker_graphs[key] = graph
+        if len(_worker_graphs) > _WORKER_GRAPH_CACHE_SIZE:
+            _worker_graphs.popitem(last=False)
+    else:
+        _worker_graphs.move_to_end(key)
+    return graph
+
+
+def _run_in_worker(key: str, path: str, function: Callable, args: tuple):
+    """Ejecuta una función sobre el grafo del proceso"""
+    return function(_worker_graph(key, path), *args)
+
+
+def _solve_in_worker(key: str, path: str, initial_state: DonkeyState, request: RouteRequest,
+                     progress_state=None, cancel_event=None,
+                     deadline: Optional[float] = None) -> Tuple[List[int], Dict, str]:
+    """Carga el grafo (si el proceso no lo tiene) y calcula la ruta"""
+    graph = _worker_graph(key, path)
+    
+    progress = None
+    if progress_state is not None:
+        def progress(nodes_expanded: int, best_stars: int):
+            progress_state.update(nodes_expanded=nodes_expanded, best_stars=best_stars)
+    
+    start = time.perf_counter()
+    route, stats, algorithm_name = compute_route(graph, initial_state, request, progress, cancel_event, deadline,
+                                                 _worker_search_slots)
+    stats['compute_time_ms'] = (time.perf_counter() - start) * 1000
+    return route, stats, algorithm_name
@@ -0,0 +1,151 @@
+"""
+Registro de sesiones: cada operador trabaja con su propio grafo y simulación
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from app.models import ConstellationData
+from app.graph_logic import SpaceGraph
+from app.simulation import DonkeySimulation
+
+
+# Nombre del header y de la cookie que identifican la sesión
+SESSION_HEADER = "X-Session-ID"
+SESSION_COOKIE = "session_id"
+
+
+class Workspace:
+    """Estado aislado de una sesión: datos cargados, grafo y simulación actual"""
+    
+    # Estimación aproximada de memoria por estrella, por conexión y por mensaje de un
+    # paso simulado (objetos de Python y NetworkX que no son arreglos compactos)
+    BYTES_PER_STAR = 2048
+    BYTES_PER_EDGE = 512
+    BYTES_PER_MESSAGE = 256
+    
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.data: Optional[ConstellationData] = None
+        self.graph: Optional[SpaceGraph] = None
+        self.simulation: Optional[DonkeySimulation] = None
+        self.last_access = time.time()
+    
+    def estimated_bytes(self) -> int:
+        """Estima la memoria usada por el grafo, sus matrices y la simulación"""
+        total = 0
+        
+        if self.graph is not None:
+            graph = self.graph
+            total += len(graph.star_ids) * self.BYTES_PER_STAR
+            total += len(graph.csr_targets) * self.BYTES_PER_EDGE
+            
+            for values in (graph.csr_offsets, graph.csr_targets, graph.csr_target_ids,
+                           graph.csr_weights, graph.star_x, graph.star_y):
+                total += len(values) * values.itemsize
+            total += len(graph.csr_blocked)
+            
+            if graph.distance_matrix is not None:
+                total += graph.distance_matrix.nbytes + graph.predecessor_matrix.nbytes
+            
+            # Árboles de caminos en caché: distancia y predecesor por estrella
+            total += len(graph._path_cache) * len(graph.star_ids) * 16
+        
+        if self.simulation is not None:
+            history = self.simulation.history
+            total += history.nbytes() + len(history.messages) * self.BYTES_PER_MESSAGE
+        
+        return total
+
+
+class SessionRegistry:
+    """
+    Registro de sesiones con desalojo LRU.
+    
+    Se desalojan las sesiones menos usadas cuando se supera el número máximo de
+    sesiones o la memoria estimada total (nunca la sesión que se está usando).
+    
+    Solo get_or_create agrega sesiones (al cargar datos), así que las solicitudes
+    sin sesión no desalojan a las demás. La memoria estimada de cada sesión se
+    guarda al crearla o al llamar touch, y el total se mantiene acumulado.
+    """
+    
+    def __init__(self, max_sessions: int = 64, max_memory_bytes: int = 512 * 1024 * 1024):
+        self.max_sessions = max_sessions
+        self.max_memory_bytes = max_memory_bytes
+        self._workspaces: OrderedDict = OrderedDict()
+        self._bytes: Dict[str, int] = {}  # sesión -> memoria estimada en el último touch
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def new_session_id() -> str:
+        """Genera un identificador de sesión nuevo"""
+        return uuid.uuid4().hex
+    
+    def get(self, session_id: str) -> Optional[Workspace]:
+        """Obtiene el espacio de trabajo de una sesión (None si no existe)"""
+        with self._lock:
+            workspace = self._workspaces.get(session_id)
+            if workspace is not None:
+                self._workspaces.move_to_end(session_id)
+                workspace.last_access = time.time()
+            return workspace
+    
+    def get_or_create(self, session_id: str) -> Workspace:
+        """Obtiene el espacio de trabajo de una sesión y lo crea si no existe"""
+        with self._lock:
+            workspace = self._workspaces.get(session_id)
+            if workspace is None:
+                workspace = Workspace(session_id)
+                self._workspaces[session_id] = workspace
+                self._update_bytes(session_id)
+                self._evict(keep=session_id)
+            else:
+                self._workspaces.move_to_end(session_id)
+            
+            workspace.last_access = time.time()
+            return workspace
+    
+    def touch(self, session_id: str):
+        """Vuelve a estimar una sesión que cambió de tamaño y aplica los límites"""
+        with self._lock:
+            if session_id in self._workspaces:
+                self._update_bytes(session_id)
+                self._evict(keep=session_id)
+    
+    def discard(self, session_id: str):
+        """Elimina una sesión del registro"""
+        with self._lock:
+            self._remove(session_id)
+    
+    def total_bytes(self) -> int:
+        """Memoria estimada de todas las sesiones"""
+        return self._total_bytes
+    
+    def __len__(self) -> int:
+        return len(self._workspaces)
+    
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._workspaces
+    
+    def _update_bytes(self, session_id: str):
+        """Actualiza la memoria estimada de una sesión y el total"""
+        estimated = self._workspaces[session_id].estimated_bytes()
+        self._total_bytes += estimated - self._bytes.get(session_id, 0)
+        self._bytes[session_id] = estimated
+    
+    def _remove(self, session_id: str):
+        """Quita una sesión del registro y del total de memoria"""
+        self._workspaces.pop(session_id, None)
+        self._total_bytes -= self._bytes.pop(session_id, 0)
+    
+    def _evict(self, keep: str):
+        """Desaloja las sesiones menos usadas hasta cumplir los límites"""
+        candidates = [session_id for session_id in self._workspaces if session_id != keep]
+        
+        while candidates and (len(self._workspaces) > self.max_sessions
+                              or self._total_bytes > self.max_memory_bytes):
+            self._remove(candidates.pop(0))
@@ -1,78 +1,210 @@
 """
 Motor de simulación paso a paso del viaje del burro
 """
+from array import array
 from typing import List, Dict, Optional
 from app.models import DonkeyState, Star, SimulationStep
 from app.graph_logic import SpaceGraph
+from app import energy_model
+from app.energy_model import EnergyModel
+
+
+class StepHistory:
+    """
+    Historial de pasos de la simulación en arreglos paralelos (uno por campo).
+    
+    Cada paso guarda una copia real del estado del burro en unos 50 bytes, en
+    lugar de un SimulationStep que compartía el DonkeyState mutable de la
+    simulación. Las estrellas visitadas solo crecen, así que basta guardar
+    cuántas había en cada paso y una referencia a la lista de visitadas.
+    Los SimulationStep se construyen solo cuando se piden.
+    """
+    
+    ACTIONS = energy_model.ACTIONS
+    HEALTH_STATES = energy_model.HEALTH_STATES
+    
+    _ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+    
+    def __init__(self, visited_stars: List[int], keep_messages: bool = True):
+        self.visited_stars = visited_stars
+        self.keep_messages = keep_messages
+        
+        self.step_index = array('I')
+        self.star_id = array('q')          # estrella mostrada en el paso
+        self.current_star_id = array('q')  # estrella donde está el burro
+        self.action = array('B')
+        self.health = array('B')
+        self.is_alive = array('B')
+        self.visited_count = array('I')
+        self.energy = array('d')
+        self.grass = array('d')
+        self.age = array('d')
+        self.death_age = array('d')
+        self.messages: List[str] = []
+    
+    def append(self, step_index: int, star_id: int, state: DonkeyState, action: str,
+               message: Optional[str] = None):
+        """Registra una copia del estado actual del burro"""
+        self.step_index.append(step_index)
+        self.star_id.append(star_id)
+        self.current_star_id.append(state.current_star_id)
+        self.action.append(self._ACTION_CODES[action])
+        self.health.append(state.health)
+        self.is_alive.append(state.is_alive)
+        self.visited_count.append(len(state.visited_stars))
+        self.energy.append(state.energy)
+        self.grass.append(state.grass)
+        self.age.append(state.age)
+        self.death_age.append(state.death_age)
+        if self.keep_messages:
+            self.messages.append(message or '')
+    
+    def __len__(self) -> int:
+        return len(self.step_index)
+    
+    def nbytes(self) -> int:
+        """Memoria de los arreglos (sin contar los mensajes)"""
+        columns = (self.step_index, self.star_id, self.current_star_id, self.action, self.health,
+                   self.is_alive, self.visited_count, self.energy, self.grass, self.age, self.death_age)
+        return sum(len(column) * column.itemsize for column in columns)
+    
+    def state_at(self, index: int) -> DonkeyState:
+        """Reconstruye el estado del burro registrado en un paso"""
+        return DonkeyState.model_construct(
+            current_star_id=self.current_star_id[index],
+            energy=self.energy[index],
+            health=energy_model.HEALTH_CODES[self.health[index]],
+            grass=self.grass[index],
+            age=self.age[index],
+            death_age=self.death_age[index],
+            visited_stars=self.visited_stars[:self.visited_count[index]],
+            is_alive=bool(self.is_alive[index])
+        )
+    
+    def step_at(self, index: int, graph: SpaceGraph) -> SimulationStep:
+        """Construye el SimulationStep de un paso registrado"""
+        return SimulationStep.model_construct(
+            step=self.step_index[index],
+            current_star=graph.get_star(self.star_id[index]),
+            donkey_state=self.state_at(index),
+            action=self.ACTIONS[self.action[index]],
+            message=self.messages[index] if self.keep_messages else ''
+        )
+    
+    def trajectory(self) -> Dict[str, List]:
+        """
+        Historial en columnas (una lista por campo), listo para serializar.
+        La salud va como código de Health
+        """
+        return {
+            'step': self.step_index.tolist(),
+            'star_id': self.star_id.tolist(),
+            'action': [self.ACTIONS[code] for code in self.action],
+            'energy': self.energy.tolist(),
+            'grass': self.grass.tolist(),
+            'age': self.age.tolist(),
+            'death_age': self.death_age.tolist(),
+            'health': self.health.tolist(),
+            'is_alive': [bool(alive) for alive in self.is_alive],
+            'visited_count': self.visited_count.tolist()
+        }
+    
+    def steps(self, graph: SpaceGraph) -> List[SimulationStep]:
+        """Construye todos los pasos registrados"""
+        return [self.step_at(index, graph) for index in range(len(self))]
+
+
+class _ReplayState:
+    """
+    Copia liviana del estado del burro para el replay: el mismo acceso por
+    atributos que DonkeyState, sin el costo de __setattr__ de Pydantic
+    """
+    __slots__ = ('current_star_id', 'energy', 'health', 'grass', 'age', 'death_age',
+                 'visited_stars', 'is_alive')
+    
+    def __init__(self, state: DonkeyState):
+        for field in self.__slots__:
+            setattr(self, field, getattr(state, field))
+    
+    def copy_to(self, state: DonkeyState):
+        """Escribe los valores en un DonkeyState"""
+        for field in self.__slots__:
+            setattr(state, field, getattr(self, field))
 
 
 class DonkeySimulation:
     """Simula el viaje del burro paso a paso"""
     
-    # Factor de consumo de energía por año luz viajado
-    # Puedes ajustar este valor para cambiar la dificultad
-    # 0.1 = 0.1% de energía por año luz (120 años luz = 12% energía)
-    ENERGY_CONSUMPTION_PER_LIGHT_YEAR = 0.1
+    # Factor de consumo de energía por año luz viajado (se ajusta en energy_model.py)
+    ENERGY_CONSUMPTION_PER_LIGHT_YEAR = energy_model.ENERGY_CONSUMPTION_PER_LIGHT_YEAR
+    
+    # Campos del estado del burro que se envían en el formato compacto de los pasos
+    COMPACT_STATE_FIELDS = ('current_star_id', 'energy', 'health', 'grass', 'age', 'death_age', 'is_alive')
     
-    def __init__(self, graph: SpaceGraph, route: List[int], initial_state: DonkeyState):
+    def __init__(self, graph: SpaceGraph, route: List[int], initial_state: DonkeyState,
+                 keep_messages: bool = True):
         self.graph = graph
         self.route = route
         self.state = initial_state
         self.current_step = 0
-        self.simulation_log: List[SimulationStep] = []
+        self.history = StepHistory(initial_state.visited_stars, keep_messages)
         self.is_complete = False
+        
+        # Último estado enviado al cliente (base de los pasos compactos)
+        self._sent_state: Optional[Dict] = None
+        self._sent_visited = 0
     
     def next_step(self) -> Optional[SimulationStep]:
         """
         Ejecuta el siguiente paso de la simulación
         Retorna información sobre el paso actual
         """
-        if self.is_complete:
+        if not self._step(describe=True):
             return None
+        return self.history.step_at(len(self.history) - 1, self.graph)
+    
+    def _step(self, describe: bool) -> bool:
+        """
+        Avanza la simulación un paso y lo registra en el historial.
+        Con describe=False no se arman los mensajes (camino rápido de replay).
+        Retorna False si la simulación ya había terminado
+        """
+        if self.is_complete:
+            return False
         
         # Si llegó al final de la ruta pero aún está vivo, crear paso final de muerte
         if self.current_step >= len(self.route):
             if self.state.is_alive and self.state.energy > 0:
                 # Crear paso final donde el burro muere por agotamiento
                 last_star_id = self.route[-1]
-                last_star = self.graph.get_star(last_star_id)
                 
                 # Consumir toda la energía restante
                 self.state.energy = 0
                 self.state.is_alive = False
-                self.state.health = 'Muerto'
+                self.state.health = energy_model.DEAD
                 self.is_complete = True
                 
-                step = SimulationStep(
-                    step=self.current_step,
-                    current_star=last_star,
-                    donkey_state=self.state,
-                    action='death_by_exhaustion',
-                    message=f'💀 El burro murió por agotamiento extremo en {last_star.get_label()}. No puede continuar sin energía suficiente.'
-                )
-                
-                self.simulation_log.append(step)
-                return step
-            return None
+                message = None
+                if describe:
+                    last_star = self.graph.get_star(last_star_id)
+                    message = f'💀 El burro murió por agotamiento extremo en {last_star.get_label()}. No puede continuar sin energía suficiente.'
+                self._record(last_star_id, 'death_by_exhaustion', message)
+                return True
+            return False
         
         current_star_id = self.route[self.current_step]
-        current_star = self.graph.get_star(current_star_id)
         
         if self.current_step == 0:
             # Primer paso: el burro está en la estrella de origen
             self.state.visited_stars.append(current_star_id)
             self.state.current_star_id = current_star_id
             
-            step = SimulationStep(
-                step=self.current_step,
-                current_star=current_star,
-                donkey_state=self.state,
-                action='start',
-                message=f'🚀 El burro inicia su viaje en la estrella {current_star.get_label()}'
-            )
+            message = None
+            if describe:
+                message = f'🚀 El burro inicia su viaje en la estrella {self.graph.get_star(current_star_id).get_label()}'
+            self._record(current_star_id, 'start', message)
             self.current_step += 1
-            self.simulation_log.append(step)
-            return step
+            return True
         
         # Viajar a la siguiente estrella
         next_star_id = current_star_id
@@ -85,15 +217,7 @@ class DonkeySimulation:
             
             if recalc_result and recalc_result['recalculated']:
                 # Ruta recalculada exitosamente
-                current_star = self.graph.get_star(previous_star_id)
-                step = SimulationStep(
-                    step=self.current_step,
-                    current_star=current_star,
-                    donkey_state=self.state,
-                    action='route_recalculated',
-                    message=recalc_result['message']
-                )
-                self.simulation_log.append(step)
+                self._record(previous_star_id, 'route_recalculated', recalc_result['message'])
                 
                 # Actualizar next_star_id al nuevo destino
                 next_star_id = self.route[self.current_step]
@@ -101,174 +225,173 @@ class DonkeySimulation:
             else:
                 # No hay ruta alternativa, el burro está atrapado
                 self.state.is_alive = False
-                self.state.health = 'Muerto'
+                self.state.health = energy_model.DEAD
                 self.is_complete = True
                 
-                current_star = self.graph.get_star(previous_star_id)
-                blocked_from = self.graph.get_star(previous_star_id).get_label()
-                blocked_to = self.graph.get_star(next_star_id).get_label()
-                
-                step = SimulationStep(
-                    step=self.current_step,
-                    current_star=current_star,
-                    donkey_state=self.state,
-                    action='death_by_blocked_path',
-                    message=f'💀 El burro murió porque el camino de {blocked_from} a {blocked_to} está bloqueado por cometas/meteoritos y no hay ruta alternativa disponible.'
-                )
-                self.simulation_log.append(step)
-                return step
+                message = None
+                if describe:
+                    blocked_from = self.graph.get_star(previous_star_id).get_label()
+                    blocked_to = self.graph.get_star(next_star_id).get_label()
+                    message = f'💀 El burro murió porque el camino de {blocked_from} a {blocked_to} está bloqueado por cometas/meteoritos y no hay ruta alternativa disponible.'
+                self._record(previous_star_id, 'death_by_blocked_path', message)
+                return True
+        
+        current_star = self.graph.get_star(current_star_id)
         
         # Calcular distancia del viaje
-        neighbors = self.graph.get_neighbors(previous_star_id)
-        distance = next((d for nid, d in neighbors if nid == next_star_id), 0)
+        distance = self.graph.edge_weight(previous_star_id, next_star_id)
         
-        # Consumir energía por el viaje (basado en la distancia)
-        # Fórmula: distancia * factor de consumo
-        energy_consumed_by_travel = distance * self.ENERGY_CONSUMPTION_PER_LIGHT_YEAR
-        self.state.energy -= energy_consumed_by_travel
+        # Aplicar las reglas del paso (viaje, investigación, comida e hipergigante)
+        model = EnergyModel.for_graph(self.graph)
+        index = self.graph.star_index[current_star_id]
+        arrival = model.arrive(
+            self.state.energy, self.state.grass, self.state.age,
+            self.state.death_age, distance, index
+        )
+        arrived = self._apply_arrival(current_star_id, arrival)
         
-        # Actualizar edad (tiempo de vida)
-        self.state.age += distance
-        message = f'🌟 Viajando de {self.graph.get_star(previous_star_id).get_label()} a {current_star.get_label()} ({distance:.2f} años luz)'
-        message += f'\n⚡ El viaje consumió {energy_consumed_by_travel:.1f}% de energía'
+        message = None
+        if describe:
+            message = self._arrival_message(previous_star_id, current_star, distance, arrival,
+                                            model.life_change[index], model.max_kg[index])
+        self._record(current_star_id, self.history.ACTIONS[arrival[0]], message)
         
-        # Verificar si el burro murió en el viaje por falta de energía
-        if self.state.energy <= 0:
-            self.state.is_alive = False
-            self.state.health = 'Muerto'
-            self.is_complete = True
+        if arrived:
+            self.current_step += 1
             
-            step = SimulationStep(
-                step=self.current_step,
-                current_star=current_star,
-                donkey_state=self.state,
-                action='death_by_energy_travel',
-                message=f'💀 El burro murió en el viaje por falta de energía. Distancia recorrida: {distance:.2f} años luz'
-            )
-            self.simulation_log.append(step)
-            return step
-        
-        # Verificar si el burro murió en el viaje por edad
-        if self.state.age >= self.state.death_age:
+            # Verificar si terminó la ruta
+            if self.current_step >= len(self.route):
+                # Si el burro aún está vivo en la última estrella, debe morir por agotamiento
+                if self.state.is_alive and self.state.energy > 0:
+                    # No marcar como completo todavía, permitir un paso más
+                    pass
+                else:
+                    self.is_complete = True
+        
+        return True
+    
+    def _apply_arrival(self, star_id: int, arrival: tuple) -> bool:
+        """
+        Aplica al estado del burro el resultado de EnergyModel.arrive.
+        Retorna True si el burro llegó a la estrella (aunque haya muerto al llegar)
+        """
+        action, energy, grass, age, death_age, health = arrival[:6]
+        
+        # Actualizar edad (tiempo de vida)
+        self.state.age = age
+        
+        # Verificar si el burro murió en el viaje (por falta de energía o por edad)
+        if action == energy_model.DEATH_BY_ENERGY_TRAVEL or action == energy_model.DEATH_BY_AGE:
+            self.state.energy = energy
             self.state.is_alive = False
-            self.state.health = 'Muerto'
+            self.state.health = energy_model.DEAD
             self.is_complete = True
-            
-            step = SimulationStep(
-                step=self.current_step,
-                current_star=current_star,
-                donkey_state=self.state,
-                action='death_by_age',
-                message=f'💀 El burro murió en el viaje. Edad alcanzada: {self.state.age:.2f} años luz'
-            )
-            self.simulation_log.append(step)
-            return step
-        
-        # Llegar a la estrella
-        self.state.visited_stars.append(current_star_id)
-        self.state.current_star_id = current_star_id
-        
-        # Actualizar estado de salud antes de investigación
-        self.state.health = self._calculate_health()
-        
-        # Realizar investigación (consume energía adicional)
-        energy_before_research = self.state.energy
-        self.state.energy -= current_star.amountOfEnergy
-        message += f'\n🔬 Investigación consumió {current_star.amountOfEnergy:.1f}% de energía (Total consumido: {energy_consumed_by_travel + current_star.amountOfEnergy:.1f}%)'
+            return False
+        
+        # Llegar a la estrella y realizar investigación (consume energía adicional)
+        self.state.visited_stars.append(star_id)
+        self.state.current_star_id = star_id
+        self.state.energy = energy
         
         # Verificar si murió por falta de energía después de investigar
-        if self.state.energy <= 0:
+        if action == energy_model.DEATH_BY_ENERGY_RESEARCH:
             self.state.is_alive = False
-            self.state.health = 'Muerto'
+            self.state.health = energy_model.DEAD
             self.is_complete = True
-            
-            step = SimulationStep(
-                step=self.current_step,
-                current_star=current_star,
-                donkey_state=self.state,
-                action='death_by_energy_research',
-                message=message + '\n💀 El burro murió durante la investigación por falta de energía'
-            )
-            self.simulation_log.append(step)
-            return step
-        
-        # Aplicar efectos de investigación (ganancia/pérdida de vida)
-        life_change = current_star.lifeYearsGained - current_star.lifeYearsLost
-        self.state.death_age += life_change
-        if life_change != 0:
-            message += f'\n⏱️ Tiempo de vida {"aumentó" if life_change > 0 else "disminuyó"} en {abs(life_change):.2f} años luz'
+            return False
         
-        # Verificar si necesita comer (energía < 50%)
-        action = 'travel'
-        if self.state.energy < 50 and self.state.grass > 0:
-            # Actualizar estado de salud ACTUAL antes de calcular cuánto gana por kg
-            self.state.health = self._calculate_health()
-            energy_gain_rate = self._get_energy_gain_rate()
-            
-            # Calcular tiempo disponible para comer (50% del tiempo total en estrella)
-            # Tiempo para comer 1 kg = timeToEat
-            # Tiempo para investigar ~ timeToEat (asumimos proporcional)
-            # Tiempo total = 2 * timeToEat → 50% disponible = timeToEat
-            time_available_for_eating = current_star.timeToEat
-            
-            # Máximo kg que puede comer según tiempo disponible
-            max_kg_by_time = time_available_for_eating / current_star.timeToEat  # = 1 kg
-            
-            # Calcular cuánto DESEARÍA comer (para llegar a 50% o más)
-            energy_needed = 50 - self.state.energy
-            kg_desired = energy_needed / energy_gain_rate if energy_gain_rate > 0 else 0
-            
-            # Lo que REALMENTE puede comer está limitado por tiempo y pasto disponible
-            actual_kg_eaten = min(max_kg_by_time, kg_desired, self.state.grass)
-            
-            # Consumir pasto y ganar energía
-            energy_gained = actual_kg_eaten * energy_gain_rate
-            self.state.energy += energy_gained
-            self.state.grass -= actual_kg_eaten
-            
-            message += f'\n🌾 Comió {actual_kg_eaten:.2f}kg de pasto (máx: {max_kg_by_time:.2f}kg por tiempo), ganó {energy_gained:.1f}% de energía (tasa: {energy_gain_rate:.1f}%/kg)'
-            action = 'eat_and_research'
-        
-        # Actualizar estado de salud final basado en energía actual
-        self.state.health = self._calculate_health()
+        # Efectos de investigación, comida y estado de salud final
+        self.state.death_age = death_age
+        self.state.grass = grass
+        self.state.health = health
         
         # Verificar si el burro murió
-        if self.state.energy <= 0 or self.state.health == 'Muerto':
+        if action == energy_model.DEATH_BY_ENERGY:
             self.state.is_alive = False
-            self.state.health = 'Muerto'
             self.is_complete = True
-            action = 'death_by_energy'
+        
+        return True
+    
+    def _arrival_message(self, previous_star_id: int, star: Star, distance: float, arrival: tuple,
+                         life_change: float, max_kg_by_time: float) -> str:
+        """Arma el mensaje de un paso de viaje a partir del resultado de EnergyModel.arrive"""
+        action, energy, _, age, _, _, kg_eaten, gain_rate = arrival
+        energy_consumed_by_travel = distance * self.ENERGY_CONSUMPTION_PER_LIGHT_YEAR
+        
+        # Muerte en el viaje (por falta de energía o por edad)
+        if action == energy_model.DEATH_BY_ENERGY_TRAVEL:
+            return f'💀 El burro murió en el viaje por falta de energía. Distancia recorrida: {distance:.2f} años luz'
+        if action == energy_model.DEATH_BY_AGE:
+            return f'💀 El burro murió en el viaje. Edad alcanzada: {age:.2f} años luz'
+        
+        message = f'🌟 Viajando de {self.graph.get_star(previous_star_id).get_label()} a {star.get_label()} ({distance:.2f} años luz)'
+        message += f'\n⚡ El viaje consumió {energy_consumed_by_travel:.1f}% de energía'
+        message += f'\n🔬 Investigación consumió {star.amountOfEnergy:.1f}% de energía (Total consumido: {energy_consumed_by_travel + star.amountOfEnergy:.1f}%)'
+        
+        if action == energy_model.DEATH_BY_ENERGY_RESEARCH:
+            return message + '\n💀 El burro murió durante la investigación por falta de energía'
+        
+        # Efectos de investigación (ganancia/pérdida de vida)
+        if life_change != 0:
+            message += f'\n⏱️ Tiempo de vida {"aumentó" if life_change > 0 else "disminuyó"} en {abs(life_change):.2f} años luz'
+        
+        # Comida si la energía quedó por debajo del 50%
+        if kg_eaten > 0:
+            message += f'\n🌾 Comió {kg_eaten:.2f}kg de pasto (máx: {max_kg_by_time:.2f}kg por tiempo), ganó {kg_eaten * gain_rate:.1f}% de energía (tasa: {gain_rate:.1f}%/kg)'
+        
+        if action == energy_model.DEATH_BY_ENERGY:
             message += '\n💀 El burro murió por falta de energía'
         
-        # Verificar si es hipergigante y puede teletransportarse
-        if current_star.hypergiant and self.state.is_alive:
-            # Recargar energía y pasto
-            self.state.energy = min(100, self.state.energy * 1.5)
-            self.state.grass *= 2
-            message += f'\n⭐ ¡Estrella Hipergigante! Energía recargada al {self.state.energy:.1f}% y pasto duplicado'
-            action = 'hypergiant_boost'
-        
-        step = SimulationStep(
-            step=self.current_step,
-            current_star=current_star,
-            donkey_state=self.state,
-            action=action,
-            message=message
-        )
+        # Recarga de estrella hipergigante
+        if action == energy_model.HYPERGIANT_BOOST:
+            message += f'\n⭐ ¡Estrella Hipergigante! Energía recargada al {energy:.1f}% y pasto duplicado'
         
-        self.current_step += 1
-        self.simulation_log.append(step)
+        return message
+    
+    @property
+    def simulation_log(self) -> List[SimulationStep]:
+        """Pasos ejecutados, cada uno con una copia del estado del burro en ese paso"""
+        return self.history.steps(self.graph)
+    
+    def _record(self, star_id: int, action: str, message: Optional[str]):
+        """Registra el paso actual en el historial"""
+        self.history.append(self.current_step, star_id, self.state, action, message)
+    
+    def step_payload(self, step: SimulationStep, compact: bool = True) -> Dict:
+        """
+        Serializa un paso para enviarlo al cliente.
         
-        # Verificar si terminó la ruta
-        if self.current_step >= len(self.route):
-            # Si el burro aún está vivo en la última estrella, debe morir por agotamiento
-            if self.state.is_alive and self.state.energy > 0:
-                # No marcar como completo todavía, permitir un paso más
-                pass
-            else:
-                self.is_complete = True
+        El formato compacto referencia la estrella por id y solo incluye los campos
+        del burro que cambiaron desde el último paso enviado y las estrellas
+        visitadas nuevas; el primer paso lleva el estado completo. El formato
+        completo (compact=False) es el SimulationStep con la estrella y el estado
+        enteros. Ambos actualizan la base, así que se pueden alternar. La salud se
+        envía con su nombre en español.
+        """
+        state = step.donkey_state
+        previous = self._sent_state
+        previous_visited = self._sent_visited
+        self._sent_state = {field: getattr(state, field) for field in self.COMPACT_STATE_FIELDS}
+        self._sent_visited = len(state.visited_stars)
         
-        return step
+        if not compact:
+            return step.model_dump(mode='json')
+        
+        changed = {
+            field: value for field, value in self._sent_state.items()
+            if previous is None or previous[field] != value
+        }
+        if 'health' in changed:
+            changed['health'] = self.history.HEALTH_STATES[changed['health']]
+        
+        return {
+            'step': step.step,
+            'star_id': step.current_star.id,
+            'action': step.action,
+            'message': step.message,
+            'state': changed,
+            'visited': state.visited_stars[previous_visited:]
+        }
     
     def check_and_recalculate_if_blocked(self) -> Optional[Dict]:
         """
@@ -329,10 +452,26 @@ class DonkeySimulation:
                 break
         return self.simulation_log
     
+    def replay(self) -> Dict:
+        """
+        Ejecuta lo que falta de la simulación por el camino rápido: las mismas reglas
+        y el mismo historial que next_step, sin armar mensajes ni SimulationStep.
+        Retorna el resumen
+        """
+        state = self.state
+        self.state = _ReplayState(state)
+        try:
+            while self._step(describe=False):
+                pass
+        finally:
+            self.state.copy_to(state)
+            self.state = state
+        return self.get_summary()
+    
     def get_summary(self) -> Dict:
-        """Retorna un resumen de la simulación"""
+        """Retorna un resumen de la simulación ('final_health' como Health)"""
         return {
-            'total_steps': len(self.simulation_log),
+            'total_steps': len(self.history),
             'stars_visited': len(self.state.visited_stars),
             'final_energy': self.state.energy,
             'final_health': self.state.health,
@@ -343,27 +482,3 @@ class DonkeySimulation:
             'route': self.route,
             'visited_stars': self.state.visited_stars
         }
-    
-    def _get_energy_gain_rate(self) -> float:
-        """Calcula cuánta energía gana por kg de pasto según salud"""
-        rates = {
-            'Excelente': 5.0,
-            'Buena': 3.0,
-            'Mala': 2.0,
-            'Moribundo': 1.0,
-            'Muerto': 0.0
-        }
-        return rates.get(self.state.health, 0.0)
-    
-    def _calculate_health(self) -> str:
-        """Determina el estado de salud según el nivel de energía"""
-        if self.state.energy >= 75:
-            return 'Excelente'
-        elif self.state.energy >= 50:
-            return 'Buena'
-        elif self.state.energy >= 25:
-            return 'Mala'
-        elif self.state.energy > 0:
-            return 'Moribundo'
-        else:
-            return 'Muerto'
@@ -7,6 +7,8 @@ class SimulationController {
         this.isRunning = false;
         this.currentRoute = null;
         this.donkeyState = null;
+        this.stream = null;
+        this.playTimer = null;
     }
     
     async startSimulation(originStarId, route) {
@@ -32,9 +34,11 @@ class SimulationController {
             if (data.success) {
                 this.isRunning = true;
                 this.currentRoute = route;
+                this.donkeyState = null;
                 
-                // Habilitar botón de siguiente paso
+                // Habilitar botones de siguiente paso y reproducción
                 document.getElementById('nextStepBtn').disabled = false;
+                document.getElementById('playSimBtn').disabled = false;
                 document.getElementById('startSimBtn').disabled = true;
                 
                 // Mostrar log
@@ -66,40 +70,10 @@ class SimulationController {
             const data = await response.json();
             
             if (data.success) {
-                const step = data.step;
-                this.donkeyState = step.donkey_state;
-                
-                // Actualizar UI
-                this.updateDonkeyPanel(this.donkeyState);
-                
-                // Mostrar posición del burro en el grafo y actualizar estrellas visitadas
-                if (graphVisualizer) {
-                    graphVisualizer.visitedStars = this.donkeyState.visited_stars || [];
-                    graphVisualizer.showDonkeyPosition(step.current_star.id);
-                }
-                
-                // Agregar mensaje al log
-                this.addLog(step.message, this.getLogType(step.action));
-                
-                // Verificar si terminó
-                if (data.is_complete || !this.donkeyState.is_alive) {
-                    this.endSimulation();
-                    
-                    // Reproducir sonido si murió
-                    if (!this.donkeyState.is_alive) {
-                        this.playDeathSound();
-                    }
-                }
-                
+                this.applyStep(data.step, data.is_complete);
             } else {
                 // Simulación terminada
-                this.endSimulation();
-                this.addLog(data.message, 'info');
-                
-                // Mostrar resumen
-                if (data.summary) {
-                    this.showSummary(data.summary);
-                }
+                this.finishWithSummary(data.message, data.summary);
             }
             
         } catch (error) {
@@ -108,14 +82,110 @@ class SimulationController {
         }
     }
     
+    applyStep(step, isComplete) {
+        // Paso compacto: solo trae los campos del burro que cambiaron y las estrellas nuevas
+        this.donkeyState = Object.assign(this.donkeyState || { visited_stars: [] }, step.state);
+        this.donkeyState.visited_stars = this.donkeyState.visited_stars.concat(step.visited);
+        
+        // Actualizar UI
+        this.updateDonkeyPanel(this.donkeyState);
+        
+        // Mostrar posición del burro en el grafo y actualizar estrellas visitadas
+        if (graphVisualizer) {
+            graphVisualizer.visitedStars = this.donkeyState.visited_stars || [];
+            graphVisualizer.showDonkeyPosition(step.star_id);
+        }
+        
+        // Agregar mensaje al log
+        this.addLog(step.message, this.getLogType(step.action));
+        
+        // Verificar si terminó
+        if (isComplete || !this.donkeyState.is_alive) {
+            this.endSimulation();
+            
+            // Reproducir sonido si murió
+            if (!this.donkeyState.is_alive) {
+                this.playDeathSound();
+            }
+        }
+    }
+    
+    finishWithSummary(message, summary) {
+        this.endSimulation();
+        this.addLog(message, 'info');
+        
+        // Mostrar resumen
+        if (summary) {
+            this.showSummary(summary);
+        }
+    }
+    
+    playSimulation(intervalMs = 500) {
+        if (!this.isRunning) return;
+        
+        // Sin soporte de Server-Sent Events: avanzar paso a paso con solicitudes
+        if (!window.EventSource) {
+            this.playTimer = setInterval(() => {
+                if (!this.isRunning) {
+                    clearInterval(this.playTimer);
+                    return;
+                }
+                this.nextStep();
+            }, intervalMs);
+            return;
+        }
+        
+        // Una sola conexión: el servidor envía cada paso a su ritmo
+        document.getElementById('nextStepBtn').disabled = true;
+        document.getElementById('playSimBtn').disabled = true;
+        this.stream = new EventSource(`/api/simulation/stream?interval_ms=${intervalMs}`);
+        
+        this.stream.addEventListener('step', (event) => {
+            const data = JSON.parse(event.data);
+            this.applyStep(data.step, false);
+        });
+        
+        this.stream.addEventListener('summary', (event) => {
+            this.stopStream();
+            if (this.isRunning) {
+                this.finishWithSummary('La simulación ha terminado', JSON.parse(event.data));
+            } else {
+                this.showSummary(JSON.parse(event.data));
+            }
+        });
+        
+        this.stream.onerror = () => {
+            // Evitar que EventSource se reconecte y siga avanzando la simulación
+            this.stopStream();
+            if (this.isRunning) {
+                this.addLog('❌ Error: se perdió la conexión con la simulación', 'error');
+                document.getElementById('nextStepBtn').disabled = false;
+                document.getElementById('playSimBtn').disabled = false;
+            }
+        };
+    }
+    
+    stopStream() {
+        if (this.stream) {
+            this.stream.close();
+            this.stream = null;
+        }
+        if (this.playTimer) {
+            clearInterval(this.playTimer);
+            this.playTimer = null;
+        }
+    }
+    
     endSimulation() {
         this.isRunning = false;
         document.getElementById('nextStepBtn').disabled = true;
+        document.getElementById('playSimBtn').disabled = true;
         document.getElementById('startSimBtn').disabled = false;
         this.addLog('✅ Simulación completada', 'success');
     }
     
     reset() {
+        this.stopStream();
         this.isRunning = false;
         this.currentRoute = null;
         this.donkeyState = null;
@@ -130,6 +200,7 @@ class SimulationController {
         
         // Resetear botones
         document.getElementById('nextStepBtn').disabled = true;
+        document.getElementById('playSimBtn').disabled = true;
         document.getElementById('startSimBtn').disabled = false;
         
         this.addLog('🔄 Sistema reiniciado', 'info');
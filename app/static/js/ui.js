@@ -29,6 +29,7 @@ document.addEventListener('DOMContentLoaded', () => {
     // Controles de simulación
     document.getElementById('startSimBtn').addEventListener('click', startSimulation);
     document.getElementById('nextStepBtn').addEventListener('click', () => simulationController.nextStep());
+    document.getElementById('playSimBtn').addEventListener('click', () => simulationController.playSimulation());
     document.getElementById('resetBtn').addEventListener('click', resetSimulation);
 });
 
@@ -212,6 +213,15 @@ function displayRouteInfo(routeData) {
                 </div>
             `;
         }
+        
+        if (routeData.statistics.proven_optimal === false) {
+            html += `
+                <div>
+                    <p class="text-gray-400 text-xs">Resultado</p>
+                    <p class="font-bold text-yellow-400">Aproximado (puede no ser óptimo)</p>
+                </div>
+            `;
+        }
     }
     
     html += '</div>';
@@ -82,9 +82,7 @@ def calculate_total_distance(route: list, graph) -> float:
         current = route[i]
         next_star = route[i + 1]
         
-        neighbors = graph.get_neighbors(current)
-        distance = next((d for nid, d in neighbors if nid == next_star), 0)
-        total += distance
+        total += graph.edge_weight(current, next_star)
     
     return total
 
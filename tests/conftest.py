@@ -0,0 +1,37 @@
+"""
+Utilidades compartidas por los tests: carga de los archivos de datos y estado
+inicial del burro
+"""
+import json
+from pathlib import Path
+from typing import Tuple
+
+from app.models import ConstellationData, DonkeyState
+from app.graph_logic import SpaceGraph
+
+
+def load_graph(filename: str) -> Tuple[ConstellationData, SpaceGraph]:
+    """Carga un archivo de datos y construye el grafo"""
+    json_path = Path('data') / filename
+    
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = ConstellationData(**json.load(f))
+    
+    return data, SpaceGraph(data)
+
+
+def initial_state(data: ConstellationData, origin: int, **changes) -> DonkeyState:
+    """
+    Estado inicial del burro en 'origin' según los datos cargados; 'changes'
+    reemplaza valores (energy, grass, age, death_age...)
+    """
+    values = {
+        'current_star_id': origin,
+        'energy': data.burroenergiaInicial,
+        'health': data.estadoSalud,
+        'grass': data.pasto,
+        'age': data.startAge,
+        'death_age': data.deathAge
+    }
+    values.update(changes)
+    return DonkeyState(**values)
@@ -0,0 +1,78 @@
+"""
+Tests del simulador vectorizado de muchas trayectorias
+"""
+import random
+
+import numpy as np
+
+from app.graph_logic import SpaceGraph
+from app.simulation import DonkeySimulation
+from app.batch_simulation import BatchSimulator
+from tests.conftest import load_graph, initial_state
+
+
+def random_routes(graph: SpaceGraph, count: int, seed: int):
+    """Genera rutas aleatorias siguiendo conexiones (pueden repetir estrellas)"""
+    rnd = random.Random(seed)
+    stars = graph.get_all_stars()
+    routes = []
+    for _ in range(count):
+        route = [rnd.choice(stars)]
+        for _ in range(rnd.randint(0, 20)):
+            route.append(rnd.choice([neighbor for neighbor, _ in graph.get_neighbors(route[-1])]))
+        routes.append(route)
+    return routes
+
+
+def simulate_one(data, graph, route, energy, grass, age, death_age):
+    """Resumen de la simulación paso a paso de una ruta"""
+    state = initial_state(data, route[0], energy=energy, grass=grass, age=age, death_age=death_age)
+    simulation = DonkeySimulation(graph, list(route), state)
+    simulation.run_full_simulation()
+    return simulation.get_summary()
+
+
+def test_batch_matches_step_by_step():
+    """Verifica que el simulador vectorizado coincida con DonkeySimulation con condiciones aleatorias"""
+    data, graph = load_graph('large_test_constellation.json')
+    routes = random_routes(graph, 200, seed=1)
+    
+    rng = np.random.default_rng(1)
+    energy = rng.uniform(1, 100, len(routes))
+    grass = rng.uniform(0, 20, len(routes))
+    age = rng.uniform(0, 50, len(routes))
+    death_age = rng.uniform(100, 3000, len(routes))
+    
+    simulator = BatchSimulator(graph)
+    results = simulator.summaries(simulator.simulate(routes, energy, grass, age, death_age))
+    
+    for index, route in enumerate(routes):
+        expected = simulate_one(
+            data, graph, route, float(energy[index]), float(grass[index]),
+            float(age[index]), float(death_age[index])
+        )
+        for field in ('total_steps', 'stars_visited', 'final_energy', 'final_health',
+                      'remaining_grass', 'age', 'remaining_life', 'is_alive'):
+            assert results[index][field] == expected[field], f"Ruta {index}: {field}"
+    
+    print("✅ El simulador vectorizado coincide con la simulación paso a paso")
+
+
+def test_batch_blocked_route_uses_recalculation():
+    """Verifica que las rutas con caminos bloqueados se simulen con el recálculo de ruta"""
+    data, graph = load_graph('constellations_example.json')
+    route = [1, 2, 7, 8, 9, 3]
+    graph.block_path(7, 8)
+    
+    simulator = BatchSimulator(graph)
+    result = simulator.summaries(simulator.simulate([route, [1, 2]]))
+    expected = simulate_one(data, graph, route, data.burroenergiaInicial, data.pasto,
+                            data.startAge, data.deathAge)
+    
+    assert result[0]['total_steps'] == expected['total_steps']
+    assert result[0]['stars_visited'] == expected['stars_visited']
+    assert result[0]['final_energy'] == expected['final_energy']
+    assert result[1]['completed_route']
+    assert result[1]['death_action'] == 'death_by_exhaustion'
+    
+    print("✅ Las rutas bloqueadas se simulan con recálculo")
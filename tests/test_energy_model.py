@@ -0,0 +1,74 @@
+"""
+Tests del modelo de energía compartido por la simulación y los algoritmos
+"""
+import numpy as np
+
+from app.energy_model import EnergyModel
+from app.algorithms import RouteOptimizer
+from app.simulation import DonkeySimulation
+from tests.conftest import load_graph, initial_state
+
+
+def test_batch_arrival_matches_scalar():
+    """Verifica que arrive_batch produzca exactamente los mismos valores que arrive"""
+    _, graph = load_graph('large_test_constellation.json')
+    model = EnergyModel.for_graph(graph)
+    
+    rng = np.random.default_rng(3)
+    n = 5000
+    energy = rng.uniform(0.5, 100, n)
+    grass = rng.choice([0.0, 0.3, 5.0], n)
+    age = rng.uniform(0, 100, n)
+    death_age = age + rng.uniform(1, 300, n)
+    distance = rng.uniform(1, 200, n)
+    index = rng.integers(0, len(graph.star_ids), n)
+    
+    batch = model.arrive_batch(energy, grass, age, death_age, distance, index)
+    
+    for row in range(n):
+        expected = model.arrive(float(energy[row]), float(grass[row]), float(age[row]),
+                                float(death_age[row]), float(distance[row]), int(index[row]))
+        assert tuple(values[row] for values in batch) == expected[:6], f"Fila {row}"
+    
+    assert model is EnergyModel.for_graph(graph), "El modelo se reutiliza mientras el grafo no cambie"
+    
+    print("✅ El paso vectorizado coincide con el escalar")
+
+
+def test_max_stars_route_is_survivable_in_simulation():
+    """Verifica que la simulación recorra la ruta del DFS (salvo la estrella mortal)"""
+    data, graph = load_graph('large_test_constellation.json')
+    
+    for origin in (1, 10, 20, 30):
+        route, stats = RouteOptimizer(graph, initial_state(data, origin)).maximize_stars_visited(origin)
+        
+        simulation = DonkeySimulation(graph, list(route), initial_state(data, origin), keep_messages=False)
+        summary = simulation.replay()
+        
+        assert stats['stars_visited'] == len(route)
+        assert summary['stars_visited'] >= len(route) - 1, f"Origen {origin}"
+    
+    print("✅ El DFS planifica con las mismas reglas que la simulación")
+
+
+def test_appended_star_uses_energy_model():
+    """Verifica que la estrella que se agrega al final de la ruta siga las reglas de la simulación"""
+    data, graph = load_graph('large_test_constellation.json')
+    
+    # Sin tiempo la búsqueda se detiene en el origen y se agrega el vecino más cercano
+    route, stats = RouteOptimizer(graph, initial_state(data, 1)).maximize_stars_visited(1, time_budget_ms=1e-6)
+    assert len(route) == 2
+    
+    # Estado del burro al llegar a la estrella agregada (paso 1 de la simulación)
+    simulation = DonkeySimulation(graph, list(route), initial_state(data, 1), keep_messages=False)
+    simulation.replay()
+    trajectory = simulation.history.trajectory()
+    arrived_alive = trajectory['action'][1] in ('travel', 'eat_and_research', 'hypergiant_boost')
+    
+    assert stats['stars_visited'] == 2
+    assert stats['is_alive'] == arrived_alive
+    assert stats['is_alive'] == (stats['cause_of_death'] is None)
+    assert stats['final_energy'] == trajectory['energy'][1]
+    assert stats['final_age'] == trajectory['age'][1]
+    
+    print("✅ La estrella final se calcula con el modelo de energía")
@@ -0,0 +1,135 @@
+"""
+Tests del grafo espacial (SpaceGraph)
+"""
+from tests.conftest import load_graph
+
+
+def test_csr_matches_networkx():
+    """Verifica que los arreglos CSR representen las mismas conexiones que NetworkX"""
+    _, graph = load_graph('large_test_constellation.json')
+    
+    assert len(graph.csr_offsets) == graph.graph.number_of_nodes() + 1
+    assert len(graph.csr_weights) == 2 * graph.graph.number_of_edges()
+    
+    for star_id in graph.get_all_stars():
+        expected = [(nid, data['weight']) for nid, data in graph.graph.adj[star_id].items()]
+        assert graph.get_neighbors(star_id) == expected
+    
+    assert graph.get_neighbors(-1) == []
+    
+    print("✅ Representación CSR consistente")
+
+
+def test_shortest_path_respects_blocked_paths():
+    """Verifica que Dijkstra evite los caminos bloqueados sin modificar el grafo"""
+    _, graph = load_graph('test_path_blocking.json')
+    
+    assert graph.shortest_path(1, 5) == ([1, 2, 4, 5], 18.0)
+    
+    graph.block_path(2, 4)
+    assert graph.shortest_path(1, 5) == ([1, 3, 4, 5], 23.0)
+    assert (4, 5.0) not in graph.get_neighbors_unblocked(2)
+    assert graph.graph.has_edge(2, 4), "El grafo original no debe modificarse"
+    
+    graph.block_path(4, 5)
+    assert graph.shortest_path(1, 5) == ([], float('inf'))
+    
+    graph.unblock_path(4, 2)
+    graph.unblock_path(5, 4)
+    assert graph.shortest_path(1, 5) == ([1, 2, 4, 5], 18.0)
+    
+    print("✅ Dijkstra respeta los caminos bloqueados")
+
+
+def test_astar_matches_dijkstra():
+    """Verifica que A* encuentre las mismas distancias que Dijkstra expandiendo menos"""
+    _, graph = load_graph('large_test_constellation.json')
+    
+    assert graph.heuristic_scale is not None
+    
+    dijkstra_expanded = 0
+    astar_expanded = 0
+    for source in graph.get_all_stars():
+        for target in graph.get_all_stars():
+            _, distance, expanded = graph.search_path(source, target)
+            _, astar_distance, expanded_astar = graph.search_path(source, target, use_astar=True)
+            assert abs(distance - astar_distance) < 1e-9
+            dijkstra_expanded += expanded
+            astar_expanded += expanded_astar
+    
+    assert astar_expanded < dijkstra_expanded
+    
+    print("✅ A* coincide con Dijkstra")
+
+
+def test_edge_weight_index():
+    """Verifica que el índice de conexiones retorne las mismas distancias que NetworkX"""
+    _, graph = load_graph('large_test_constellation.json')
+    
+    for u, v, data in graph.graph.edges(data=True):
+        assert graph.edge_weight(u, v) == data['weight']
+        assert graph.edge_weight(v, u) == data['weight']
+        assert graph.has_edge(u, v)
+    
+    assert graph.edge_weight(1, -1) == 0.0
+    assert graph.edge_weight(1, -1, default=float('inf')) == float('inf')
+    assert not graph.has_edge(1, -1)
+    
+    print("✅ Índice de conexiones consistente")
+
+
+def test_shortest_path_cache_invalidation():
+    """Verifica que la caché de caminos responda sin buscar y se repare al bloquear"""
+    _, graph = load_graph('test_path_blocking.json')
+    
+    path, distance, expanded = graph.search_path(1, 5)
+    assert path == [1, 2, 4, 5] and distance == 18.0
+    assert expanded > 0
+    
+    # Otro destino desde el mismo origen se responde con el árbol en caché
+    _, _, expanded = graph.search_path(1, 4)
+    assert expanded == 0
+    
+    version = graph.version
+    graph.block_path(2, 4)
+    assert graph.version > version
+    path, distance, expanded = graph.search_path(1, 5)
+    assert path == [1, 3, 4, 5] and distance == 23.0
+    assert expanded == 0, "El árbol en caché debe repararse, no recalcularse"
+    
+    graph.unblock_path(2, 4)
+    path, distance, _ = graph.search_path(1, 5)
+    assert path == [1, 2, 4, 5] and distance == 18.0
+    
+    version = graph.version
+    graph.update_star_effects(3, 10.0, 0.0)
+    assert graph.version > version
+    assert graph.get_star(3).lifeYearsGained == 10.0
+    
+    print("✅ Caché de caminos reparada por versión")
+
+
+def test_all_pairs_matrix_matches_dijkstra():
+    """Verifica que la matriz de todos los pares coincida con Dijkstra y se refresque al bloquear"""
+    _, graph = load_graph('large_test_constellation.json')
+    graph.precompute_all_pairs()
+    stars = graph.get_all_stars()
+    
+    for source in stars:
+        for target in stars:
+            path, distance = graph.shortest_path(source, target)
+            assert graph.matrix_distance(source, target) == distance
+            assert graph.matrix_path(source, target) == path
+    
+    assert graph.matrix_distance(1, -1) == float('inf')
+    assert graph.matrix_path(1, -1) == []
+    
+    _, graph = load_graph('test_path_blocking.json')
+    graph.precompute_all_pairs()
+    assert graph.matrix_path(1, 5) == [1, 2, 4, 5]
+    
+    graph.block_path(2, 4)
+    assert graph.matrix_path(1, 5) == [1, 3, 4, 5]
+    assert graph.matrix_distance(1, 5) == 23.0
+    
+    print("✅ Matriz de distancias consistente con Dijkstra")
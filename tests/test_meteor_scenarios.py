@@ -0,0 +1,118 @@
+"""
+Tests del análisis de escenarios de bloqueo por meteoritos
+"""
+import asyncio
+
+import numpy as np
+
+from app.models import ConstellationData, MeteorScenarioRequest
+from app.graph_logic import SpaceGraph
+from app.route_pool import RoutePool
+from app.meteor_scenarios import MeteorScenarioEngine, evaluate_meteor_samples, run_scenario
+from tests.conftest import load_graph, initial_state
+
+
+ROUTE = [1, 2, 7, 8, 9, 3]
+
+
+def test_scenarios_without_meteors_match_baseline():
+    """Verifica que sin probabilidad de bloqueo todos los escenarios sean la ruta original"""
+    data, graph = load_graph('constellations_example.json')
+    state = initial_state(data, ROUTE[0])
+    request = MeteorScenarioRequest(origin_star_id=1, route=ROUTE, samples=50, edge_probability=0)
+    
+    totals = evaluate_meteor_samples(graph, state, request, np.random.SeedSequence(1), 50)
+    baseline = run_scenario(graph, state, ROUTE)
+    
+    assert totals['samples'] == 50
+    assert totals['completed'] == 50 * baseline['completed']
+    assert totals['stars_visited'] == 50 * baseline['stars_visited']
+    assert totals['recalculated'] == 0
+    
+    print("✅ Sin meteoritos los escenarios coinciden con la ruta original")
+
+
+def test_blocked_leg_forces_recalculation_and_restores_graph():
+    """Verifica que un tramo siempre bloqueado obligue a recalcular y que el grafo quede intacto"""
+    data, graph = load_graph('constellations_example.json')
+    state = initial_state(data, ROUTE[0])
+    graph.block_path(3, 12)
+    path_before, distance_before = graph.shortest_path(1, 3)
+    
+    request = MeteorScenarioRequest(
+        origin_star_id=1, route=ROUTE, samples=20, edge_probability=0,
+        edge_probabilities=[{'from_star_id': 7, 'to_star_id': 8, 'probability': 1.0}]
+    )
+    totals = evaluate_meteor_samples(graph, state, request, np.random.SeedSequence(2), 20)
+    
+    assert totals['recalculated'] + totals['blocked_deaths'] == 20
+    assert graph.get_blocked_paths() in ([(3, 12)], [(12, 3)])
+    assert not graph.is_path_blocked(7, 8)
+    assert graph.shortest_path(1, 3) == (path_before, distance_before)
+    
+    print("✅ Los bloqueos de cada escenario se deshacen")
+
+
+def test_engine_runs_in_pool_and_is_reproducible():
+    """Verifica que el análisis en el pool sea reproducible con la misma semilla"""
+    data, graph = load_graph('constellations_example.json')
+    state = initial_state(data, ROUTE[0])
+    request = MeteorScenarioRequest(
+        origin_star_id=1, route=ROUTE, samples=400, edge_probability=0.2,
+        constellation_storm_probability=0.3, seed=7
+    )
+    pool = RoutePool(max_workers=2)
+    engine = MeteorScenarioEngine(pool)
+    
+    async def analyze_twice():
+        return [await engine.analyze(graph, state, request) for _ in range(2)]
+    
+    try:
+        first, second = asyncio.run(analyze_twice())
+    finally:
+        pool.shutdown()
+    
+    assert first['samples'] == 400
+    assert 0 <= first['survival_probability'] <= 1
+    assert first['survival_probability'] == second['survival_probability']
+    assert first['expected_stars_visited'] == second['expected_stars_visited']
+    assert first['recalculation_probability'] > 0
+    
+    print("✅ Análisis de meteoritos reproducible en el pool")
+
+
+def test_blocked_detour_is_simulated():
+    """Verifica que con un tramo ya bloqueado los escenarios que bloquean el desvío no usen el resultado base"""
+    stars = [
+        {'id': 1, 'label': 'A', 'linkedTo': [{'starId': 2, 'distance': 10}, {'starId': 4, 'distance': 10}]},
+        {'id': 2, 'label': 'B', 'linkedTo': [{'starId': 1, 'distance': 10}, {'starId': 4, 'distance': 10},
+                                             {'starId': 3, 'distance': 10}]},
+        {'id': 3, 'label': 'C', 'linkedTo': [{'starId': 2, 'distance': 10}]},
+        {'id': 4, 'label': 'D', 'linkedTo': [{'starId': 1, 'distance': 10}, {'starId': 2, 'distance': 10}]}
+    ]
+    for index, star in enumerate(stars):
+        star.update({'radius': 1, 'timeToEat': 1, 'amountOfEnergy': 1, 'coordenates': {'x': index, 'y': 0}})
+    data = ConstellationData(
+        constellations=[{'name': 'Rombo', 'starts': stars}],
+        burroenergiaInicial=100, estadoSalud='Excelente', pasto=300, number=1,
+        startAge=0, deathAge=1000
+    )
+    graph = SpaceGraph(data)
+    graph.block_path(1, 2)
+    state = initial_state(data, 1)
+    
+    request = MeteorScenarioRequest(
+        origin_star_id=1, route=[1, 2, 3], samples=100, edge_probability=0,
+        edge_probabilities=[{'from_star_id': 1, 'to_star_id': 4, 'probability': 1.0}]
+    )
+    assert run_scenario(graph, state, request.route)['recalculated']
+    
+    totals = evaluate_meteor_samples(graph, state, request, np.random.SeedSequence(3), 100)
+    graph.block_path(1, 4)
+    actual = run_scenario(graph, state, request.route)
+    
+    assert not actual['completed'] and actual['blocked_death']
+    assert totals['completed'] == 0
+    assert totals['blocked_deaths'] == 100
+    
+    print("✅ Los escenarios que bloquean el desvío de la ruta base se simulan")
@@ -0,0 +1,123 @@
+"""
+Tests de los trabajos de rutas en segundo plano
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+
+import pytest
+from pydantic import ValidationError
+
+from app.models import RouteRequest
+from app.algorithms import RouteOptimizer
+from app.route_pool import RoutePool
+from app.route_jobs import RouteJobManager
+from tests.conftest import load_graph, initial_state
+
+
+def test_progress_and_cancel_event():
+    """Verifica que el DFS reporte progreso y se detenga con el evento de cancelación"""
+    data, graph = load_graph('large_test_constellation.json')
+    state = initial_state(data, 1)
+    reports = []
+    
+    _, stats = RouteOptimizer(graph, state).maximize_stars_visited(
+        1, progress=lambda nodes, best: reports.append((nodes, best))
+    )
+    assert reports[-1][0] == stats['nodes_expanded']
+    assert 0 < reports[-1][1] <= stats['stars_visited']
+    
+    cancel_event = threading.Event()
+    cancel_event.set()
+    route, stats = RouteOptimizer(graph, state).maximize_stars_visited(1, cancel_event=cancel_event)
+    assert route[0] == 1
+    assert stats['proven_optimal'] is False
+    
+    print("✅ Progreso y cancelación del DFS")
+
+
+def test_dp_reports_progress_and_cancels():
+    """Verifica que la programación dinámica reporte progreso por capa y se pueda cancelar"""
+    data, graph = load_graph('constellations_example.json')
+    state = initial_state(data, 1)
+    reports = []
+    
+    _, stats = RouteOptimizer(graph, state).maximize_stars_dp(
+        1, progress=lambda labels, best: reports.append((labels, best))
+    )
+    assert len(reports) >= 2
+    assert [best for _, best in reports] == sorted(best for _, best in reports)
+    assert [labels for labels, _ in reports] == sorted(labels for labels, _ in reports)
+    assert 1 < reports[-1][1] <= stats['stars_visited']
+    
+    cancel_event = threading.Event()
+    cancel_event.set()
+    route, stats = RouteOptimizer(graph, state).maximize_stars_dp(1, cancel_event=cancel_event)
+    assert route[0] == 1
+    assert stats['proven_optimal'] is False
+    
+    print("✅ Progreso y cancelación de la programación dinámica")
+
+
+def test_parallel_search_reports_progress_and_cancels():
+    """Verifica que la búsqueda paralela también reporte progreso y se pueda cancelar"""
+    data, graph = load_graph('large_test_constellation.json')
+    state = initial_state(data, 1)
+    reports = []
+    
+    _, stats = RouteOptimizer(graph, state).maximize_stars_visited_parallel(
+        1, max_workers=2, progress=lambda nodes, best: reports.append((nodes, best))
+    )
+    assert reports[-1][0] == stats['nodes_expanded']
+    assert 0 < reports[-1][1] <= stats['stars_visited']
+    
+    cancel_event = multiprocessing.Event()
+    cancel_event.set()
+    route, stats = RouteOptimizer(graph, state).maximize_stars_visited_parallel(
+        1, max_workers=2, cancel_event=cancel_event
+    )
+    assert route[0] == 1
+    assert stats['proven_optimal'] is False
+    
+    with pytest.raises(ValidationError):
+        RouteRequest(origin_star_id=1, algorithm="maximize_stars", workers=(os.cpu_count() or 1) + 1)
+    
+    print("✅ Progreso y cancelación de la búsqueda paralela")
+
+
+def test_job_manager_runs_and_cancels_queued_jobs():
+    """Verifica que los trabajos terminen con resultado y que se cancelen los que esperan turno"""
+    data, graph = load_graph('large_test_constellation.json')
+    state = initial_state(data, 1)
+    pool = RoutePool(max_workers=1)
+    manager = RouteJobManager(pool, max_running=1)
+    request = RouteRequest(origin_star_id=1, algorithm="maximize_stars")
+    
+    async def run_jobs():
+        first = manager.submit('a', graph, state, request)
+        second = manager.submit('a', graph, state, request)
+        assert second.status == 'queued'
+        manager.cancel(second)
+        
+        await asyncio.gather(first.task, second.task)
+        return first, second
+    
+    try:
+        first, second = asyncio.run(run_jobs())
+        
+        status = first.to_dict()
+        assert status['status'] == 'done'
+        assert status['result']['route'][0] == 1
+        assert status['progress']['nodes_expanded'] == status['result']['statistics']['nodes_expanded']
+        
+        assert second.status == 'cancelled'
+        assert second.result is None
+        
+        assert manager.get('a', first.job_id) is first
+        assert manager.get('b', first.job_id) is None, "Otra sesión no debe ver el trabajo"
+    finally:
+        manager.shutdown()
+        pool.shutdown()
+    
+    print("✅ Planificador de trabajos de rutas")
@@ -0,0 +1,155 @@
+"""
+Tests de los algoritmos de optimización de rutas
+"""
+import multiprocessing
+import os
+import sys
+
+import pytest
+from pydantic import ValidationError
+
+from app.models import ConstellationData, RouteRequest
+from app.graph_logic import SpaceGraph
+from app.algorithms import RouteOptimizer
+from tests.conftest import load_graph, initial_state
+
+
+def create_optimizer(data: ConstellationData, graph: SpaceGraph, origin: int) -> RouteOptimizer:
+    """Crea un optimizador con el estado inicial del burro"""
+    return RouteOptimizer(graph, initial_state(data, origin))
+
+
+def test_dp_matches_dfs():
+    """Verifica que la programación dinámica visite tantas estrellas como el DFS"""
+    data, graph = load_graph('constellations_example.json')
+    
+    for origin in graph.get_all_stars():
+        _, dfs_stats = create_optimizer(data, graph, origin).maximize_stars_visited(origin)
+        dp_route, dp_stats = create_optimizer(data, graph, origin).maximize_stars_dp(origin)
+        
+        assert dp_stats['stars_visited'] == dfs_stats['stars_visited']
+        assert dp_stats['proven_optimal'] is True
+        assert dp_route[0] == origin
+        assert len(set(dp_route)) == len(dp_route), "La ruta no debe repetir estrellas"
+    
+    # En grafos grandes la programación dinámica se limita por capa (aproximada)
+    data, graph = load_graph('large_test_constellation.json')
+    _, dp_stats = create_optimizer(data, graph, 1).maximize_stars_dp(1)
+    assert dp_stats['proven_optimal'] is False
+    
+    print("✅ Programación dinámica coincide con el DFS")
+
+
+def test_branch_and_bound_counters():
+    """Verifica que el DFS reporte los nodos expandidos y podados"""
+    data, graph = load_graph('large_test_constellation.json')
+    
+    route, stats = create_optimizer(data, graph, 1).maximize_stars_visited(1)
+    
+    assert stats['stars_visited'] == len(route)
+    assert stats['nodes_expanded'] > 0
+    assert stats['nodes_pruned'] > 0, "La cota superior debería podar ramas"
+    
+    print("✅ Contadores de poda reportados")
+
+
+def test_long_route_exceeds_recursion_limit():
+    """Verifica que el DFS iterativo recorra rutas más largas que el límite de recursión"""
+    star_count = sys.getrecursionlimit() + 1500
+    stars = [
+        {
+            'id': star_id,
+            'label': f'Estrella{star_id}',
+            'linkedTo': [{'starId': neighbor_id, 'distance': 0.01}
+                         for neighbor_id in (star_id - 1, star_id + 1) if 1 <= neighbor_id <= star_count],
+            'radius': 1,
+            'timeToEat': 1,
+            'amountOfEnergy': 0,
+            'coordenates': {'x': star_id, 'y': 0}
+        }
+        for star_id in range(1, star_count + 1)
+    ]
+    data = ConstellationData(
+        constellations=[{'name': 'Cadena', 'starts': stars}],
+        burroenergiaInicial=100, estadoSalud='Excelente', pasto=0, number=1,
+        startAge=0, deathAge=star_count
+    )
+    
+    route, stats = create_optimizer(data, SpaceGraph(data), 1).maximize_stars_visited(1)
+    
+    assert route == list(range(1, star_count + 1))
+    assert stats['stars_visited'] == star_count
+    assert stats['proven_optimal'] is True
+    
+    print("✅ Rutas más largas que el límite de recursión")
+
+
+def test_time_budget_returns_best_so_far():
+    """Verifica que la búsqueda anytime retorne una ruta al agotar el tiempo"""
+    data, graph = load_graph('large_test_constellation.json')
+    
+    route, stats = create_optimizer(data, graph, 1).maximize_stars_visited(1, time_budget_ms=1e-6)
+    assert route[0] == 1
+    assert stats['proven_optimal'] is False
+    
+    _, stats = create_optimizer(data, graph, 1).maximize_stars_visited(1, time_budget_ms=60000)
+    assert stats['proven_optimal'] is True
+    
+    print("✅ Búsqueda anytime con presupuesto de tiempo")
+
+
+def test_parallel_matches_sequential():
+    """Verifica que la búsqueda paralela encuentre tantas estrellas como la secuencial"""
+    data, graph = load_graph('large_test_constellation.json')
+    
+    _, sequential_stats = create_optimizer(data, graph, 1).maximize_stars_visited(1)
+    route, parallel_stats = create_optimizer(data, graph, 1).maximize_stars_visited_parallel(1, max_workers=2)
+    
+    assert parallel_stats['stars_visited'] == sequential_stats['stars_visited']
+    assert parallel_stats['proven_optimal'] is True
+    assert route[0] == 1
+    
+    # No se pueden pedir más procesos que CPUs
+    with pytest.raises(ValidationError):
+        RouteRequest(origin_star_id=1, algorithm="maximize_stars", workers=(os.cpu_count() or 1) + 1)
+    
+    print("✅ Búsqueda paralela coincide con la secuencial")
+
+
+def test_parallel_respects_shared_worker_slots():
+    """Verifica que sin cupos libres la búsqueda paralela sea secuencial y que devuelva los cupos"""
+    data, graph = load_graph('large_test_constellation.json')
+    _, sequential_stats = create_optimizer(data, graph, 1).maximize_stars_visited(1)
+    
+    worker_slots = multiprocessing.BoundedSemaphore(2)
+    assert worker_slots.acquire(block=False)
+    route, stats = create_optimizer(data, graph, 1).maximize_stars_visited_parallel(
+        1, max_workers=4, worker_slots=worker_slots
+    )
+    
+    assert stats == sequential_stats
+    assert route[0] == 1
+    worker_slots.release()
+    assert worker_slots.acquire(block=False) and worker_slots.acquire(block=False)
+    
+    print("✅ La búsqueda paralela respeta los cupos compartidos")
+
+
+def test_survivable_route_avoids_deadly_shortest_path():
+    """Verifica que la ruta con restricciones de recursos evite el camino corto mortal"""
+    data, graph = load_graph('test_path_blocking.json')
+    
+    # El camino más corto 1 → 2 → 4 → 5 pasa por una estrella muy costosa de investigar
+    graph.get_star(2).amountOfEnergy = 95
+    
+    dijkstra_route, dijkstra_stats = create_optimizer(data, graph, 1).minimize_cost_route(1, 5)
+    assert dijkstra_route == [1, 2, 4, 5]
+    assert dijkstra_stats['is_alive'] is False
+    
+    route, stats = create_optimizer(data, graph, 1).minimize_cost_route(1, 5, resource_constrained=True)
+    assert route == [1, 3, 4, 5]
+    assert stats['destination_reached'] is True
+    assert stats['is_alive'] is True
+    assert stats['total_distance'] == 23.0
+    
+    print("✅ Ruta sobrevivible evita el camino corto mortal")
@@ -0,0 +1,164 @@
+"""
+Tests del cálculo de rutas en procesos separados
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.models import ConstellationData, RouteRequest
+from app.graph_logic import SpaceGraph
+from app.route_pool import RoutePool, RouteTimeoutError, compute_route
+from tests.conftest import load_graph, initial_state
+
+
+def grid_graph(size: int):
+    """
+    Rejilla de size x size estrellas a distancia 1, sin costo de investigación.
+    Con size impar no hay ruta por todas las estrellas desde una estrella como la 2,
+    pero la cota no lo detecta: el DFS no alcanza a terminar en poco tiempo
+    """
+    def star_id(row: int, column: int) -> int:
+        return row * size + column + 1
+    
+    stars = []
+    for row in range(size):
+        for column in range(size):
+            links = [
+                {'starId': star_id(row + d_row, column + d_column), 'distance': 1}
+                for d_row, d_column in ((0, 1), (1, 0), (0, -1), (-1, 0))
+                if 0 <= row + d_row < size and 0 <= column + d_column < size
+            ]
+            stars.append({
+                'id': star_id(row, column),
+                'label': f'Rejilla{row}-{column}',
+                'linkedTo': links,
+                'radius': 1,
+                'timeToEat': 1,
+                'amountOfEnergy': 0,
+                'coordenates': {'x': column, 'y': row}
+            })
+    
+    data = ConstellationData(
+        constellations=[{'name': 'Rejilla', 'starts': stars}],
+        burroenergiaInicial=100, estadoSalud='Excelente', pasto=0, number=1,
+        startAge=0, deathAge=1000
+    )
+    return SpaceGraph(data), initial_state(data, 2)
+
+
+def test_pool_matches_direct_computation():
+    """Verifica que el pool calcule la misma ruta que el cálculo directo"""
+    data, graph = load_graph('large_test_constellation.json')
+    state = initial_state(data, 1)
+    graph.block_path(1, 2)
+    pool = RoutePool(max_workers=1)
+    
+    async def solve_all():
+        results = []
+        for request in (RouteRequest(origin_star_id=1, algorithm="maximize_stars"),
+                        RouteRequest(origin_star_id=1, algorithm="minimize_cost", destination_star_id=5)):
+            results.append((request, await pool.solve(graph, state, request)))
+        return results
+    
+    try:
+        for request, (route, stats, name) in asyncio.run(solve_all()):
+            expected_route, expected_stats, expected_name = compute_route(graph, state, request)
+            assert route == expected_route
+            assert stats['stars_visited'] == expected_stats['stars_visited']
+            assert name == expected_name
+    finally:
+        pool.shutdown()
+    
+    print("✅ Pool de procesos calcula las mismas rutas")
+
+
+def test_pool_keeps_event_loop_responsive():
+    """Verifica que el event loop siga atendiendo mientras se calcula una ruta y el timeout"""
+    data, graph = load_graph('large_test_constellation.json')
+    state = initial_state(data, 1)
+    pool = RoutePool(max_workers=1)
+    request = RouteRequest(origin_star_id=1, algorithm="maximize_stars_dp")
+    
+    async def measure():
+        solve = asyncio.ensure_future(pool.solve(graph, state, request))
+        worst_tick = 0.0
+        while not solve.done():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            worst_tick = max(worst_tick, time.perf_counter() - start)
+        await solve
+        return worst_tick
+    
+    try:
+        assert asyncio.run(measure()) < 0.25
+    finally:
+        pool.shutdown()
+    
+    # Un pool nuevo no alcanza a arrancar dentro del tiempo máximo
+    pool = RoutePool(max_workers=1)
+    try:
+        with pytest.raises(RouteTimeoutError):
+            asyncio.run(pool.solve(graph, state, request, timeout=1e-4))
+    finally:
+        pool.shutdown()
+    
+    print("✅ Event loop libre durante el cálculo")
+
+
+def test_long_searches_return_best_route_before_timeout():
+    """
+    Verifica que las búsquedas largas retornen la mejor ruta encontrada dentro del
+    tiempo máximo, aunque incluya el arranque del pool y la espera en cola
+    """
+    graph, state = grid_graph(7)
+    pool = RoutePool(max_workers=1)
+    requests = [RouteRequest(origin_star_id=2, algorithm="maximize_stars") for _ in range(3)]
+    requests.append(RouteRequest(origin_star_id=2, algorithm="maximize_stars_dp"))
+    
+    async def solve_all():
+        return await asyncio.gather(*(
+            pool.solve(graph, state, request, timeout=2) for request in requests
+        ))
+    
+    try:
+        results = asyncio.run(solve_all())
+    finally:
+        pool.shutdown()
+    
+    for route, stats, _ in results:
+        assert route[0] == 2
+        assert stats['proven_optimal'] is False
+    
+    print("✅ Búsquedas largas retornan antes del tiempo máximo")
+
+
+def test_batch_matches_individual_routes():
+    """Verifica que el lote retorne, en orden, las mismas rutas que el cálculo individual"""
+    data, graph = load_graph('large_test_constellation.json')
+    state = initial_state(data, 1)
+    pool = RoutePool(max_workers=2)
+    
+    items = []
+    for origin in graph.get_all_stars()[:6]:
+        state = initial_state(data, origin)
+        items.append((state, RouteRequest(origin_star_id=origin, algorithm="maximize_stars")))
+        items.append((state, RouteRequest(origin_star_id=origin, algorithm="minimize_cost", destination_star_id=5)))
+    items.append((initial_state(data, 1), RouteRequest(origin_star_id=-1, algorithm="maximize_stars_dp")))
+    
+    try:
+        results = asyncio.run(pool.solve_batch(graph, items))
+    finally:
+        pool.shutdown()
+    
+    assert len(results) == len(items)
+    for (state, request), result in zip(items[:-1], results):
+        expected_route, _, expected_name = compute_route(graph, state, request)
+        assert result['origin_star_id'] == request.origin_star_id
+        assert result['route'] == expected_route
+        assert result['algorithm_name'] == expected_name
+        assert result['compute_time_ms'] >= 0
+    
+    assert results[-1]['success'] is False, "Un error no debe afectar al resto del lote"
+    
+    print("✅ Lote de rutas consistente")
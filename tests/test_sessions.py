@@ -0,0 +1,96 @@
+"""
+Tests del registro de sesiones
+"""
+import json
+from pathlib import Path
+
+from app.models import ConstellationData
+from app.graph_logic import SpaceGraph
+from app.sessions import SessionRegistry
+
+
+def load_workspace(registry: SessionRegistry, session_id: str, filename: str):
+    """Carga un archivo de datos en el espacio de trabajo de una sesión"""
+    with open(Path('data') / filename, 'r', encoding='utf-8') as f:
+        data = ConstellationData(**json.load(f))
+    
+    workspace = registry.get_or_create(session_id)
+    workspace.data = data
+    workspace.graph = SpaceGraph(data)
+    registry.touch(session_id)
+    return workspace
+
+
+def test_sessions_are_isolated():
+    """Verifica que cada sesión tenga su propio grafo"""
+    registry = SessionRegistry()
+    
+    first = load_workspace(registry, 'a', 'test_simple.json')
+    second = load_workspace(registry, 'b', 'large_test_constellation.json')
+    
+    assert registry.get('a') is first
+    assert registry.get('b') is second
+    assert first.graph is not second.graph
+    
+    first.graph.block_path(*next(iter(first.graph.graph.edges())))
+    assert not second.graph.get_blocked_paths()
+    
+    print("✅ Sesiones aisladas")
+
+
+def test_lru_eviction_by_count_and_memory():
+    """Verifica el desalojo LRU por número de sesiones y por memoria"""
+    registry = SessionRegistry(max_sessions=2)
+    registry.get_or_create('a')
+    registry.get_or_create('b')
+    registry.get('a')
+    registry.get_or_create('c')
+    
+    assert 'a' in registry and 'c' in registry
+    assert 'b' not in registry, "La sesión menos usada debe desalojarse"
+    
+    workspace = load_workspace(SessionRegistry(), 'x', 'large_test_constellation.json')
+    registry = SessionRegistry(max_memory_bytes=workspace.estimated_bytes() * 3 // 2)
+    load_workspace(registry, 'a', 'large_test_constellation.json')
+    load_workspace(registry, 'b', 'large_test_constellation.json')
+    
+    assert 'a' not in registry and 'b' in registry
+    
+    # La sesión en uso nunca se desaloja, aunque supere el límite por sí sola
+    registry = SessionRegistry(max_memory_bytes=1)
+    load_workspace(registry, 'a', 'large_test_constellation.json')
+    assert 'a' in registry
+    
+    print("✅ Desalojo LRU de sesiones")
+
+
+def test_lookups_do_not_create_or_evict_sessions():
+    """Verifica que consultar sesiones inexistentes no cree sesiones ni desaloje a las demás"""
+    registry = SessionRegistry(max_sessions=2)
+    first = load_workspace(registry, 'a', 'test_simple.json')
+    load_workspace(registry, 'b', 'test_simple.json')
+    
+    for index in range(100):
+        assert registry.get(f'anonimo{index}') is None
+    
+    assert len(registry) == 2
+    assert registry.get('a') is first
+    
+    print("✅ Las consultas no crean sesiones")
+
+
+def test_total_bytes_is_kept_up_to_date():
+    """Verifica que el total de memoria acumulado coincida con la suma de las sesiones"""
+    registry = SessionRegistry()
+    load_workspace(registry, 'a', 'test_simple.json')
+    second = load_workspace(registry, 'b', 'large_test_constellation.json')
+    assert registry.total_bytes() == sum(registry.get(session_id).estimated_bytes() for session_id in ('a', 'b'))
+    
+    second.graph.precompute_all_pairs()
+    registry.touch('b')
+    assert registry.total_bytes() == sum(registry.get(session_id).estimated_bytes() for session_id in ('a', 'b'))
+    
+    registry.discard('b')
+    assert registry.total_bytes() == registry.get('a').estimated_bytes()
+    
+    print("✅ Total de memoria acumulado")
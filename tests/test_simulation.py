@@ -0,0 +1,222 @@
+"""
+Tests del motor de simulación del viaje del burro
+"""
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.main import simulation_stream, simulate_route, _summary_json
+from app.models import DonkeyState, Health, SimulateRequest
+from app.sessions import Workspace
+from app.simulation import DonkeySimulation
+from tests.conftest import load_graph, initial_state
+
+
+ROUTE = [1, 2, 7, 8, 9, 3, 12, 17, 13, 15, 14, 11]
+
+
+def create_simulation(route=ROUTE) -> DonkeySimulation:
+    """Crea una simulación sobre el archivo de ejemplo"""
+    data, graph = load_graph('constellations_example.json')
+    return DonkeySimulation(graph, list(route), initial_state(data, route[0]))
+
+
+def test_compact_steps_rebuild_full_state():
+    """Verifica que aplicar los pasos compactos reconstruya el estado de cada paso completo"""
+    compact_simulation = create_simulation()
+    full_simulation = create_simulation()
+    client_state = {'visited_stars': []}
+    
+    while True:
+        compact_step = compact_simulation.next_step()
+        full_step = full_simulation.next_step()
+        if full_step is None:
+            assert compact_step is None
+            break
+        
+        compact = compact_simulation.step_payload(compact_step)
+        full = full_simulation.step_payload(full_step, compact=False)
+        
+        client_state.update(compact['state'])
+        client_state['visited_stars'] = client_state['visited_stars'] + compact['visited']
+        
+        assert compact['star_id'] == full['current_star']['id']
+        assert compact['action'] == full['action']
+        assert client_state == full['donkey_state']
+        assert 'linkedTo' not in json.dumps(compact)
+    
+    print("✅ Los pasos compactos reconstruyen el estado completo")
+
+
+def test_compact_steps_only_send_changes():
+    """Verifica que los pasos compactos solo incluyan los campos que cambiaron"""
+    simulation = create_simulation()
+    
+    first = simulation.step_payload(simulation.next_step())
+    second = simulation.step_payload(simulation.next_step())
+    
+    assert set(first['state']) == set(DonkeySimulation.COMPACT_STATE_FIELDS)
+    assert first['visited'] == [ROUTE[0]]
+    assert second['visited'] == [ROUTE[1]]
+    assert 'death_age' not in second['state'] or second['state']['death_age'] != first['state']['death_age']
+    assert 'is_alive' not in second['state']
+    
+    print("✅ Los pasos compactos solo envían cambios")
+
+
+def test_history_keeps_per_step_snapshots():
+    """Verifica que el historial guarde el estado de cada paso y no el estado final"""
+    simulation = create_simulation()
+    returned = []
+    while True:
+        step = simulation.next_step()
+        if step is None:
+            break
+        returned.append(step.model_dump(mode='json'))
+    
+    log = simulation.simulation_log
+    
+    assert [step.model_dump(mode='json') for step in log] == returned
+    assert log[0].donkey_state.visited_stars == [ROUTE[0]]
+    assert log[0].donkey_state.energy != log[-1].donkey_state.energy
+    assert len({step.donkey_state.age for step in log}) > 1
+    assert simulation.history.nbytes() <= len(simulation.history) * 64
+    
+    print("✅ El historial guarda una copia del estado por paso")
+
+
+def test_replay_matches_step_by_step():
+    """Verifica que el replay rápido produzca el mismo resumen e historial que next_step"""
+    step_by_step = create_simulation()
+    step_by_step.run_full_simulation()
+    
+    fast = create_simulation()
+    fast.history.keep_messages = False
+    summary = fast.replay()
+    
+    assert summary == step_by_step.get_summary()
+    
+    trajectory = fast.history.trajectory()
+    log = step_by_step.simulation_log
+    assert trajectory['action'] == [step.action for step in log]
+    assert trajectory['star_id'] == [step.current_star.id for step in log]
+    assert trajectory['energy'] == [step.donkey_state.energy for step in log]
+    assert trajectory['health'] == [step.donkey_state.health for step in log]
+    
+    print("✅ El replay rápido coincide con la simulación paso a paso")
+
+
+def test_health_is_coded_internally_and_text_in_json():
+    """Verifica que la salud se guarde como código Health y se envíe como texto"""
+    simulation = create_simulation()
+    assert simulation.state.health is Health.EXCELENTE
+    
+    simulation.run_full_simulation()
+    step = simulation.simulation_log[-1]
+    
+    assert isinstance(step.donkey_state.health, Health)
+    assert step.model_dump(mode='json')['donkey_state']['health'] == step.donkey_state.health.label
+    assert simulation.get_summary()['final_health'] == step.donkey_state.health
+    assert DonkeyState(current_star_id=1, energy=50, health='Mala', grass=0, age=0,
+                       death_age=1).health is Health.MALA
+    
+    print("✅ Salud codificada internamente y como texto en el JSON")
+
+
+class ConnectedRequest:
+    """
+    Solicitud mínima para el endpoint SSE: el cliente se desconecta después de
+    'connected_checks' revisiones (nunca si es None)
+    """
+    
+    def __init__(self, connected_checks=None):
+        self.connected_checks = connected_checks
+    
+    async def is_disconnected(self) -> bool:
+        if self.connected_checks is None:
+            return False
+        self.connected_checks -= 1
+        return self.connected_checks < 0
+
+
+def read_events(chunks) -> list:
+    """Convierte los mensajes SSE en pares (evento, datos)"""
+    events = []
+    for chunk in chunks:
+        event_line, data_line = chunk.strip().split('\n')
+        events.append((event_line[len('event: '):], json.loads(data_line[len('data: '):])))
+    return events
+
+
+def test_stream_sends_ordered_steps_and_summary():
+    """Verifica que el stream envíe los pasos en orden, el resumen al final, y se detenga al reemplazar la simulación"""
+    workspace = Workspace('stream')
+    workspace.simulation = create_simulation()
+    reference = create_simulation()
+    
+    async def collect(stop_after=None):
+        response = await simulation_stream(ConnectedRequest(), interval_ms=0, step_format="compact",
+                                           workspace=workspace)
+        chunks = []
+        async for chunk in response.body_iterator:
+            chunks.append(chunk)
+            if len(chunks) == stop_after:
+                # Otra simulación iniciada en la misma sesión
+                workspace.simulation = create_simulation()
+        return read_events(chunks)
+    
+    events = asyncio.run(collect())
+    expected_steps = []
+    while (step := reference.next_step()) is not None:
+        expected_steps.append(reference.step_payload(step))
+    
+    assert [event for event, _ in events] == ['step'] * len(expected_steps) + ['summary']
+    assert [data['step'] for _, data in events[:-1]] == json.loads(json.dumps(expected_steps))
+    assert [data['is_complete'] for _, data in events[:-1]] == [False] * (len(expected_steps) - 1) + [True]
+    assert events[-1][1] == json.loads(json.dumps(_summary_json(reference.get_summary())))
+    
+    workspace.simulation = create_simulation()
+    events = asyncio.run(collect(stop_after=2))
+    assert [event for event, _ in events] == ['step', 'step']
+    
+    print("✅ El stream envía los pasos en orden y se detiene al reemplazar la simulación")
+
+
+def test_stream_stops_when_client_disconnects():
+    """Verifica que el stream termine sin resumen cuando el cliente se desconecta"""
+    workspace = Workspace('stream')
+    workspace.simulation = create_simulation()
+    
+    async def collect():
+        response = await simulation_stream(ConnectedRequest(connected_checks=3), interval_ms=0,
+                                           step_format="compact", workspace=workspace)
+        return [chunk async for chunk in response.body_iterator]
+    
+    events = read_events(asyncio.run(collect()))
+    
+    assert [event for event, _ in events] == ['step'] * 3
+    assert [data['step']['step'] for _, data in events] == [0, 1, 2]
+    assert not workspace.simulation.is_complete
+    
+    print("✅ El stream se detiene cuando el cliente se desconecta")
+
+
+def test_simulate_endpoint_checks_origin():
+    """Verifica que /api/simulate rechace un origen inexistente o distinto del inicio de la ruta"""
+    workspace = Workspace('simulate')
+    workspace.data, workspace.graph = load_graph('constellations_example.json')
+    reference = create_simulation()
+    
+    for origin, route in ((999, [999, 2]), (2, ROUTE)):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(simulate_route(SimulateRequest(origin_star_id=origin, route=route), workspace=workspace))
+        assert error.value.status_code == 400
+    
+    response = asyncio.run(simulate_route(SimulateRequest(origin_star_id=ROUTE[0], route=ROUTE), workspace=workspace))
+    body = json.loads(response.body)
+    assert body['summary'] == json.loads(json.dumps(_summary_json(reference.replay())))
+    assert len(body['trajectory']['health']) == body['summary']['total_steps']
+    
+    print("✅ /api/simulate valida el origen y simula fuera del event loop")